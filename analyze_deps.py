@@ -8,7 +8,11 @@ Blade 依赖关系分析工具
 """
 import sys
 import os
+import csv
+import json
+import time
 import argparse
+import subprocess
 
 # 设置默认编码为 UTF-8
 if sys.version_info[0] >= 3:
@@ -20,11 +24,335 @@ if sys.version_info[0] >= 3:
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from analyze_includes_lib.blade_parser import BladeParser, find_blade_root
+from analyze_includes_lib.blade_cache import BuildParseCache
+from analyze_includes_lib.blade_index import BladeTargetIndex
+from analyze_includes_lib.blade_rdeps import BladeReverseIndex
+from analyze_includes_lib.blade_profile import build_profile, load_cost_csv
+from analyze_includes_lib.blade_deps_check import BladeDepsChecker
+from analyze_includes_lib.blade_cost import BladeCostEstimator
+from analyze_includes_lib.blade_history import (
+    BladeRevisionParser,
+    dependency_history,
+    list_revisions
+)
+from analyze_includes_lib.utils import format_size
 from analyze_includes_lib.blade_visualizer import BladeHtmlVisualizer
 
+# 反向依赖查询子命令
+QUERY_COMMANDS = ('rdeps', 'affected-tests')
+
+# 依赖声明检查子命令
+CHECK_DEPS_COMMAND = 'check-deps'
+
+# 依赖历史子命令
+HISTORY_COMMAND = 'history'
+
+
+def resolve_blade_root(blade_root_arg):
+    """确定 BLADE_ROOT 目录，找不到时退出"""
+    if blade_root_arg:
+        blade_root = blade_root_arg
+    else:
+        blade_root = find_blade_root()
+        if not blade_root:
+            print("✗ 错误：找不到 BLADE_ROOT 文件。", file=sys.stderr)
+            print("  请在 Blade 项目目录中运行此工具，或使用 --blade-root 参数指定项目根目录。",
+                  file=sys.stderr)
+            sys.exit(1)
+    
+    if not os.path.exists(blade_root):
+        print(f"✗ 错误：指定的 BLADE_ROOT 目录不存在：{blade_root}", file=sys.stderr)
+        sys.exit(1)
+    
+    return blade_root
+
+
+def query_main(command, argv):
+    """
+    反向依赖查询：rdeps 输出受变更文件影响的所有 target，
+    affected-tests 只输出其中的 cc_test。结果每行一个写到 stdout，
+    状态信息写到 stderr，便于在 CI 中直接使用。
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} {command}",
+        description="根据变更文件查询受影响的 Blade target"
+                    if command == 'rdeps' else "根据变更文件查询需要运行的 cc_test",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  git diff --name-only origin/master | %(prog)s
+  %(prog)s ads/serving/show/ranker.cpp ads/serving/show/BUILD
+        """
+    )
+    parser.add_argument(
+        "files",
+        nargs='*',
+        help="变更文件列表，相对路径以 git 仓库根目录为基准（与 git diff --name-only 一致，"
+             "不在 git 仓库中时以 BLADE_ROOT 为基准），也可以是绝对路径（默认从标准输入读取，每行一个）"
+    )
+    parser.add_argument(
+        "--blade-root",
+        help="BLADE_ROOT 文件所在的项目根目录（默认：自动查找）"
+    )
+    parser.add_argument(
+        "--index-file",
+        help="索引文件路径（默认：BLADE_ROOT/.blade_target_index）"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="构建索引时的并行进程数（默认：CPU 核数）"
+    )
+    args = parser.parse_args(argv)
+    
+    files = args.files or [line.strip() for line in sys.stdin if line.strip()]
+    blade_root = resolve_blade_root(args.blade_root)
+    
+    index = BladeTargetIndex(blade_root, index_file=args.index_file, jobs=args.jobs)
+    reparsed, total = index.load()
+    print(f"✓ 索引包含 {total} 个 BUILD 文件、{len(index.targets)} 个 target"
+          f"（本次重新解析 {reparsed} 个）", file=sys.stderr)
+    
+    reverse_index = BladeReverseIndex(blade_root, index.targets)
+    if command == 'rdeps':
+        results, unowned = reverse_index.affected_targets(files)
+    else:
+        results, unowned = reverse_index.affected_tests(files)
+    
+    for path in unowned:
+        print(f"⚠ 警告：{path} 不属于任何 target", file=sys.stderr)
+    print(f"✓ {len(files)} 个变更文件影响 {len(results)} 个"
+          f"{' target' if command == 'rdeps' else '测试'}", file=sys.stderr)
+    
+    for spec in results:
+        print(spec)
+
+
+def check_deps_main(argv):
+    """
+    依赖声明检查：扫描 target 源文件的 include，报告缺失和多余的 deps。
+    有问题时以状态码 1 退出，便于在 CI 中使用。
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} {CHECK_DEPS_COMMAND}",
+        description="根据源文件的 include 关系检查 Blade target 缺失和多余的依赖",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  %(prog)s ads/serving/show:brpc_ranking_server
+  %(prog)s 'ads/serving/...' -j 16
+  %(prog)s                      # 检查整个工作区
+        """
+    )
+    parser.add_argument(
+        "targets",
+        nargs='*',
+        default=['...'],
+        help="要检查的 target 规范（默认：整个工作区）"
+    )
+    parser.add_argument(
+        "--blade-root",
+        help="BLADE_ROOT 文件所在的项目根目录（默认：自动查找）"
+    )
+    parser.add_argument(
+        "--index-file",
+        help="索引文件路径（默认：BLADE_ROOT/.blade_target_index）"
+    )
+    parser.add_argument(
+        "-I", "--include",
+        action="append",
+        help="额外的 include 搜索路径（BLADE_ROOT 和 build64_release 总是包含在内）"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="并行进程数（默认：CPU 核数）"
+    )
+    args = parser.parse_args(argv)
+    
+    blade_root = resolve_blade_root(args.blade_root)
+    
+    index = BladeTargetIndex(blade_root, index_file=args.index_file, jobs=args.jobs)
+    reparsed, total = index.load()
+    print(f"✓ 索引包含 {total} 个 BUILD 文件、{len(index.targets)} 个 target"
+          f"（本次重新解析 {reparsed} 个）", file=sys.stderr)
+    
+    specs = index.expand_target_patterns(args.targets)
+    checker = BladeDepsChecker(blade_root, index.targets, include_paths=args.include, jobs=args.jobs)
+    report = checker.check(specs)
+    
+    missing_count = 0
+    unused_count = 0
+    for spec in sorted(report):
+        result = report[spec]
+        print(spec)
+        for dep, headers in sorted(result['missing'].items()):
+            print(f"  缺少依赖 //{dep}（{', '.join(headers)}）")
+            missing_count += 1
+        for header, owners in sorted(result['ambiguous'].items()):
+            candidates = ', '.join(f"//{owner}" for owner in owners)
+            print(f"  缺少依赖，{header} 属于多个 target：{candidates}")
+            missing_count += 1
+        for dep in result['unused']:
+            print(f"  多余依赖 //{dep}")
+            unused_count += 1
+    
+    print(f"✓ 检查了 {len(specs)} 个 target：{len(report)} 个有问题，"
+          f"缺少 {missing_count} 个依赖，多余 {unused_count} 个依赖", file=sys.stderr)
+    if report:
+        sys.exit(1)
+
+
+def history_main(argv):
+    """
+    依赖历史：不 checkout，逐个提交统计根 target 依赖闭包的 target 数和边数。
+    表格写到 stdout，状态信息写到 stderr。
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} {HISTORY_COMMAND}",
+        description="统计 Blade target 依赖闭包在最近若干次提交中的变化",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  %(prog)s ads/serving/show:brpc_ranking_server
+  %(prog)s ads/serving/show:brpc_ranking_server -n 500 --first-parent --csv history.csv
+  %(prog)s ads/serving/show:brpc_ranking_server --rev release-1.0 --json -
+        """
+    )
+    parser.add_argument(
+        "targets",
+        nargs='+',
+        help="要统计的 target 规范（格式：path/to/dir:target_name）"
+    )
+    parser.add_argument(
+        "--blade-root",
+        help="BLADE_ROOT 文件所在的项目根目录（默认：自动查找）"
+    )
+    parser.add_argument(
+        "--rev",
+        default="HEAD",
+        help="从哪个 revision 开始向前统计（默认：HEAD）"
+    )
+    parser.add_argument(
+        "-n", "--max-count",
+        type=int,
+        default=200,
+        help="统计的提交数（默认：200）"
+    )
+    parser.add_argument(
+        "--first-parent",
+        action="store_true",
+        help="只沿第一个父提交遍历（忽略合并进来的分支上的提交）"
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=10,
+        help="最大递归深度（默认：10）"
+    )
+    parser.add_argument(
+        "--json",
+        metavar="FILE",
+        help="将结果写入 JSON 文件（'-' 表示 stdout）"
+    )
+    parser.add_argument(
+        "--csv",
+        metavar="FILE",
+        help="将结果写入 CSV 文件（每个提交、每个根 target 一行）"
+    )
+    args = parser.parse_args(argv)
+    
+    blade_root = resolve_blade_root(args.blade_root)
+    
+    try:
+        commits = list_revisions(blade_root, args.rev, args.max_count, args.first_parent)
+        revision_parser = BladeRevisionParser(blade_root)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"✗ 错误：无法读取 git 历史：{e}", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        specs = revision_parser.expand_target_patterns(args.targets)
+        start = time.time()
+        history = dependency_history(revision_parser, specs, commits, args.depth)
+        elapsed = time.time() - start
+    except ValueError as e:
+        print(f"✗ 错误：{e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        revision_parser.close()
+    
+    print(f"✓ 分析了 {len(history)} 个提交，解析了 {revision_parser.blobs_parsed} 个 BUILD blob，"
+          f"耗时 {elapsed:.2f}s", file=sys.stderr)
+    
+    if args.json:
+        if args.json == '-':
+            json.dump(history, sys.stdout, indent=2, ensure_ascii=False)
+            print()
+            return
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2, ensure_ascii=False)
+    
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['commit', 'timestamp', 'target', 'nodes', 'edges'])
+            for entry in history:
+                for spec, counts in entry['targets'].items():
+                    writer.writerow([entry['commit'], entry['timestamp'], spec,
+                                     counts['nodes'], counts['edges']])
+    
+    for spec in specs:
+        print(spec)
+        print(f"  {'提交':<10} {'日期':<10} {'target':>7} {'依赖':>7}  标题")
+        for i, entry in enumerate(history):
+            counts = entry['targets'][spec]
+            # * 标记相对前一个（更早的）提交有变化的提交
+            older = history[i + 1]['targets'][spec] if i + 1 < len(history) else counts
+            marker = '*' if older != counts else ' '
+            date = time.strftime('%Y-%m-%d', time.localtime(entry['timestamp']))
+            print(f"{marker} {entry['commit'][:10]:<10} {date:<10} "
+                  f"{counts['nodes']:>7} {counts['edges']:>7}  {entry['subject'][:60]}")
+        print()
+
+
+def print_profile(root_target, profile, measured):
+    """打印单个根 target 的关键路径和并行度分析结果"""
+    unit = "秒" if measured else "个源文件"
+    
+    def fmt(value):
+        return f"{value:.2f}" if isinstance(value, float) else str(value)
+    
+    print(f"构建并行度分析：{root_target}")
+    print(f"  总开销: {fmt(profile['total_cost'])} {unit}")
+    print(f"  关键路径: {fmt(profile['critical_path_cost'])} {unit}"
+          f"（{len(profile['critical_path'])} 个 target）")
+    print(f"  平均并行度: {profile['parallelism']:.2f}")
+    for spec in profile['critical_path']:
+        print(f"    {spec} ({fmt(profile['targets'][spec]['cost'])})")
+    print(f"  每层可并行构建的 target 数: {' '.join(str(n) for n in profile['levels'])}")
+    for members in profile['cycles']:
+        print(f"  ⚠ 警告：循环依赖（{len(members)} 个 target，未参与分析）：{', '.join(members[:10])}"
+              f"{' ...' if len(members) > 10 else ''}")
+    if profile['blocked']:
+        print(f"  ⚠ 警告：{len(profile['blocked'])} 个 target 依赖上述循环，未参与分析")
+    print()
+
 
 def main():
     """主函数"""
+    if len(sys.argv) > 1 and sys.argv[1] in QUERY_COMMANDS:
+        query_main(sys.argv[1], sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == CHECK_DEPS_COMMAND:
+        check_deps_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == HISTORY_COMMAND:
+        history_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="分析 Blade 构建系统的 target 依赖关系并生成可视化图表",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -41,6 +369,30 @@ def main():
   
   # 设置最大递归深度
   %(prog)s ads/serving/show:brpc_ranking_server --depth 5
+  
+  # 一次分析多个 target（共享解析结果，生成一个可切换的 HTML）
+  %(prog)s ads/serving/show:brpc_ranking_server ads/serving/bid:bid_server
+  %(prog)s 'ads/serving/...'
+  
+  # 使用工作区索引（首次并行解析所有 BUILD 文件，之后只更新变化的文件）
+  %(prog)s ads/serving/show:brpc_ranking_server --index
+  
+  # 分析关键路径和并行度（默认以源文件数估算开销，也可提供实测编译耗时）
+  %(prog)s ads/serving/show:brpc_ranking_server --profile
+  %(prog)s ads/serving/show:brpc_ranking_server --cost-csv compile_times.csv
+  
+  # 按 include 闭包字节数估算每个 target 的编译量，并据此确定节点大小
+  %(prog)s ads/serving/show:brpc_ranking_server --compile-cost -I thirdparty
+  
+  # 根据变更文件查询受影响的 target / 需要运行的测试
+  git diff --name-only origin/master | %(prog)s rdeps
+  git diff --name-only origin/master | %(prog)s affected-tests
+  
+  # 根据 include 关系检查缺失和多余的 deps
+  %(prog)s check-deps 'ads/serving/...'
+  
+  # 统计最近 200 次提交中依赖闭包的变化（不需要 checkout）
+  %(prog)s history ads/serving/show:brpc_ranking_server
 
 说明:
   target 规范格式为：path/to/dir:target_name
@@ -52,8 +404,10 @@ def main():
     )
     
     parser.add_argument(
-        "target",
-        help="要分析的 target 规范（格式：path/to/dir:target_name）"
+        "targets",
+        nargs='+',
+        help="要分析的 target 规范（格式：path/to/dir:target_name，"
+             "也支持 path/to/dir:* 和 path/to/dir/...）"
     )
     
     parser.add_argument(
@@ -73,45 +427,166 @@ def main():
         help="输出文件名（默认：blade_dependency_graph.html）"
     )
     
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="压缩 HTML 中嵌入的图数据（需要浏览器支持 DecompressionStream）"
+    )
+    
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        help="分块输出：每个根 target 的数据写入 <输出文件名>_data/ 目录，页面切换模块时按需加载"
+    )
+    
+    parser.add_argument(
+        "--presettle",
+        type=int,
+        default=0,
+        metavar="N",
+        help="力导向布局首次绘制前先在后台迭代 N 次（默认：0，边迭代边绘制）"
+    )
+    
+    parser.add_argument(
+        "--canvas-threshold",
+        type=int,
+        default=3000,
+        metavar="N",
+        help="图中节点数超过 N 时使用 Canvas 代替 SVG 渲染（默认：3000）"
+    )
+    
+    parser.add_argument(
+        "--collapse-threshold",
+        type=int,
+        default=500,
+        metavar="N",
+        help="图中节点数超过 N 时初始按模块分类折叠显示，点击分类节点展开（默认：500）"
+    )
+    
+    parser.add_argument(
+        "--browser-layout",
+        action="store_true",
+        help="不预先计算布局，由浏览器打开页面时计算（默认在生成 HTML 时计算）"
+    )
+    
+    parser.add_argument(
+        "--layout-cache",
+        help="预计算布局的磁盘缓存文件路径（默认：只在内存中缓存）"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="不使用 BUILD 文件解析缓存（默认缓存到 BLADE_ROOT/.blade_parse_cache）"
+    )
+    
+    parser.add_argument(
+        "--cache-file",
+        help="BUILD 文件解析缓存路径（默认：BLADE_ROOT/.blade_parse_cache）"
+    )
+    
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="使用工作区 target 索引：并行解析所有 BUILD 文件并缓存到磁盘"
+    )
+    
+    parser.add_argument(
+        "--index-file",
+        help="索引文件路径（默认：BLADE_ROOT/.blade_target_index）"
+    )
+    
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="构建索引时的并行进程数（默认：CPU 核数）"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="计算关键路径、每层可并行的 target 数和松弛时间，并在 HTML 中高亮关键路径"
+    )
+    
+    parser.add_argument(
+        "--cost-csv",
+        metavar="FILE",
+        help="target 编译耗时 CSV（每行：target,秒），用于 --profile（默认以源文件数估算）"
+    )
+    
+    parser.add_argument(
+        "--compile-cost",
+        action="store_true",
+        help="以源文件 include 闭包的总字节数估算每个 target 的编译量，并用于节点大小"
+    )
+    
+    parser.add_argument(
+        "-I", "--include",
+        action="append",
+        help="--compile-cost 使用的额外 include 搜索路径（可多次使用）"
+    )
+    
     args = parser.parse_args()
     
     # 查找 BLADE_ROOT
-    if args.blade_root:
-        blade_root = args.blade_root
-    else:
-        blade_root = find_blade_root()
-        if not blade_root:
-            print("✗ 错误：找不到 BLADE_ROOT 文件。")
-            print("  请在 Blade 项目目录中运行此工具，或使用 --blade-root 参数指定项目根目录。")
-            sys.exit(1)
-    
-    if not os.path.exists(blade_root):
-        print(f"✗ 错误：指定的 BLADE_ROOT 目录不存在：{blade_root}")
-        sys.exit(1)
+    blade_root = resolve_blade_root(args.blade_root)
     
     print(f"BLADE_ROOT: {blade_root}")
-    print(f"分析 Target: {args.target}")
+    print(f"分析 Target: {' '.join(args.targets)}")
     print(f"最大深度: {args.depth}")
     print()
     
     # 创建解析器
-    blade_parser = BladeParser(blade_root)
+    if args.index:
+        blade_parser = BladeTargetIndex(blade_root, index_file=args.index_file, jobs=args.jobs)
+        print("正在加载工作区索引...")
+        reparsed, total = blade_parser.load()
+        print(f"✓ 索引包含 {total} 个 BUILD 文件、{len(blade_parser.targets)} 个 target"
+              f"（本次重新解析 {reparsed} 个）")
+        print()
+    else:
+        parse_cache = None if args.no_cache else BuildParseCache(blade_root, args.cache_file)
+        blade_parser = BladeParser(blade_root, parse_cache=parse_cache)
+    
+    # 展开 target 模式
+    root_targets = blade_parser.expand_target_patterns(args.targets)
+    if len(root_targets) != len(args.targets):
+        print(f"展开后共 {len(root_targets)} 个根 target")
     
     # 分析依赖关系
     print("正在分析依赖关系...")
     try:
-        nodes, edges = blade_parser.analyze_dependencies(args.target, max_depth=args.depth)
+        results = blade_parser.analyze_dependencies_many(root_targets, max_depth=args.depth)
     except Exception as e:
         print(f"✗ 错误：分析依赖关系时出错：{e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
     
-    if not nodes:
-        print(f"✗ 错误：找不到 target {args.target} 或其没有依赖。")
+    modules_data = [
+        {'root_target': root, 'nodes': nodes, 'edges': edges}
+        for root, nodes, edges in results if nodes
+    ]
+    if not modules_data:
+        print(f"✗ 错误：找不到 target {' '.join(args.targets)} 或其没有依赖。")
         sys.exit(1)
     
-    print(f"✓ 发现 {len(nodes)} 个 target 和 {len(edges)} 个依赖关系")
+    # 合并所有根 target 的节点用于统计
+    nodes = {}
+    edge_count = 0
+    for module in modules_data:
+        nodes.update(module['nodes'])
+        edge_count += len(module['edges'])
+    
+    if len(modules_data) == 1:
+        print(f"✓ 发现 {len(nodes)} 个 target 和 {edge_count} 个依赖关系")
+    else:
+        print(f"✓ {len(modules_data)} 个根 target 共涉及 {len(nodes)} 个不同的 target")
+    if not args.index and blade_parser.parse_cache is not None:
+        cache = blade_parser.parse_cache
+        cache.save()
+        print(f"  BUILD 解析缓存：命中 {cache.hits} 个，重新解析 {cache.misses} 个")
     print()
     
     # 统计信息
@@ -129,13 +604,54 @@ def main():
     print(f"  外部依赖: {external_count}")
     print()
     
+    # 关键路径和并行度分析
+    if args.profile or args.cost_csv:
+        costs = None
+        if args.cost_csv:
+            try:
+                costs = load_cost_csv(args.cost_csv)
+            except OSError as e:
+                print(f"✗ 错误：无法读取耗时文件 {args.cost_csv}：{e}")
+                sys.exit(1)
+        for module in modules_data:
+            module['profile'] = build_profile(module['nodes'], module['edges'], costs)
+            print_profile(module['root_target'], module['profile'], costs is not None)
+    
+    # 编译开销估算
+    target_costs = None
+    if args.compile_cost:
+        print("正在估算编译开销...")
+        all_edges = set()
+        for module in modules_data:
+            all_edges.update(module['edges'])
+        estimator = BladeCostEstimator(blade_root, include_paths=args.include)
+        target_costs = estimator.rollup(nodes, all_edges)
+        print(f"✓ 扫描了 {estimator.scanned_files} 个文件")
+        print("自身编译量最大的 target：")
+        top = sorted(target_costs.items(), key=lambda item: item[1]['own'], reverse=True)[:10]
+        for spec, cost in top:
+            if cost['own']:
+                print(f"  {format_size(cost['own']):>10}  {spec}")
+        for module in modules_data:
+            root_cost = target_costs.get(module['root_target'])
+            if root_cost:
+                print(f"  {module['root_target']} 含依赖总编译量：{format_size(root_cost['total'])}")
+        print()
+    
     # 生成 HTML 文件
     html_file = args.output if args.output else "blade_dependency_graph.html"
     
     print(f"正在生成交互式 HTML：{html_file}...")
     
     try:
-        visualizer = BladeHtmlVisualizer(nodes, edges, args.target)
+        visualizer = BladeHtmlVisualizer(
+            modules_data=modules_data, target_costs=target_costs,
+            compress=args.compress, split=args.split,
+            presettle_ticks=args.presettle, canvas_threshold=args.canvas_threshold,
+            collapse_threshold=args.collapse_threshold,
+            precompute_layout=not args.browser_layout,
+            layout_cache=args.layout_cache
+        )
         visualizer.generate(html_file)
     except Exception as e:
         print(f"✗ 错误：生成 HTML 文件时出错：{e}")
@@ -147,6 +663,10 @@ def main():
     print()
     print("功能说明：")
     print("  • 点击节点查看依赖关系（红色=依赖的 target，绿色=被依赖的 target）")
+    if args.profile or args.cost_csv:
+        print("  • 紫色连线和描边为关键路径，点击节点查看开销和松弛时间")
+    if len(modules_data) > 1:
+        print("  • 使用 Previous/Next 按钮或左右方向键切换根 target")
     print("  • 拖拽节点调整位置")
     print("  • 使用搜索框过滤 target")
     print("  • 鼠标滚轮缩放，拖拽画布移动")
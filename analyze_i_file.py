@@ -1,52 +1,94 @@
 #!/usr/bin/env python3
 import sys
-import re
 import os
-from collections import defaultdict
+import csv
+import json
+import argparse
 
-def analyze_i_file(file_path):
+# Make the shared library importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analyze_includes_lib.preprocessed import (
+    scan_i_file, top_headers, header_rows, diff_i_files
+)
+
+DIFF_FIELDS = ['file', 'lines_before', 'lines_after', 'lines_delta',
+               'bytes_before', 'bytes_after', 'bytes_delta']
+
+
+def write_json(data, json_file):
+    """Writes data as JSON to json_file, or to stdout if json_file is '-'."""
+    if json_file == '-':
+        json.dump(data, sys.stdout, indent=2)
+        print()
+        return
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def write_csv(rows, csv_file, fieldnames):
+    """Writes rows as CSV to csv_file, or to stdout if csv_file is '-'."""
+    if csv_file == '-':
+        writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def analyze_i_file(file_path, top=50, json_file=None, csv_file=None):
     """
     Analyzes a preprocessed C++ file (.i) to determine which included files
     contribute the most lines of code.
+
+    The text table shows the `top` largest contributors, selected with a heap.
+    Full per-header results can be written as JSON and/or CSV. When either
+    file is '-' that output goes to stdout, status messages go to stderr and
+    the text table is omitted.
     """
+    to_stdout = '-' in (json_file, csv_file)
+    log = sys.stderr if to_stdout else sys.stdout
+
     if not os.path.exists(file_path):
-        print(f"Error: File {file_path} not found.")
+        print(f"Error: File {file_path} not found.", file=log)
         return
 
-    # Pattern to match preprocessor line markers
-    # Format: # linenum "filename" flags
-    # Example: # 1 "/usr/include/stdio.h" 1 3 4
-    # Note: Sometimes flags are absent.
-    line_marker_pattern = re.compile(r'^#\s+\d+\s+"([^"]+)"')
-
-    file_counts = defaultdict(int)
-    current_file = "unknown"
-    total_lines = 0
-    
-    print(f"Reading {file_path}...")
+    print(f"Reading {file_path}...", file=log)
 
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                total_lines += 1
-                if total_lines % 100000 == 0:
-                    print(f"Processed {total_lines} lines...", end='\r')
-                    
-                match = line_marker_pattern.match(line)
-                if match:
-                    current_file = match.group(1)
-                else:
-                    # Check if line is not just whitespace
-                    if line.strip():
-                        file_counts[current_file] += 1
+        file_counts, file_bytes, total_lines = scan_i_file(
+            file_path, show_progress=not to_stdout)
     except Exception as e:
-        print(f"\nError analyzing file: {e}")
+        print(f"\nError analyzing file: {e}", file=log)
         return
 
-    print(f"\nProcessing complete.")
+    print(f"\nProcessing complete.", file=log)
+
+    # Calculate total code lines (excluding markers and empty lines)
+    total_code_lines = sum(file_counts.values())
+
+    if json_file or csv_file:
+        rows = header_rows(file_counts, file_bytes)
+        if json_file:
+            write_json({
+                'file': file_path,
+                'total_lines': total_lines,
+                'code_lines': total_code_lines,
+                'code_bytes': sum(file_bytes.values()),
+                'headers': rows,
+            }, json_file)
+            if json_file != '-':
+                print(f"Wrote {len(rows)} headers to {json_file}", file=log)
+        if csv_file:
+            write_csv(rows, csv_file, ['file', 'lines', 'bytes', 'percent'])
+            if csv_file != '-':
+                print(f"Wrote {len(rows)} headers to {csv_file}", file=log)
 
-    # Filter out empty counts and sort
-    sorted_files = sorted(file_counts.items(), key=lambda x: x[1], reverse=True)
+    if to_stdout:
+        return
 
     print(f"\nAnalysis of {file_path}:")
     print(f"Total lines scanned: {total_lines}")
@@ -54,20 +96,101 @@ def analyze_i_file(file_path):
     print(f"{'Lines':<10} | {'%':<6} | {'File Path'}")
     print("-" * 100)
 
-    # Calculate total code lines (excluding markers and empty lines)
-    total_code_lines = sum(file_counts.values())
     if total_code_lines == 0:
         total_code_lines = 1 # Avoid division by zero
 
-    for filename, count in sorted_files[:50]:  # Show top 50
+    for filename, count in top_headers(file_counts, top):
         percentage = (count / total_code_lines) * 100
         print(f"{count:<10} | {percentage:6.2f} | {filename}")
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 analyze_i_file.py <path_to_i_file>")
+
+def print_diff(result, limit=50):
+    """Prints a diff result produced by diff_i_files as a text table."""
+    print(f"\nDiff of {result['before']} -> {result['after']}:")
+    print(f"Code lines: {result['lines_before']} -> {result['lines_after']} "
+          f"({result['lines_delta']:+d}, {result['lines_delta_percent']:+.2f}%)")
+    print(f"Code bytes: {result['bytes_before']} -> {result['bytes_after']} "
+          f"({result['bytes_delta']:+d}, {result['bytes_delta_percent']:+.2f}%)")
+    print("-" * 100)
+    print(f"{'Lines Δ':<10} | {'Bytes Δ':<12} | {'Lines':<21} | {'File Path'}")
+    print("-" * 100)
+
+    for row in result['headers'][:limit]:
+        lines = f"{row['lines_before']} -> {row['lines_after']}"
+        print(f"{row['lines_delta']:<+10d} | {row['bytes_delta']:<+12d} | "
+              f"{lines:<21} | {row['file']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze which headers contribute the most code to a "
+                    "preprocessed C++ file (.i), or compare two of them.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Top contributors of a single TU
+  %(prog)s myfile.i
+
+  # Full per-header results for further processing
+  %(prog)s myfile.i --json headers.json --csv headers.csv
+
+  # Per-header delta between two builds, machine-readable for CI
+  %(prog)s --diff before.i after.i --json diff.json --fail-above 10
+
+  # Use the per-header line counts as node sizes in the include graph
+  python3 analyze_includes.py myfile.cpp --i-file myfile.i
+        """
+    )
+    parser.add_argument("i_file", nargs='?', help="preprocessed file to analyze")
+    parser.add_argument("--diff", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two preprocessed files of the same TU")
+    parser.add_argument("--top", type=int, default=50,
+                        help="number of rows shown in the text table (default: 50)")
+    parser.add_argument("--sort", choices=['lines', 'bytes'], default='lines',
+                        help="sort diff rows by absolute change of lines or bytes "
+                             "(default: lines)")
+    parser.add_argument("--json", metavar="FILE",
+                        help="write the full results as JSON ('-' for stdout; the text "
+                             "table is then omitted)")
+    parser.add_argument("--csv", metavar="FILE",
+                        help="write the full per-header results as CSV ('-' for stdout; "
+                             "the text table is then omitted)")
+    parser.add_argument("--fail-above", type=float, metavar="PERCENT",
+                        help="exit with status 2 if total code lines grew by more "
+                             "than PERCENT")
+
+    args = parser.parse_args()
+    if args.json == '-' and args.csv == '-':
+        parser.error("--json and --csv cannot both write to stdout")
+
+    if args.diff:
+        for path in args.diff:
+            if not os.path.exists(path):
+                print(f"Error: File {path} not found.")
+                sys.exit(1)
+
+        result = diff_i_files(args.diff[0], args.diff[1], sort_by=args.sort)
+
+        if args.json:
+            write_json(result, args.json)
+        if args.csv:
+            write_csv(result['headers'], args.csv, DIFF_FIELDS)
+        if '-' not in (args.json, args.csv):
+            print_diff(result, limit=args.top)
+
+        if args.fail_above is not None and result['lines_delta_percent'] > args.fail_above:
+            print(f"\nRegression: code lines grew by {result['lines_delta_percent']:.2f}% "
+                  f"(threshold {args.fail_above:.2f}%)", file=sys.stderr)
+            sys.exit(2)
+        return
+
+    if not args.i_file:
+        parser.print_usage()
         print("Example: python3 analyze_i_file.py myfile.i")
         sys.exit(1)
-    
-    analyze_i_file(sys.argv[1])
 
+    analyze_i_file(args.i_file, top=args.top, json_file=args.json, csv_file=args.csv)
+
+
+if __name__ == "__main__":
+    main()
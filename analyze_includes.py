@@ -9,6 +9,7 @@ C++ 依赖关系分析工具 - 模块化版本
 import sys
 import os
 import argparse
+import shlex
 
 # 设置默认编码为 UTF-8
 if sys.version_info[0] >= 3:
@@ -23,8 +24,10 @@ from analyze_includes_lib import (
     DEFAULT_INCLUDE_PATHS,
     DependencyAnalyzer,
     DotVisualizer,
-    HtmlVisualizer
+    HtmlVisualizer,
+    ParseTimer
 )
+from analyze_includes_lib.preprocessed import load_line_weights
 
 
 def main():
@@ -48,6 +51,18 @@ def main():
   
   # 同时生成 HTML 和 DOT
   %(prog)s src/main.cpp --format both
+  
+  # 合并多个模块生成 DOT，并生成按目录分类汇总的 DOT
+  %(prog)s file1.cpp file2.cpp --format dot --dot-summary -o deps.dot
+  
+  # 单独编译每个头文件测量解析耗时，并以耗时作为节点权重
+  %(prog)s src/main.cpp --measure-parse-time --cxxflags="-std=c++17 -DNDEBUG"
+  
+  # 以预处理后的行数（g++ -E 输出）作为节点权重
+  %(prog)s src/main.cpp --i-file main.i
+  
+  # .i 文件在其他目录生成时，指定当时编译器的工作目录
+  %(prog)s src/main.cpp --i-file build/main.i --marker-root build
         """
     )
     
@@ -88,6 +103,114 @@ def main():
         help="输出文件名（默认：dependency_graph.html 或 dependencies.dot）"
     )
     
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="压缩 HTML 中嵌入的图数据（需要浏览器支持 DecompressionStream）"
+    )
+    
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        help="分块输出：每个源文件的数据写入 <输出文件名>_data/ 目录，页面切换模块时按需加载"
+    )
+    
+    parser.add_argument(
+        "--presettle",
+        type=int,
+        default=0,
+        metavar="N",
+        help="力导向布局首次绘制前先在后台迭代 N 次（默认：0，边迭代边绘制）"
+    )
+    
+    parser.add_argument(
+        "--canvas-threshold",
+        type=int,
+        default=3000,
+        metavar="N",
+        help="图中节点数超过 N 时使用 Canvas 代替 SVG 渲染（默认：3000）"
+    )
+    
+    parser.add_argument(
+        "--collapse-threshold",
+        type=int,
+        default=500,
+        metavar="N",
+        help="图中节点数超过 N 时初始按目录分类折叠显示，点击分类节点展开（默认：500）"
+    )
+    
+    parser.add_argument(
+        "--dot-summary",
+        action="store_true",
+        help="同时生成按目录分类汇总的 DOT 文件（<输出文件名>.clusters.dot），"
+             "分类之间的边合并并标注边数和目标文件总权重"
+    )
+    
+    parser.add_argument(
+        "--reduce",
+        action="store_true",
+        help="对依赖图做传递归约：HTML 中默认隐藏可由其他路径推出的冗余依赖（可切换显示），DOT 中直接省略"
+    )
+    
+    parser.add_argument(
+        "--browser-layout",
+        action="store_true",
+        help="不预先计算布局，由浏览器打开页面时计算（默认在生成 HTML 时计算）"
+    )
+    
+    parser.add_argument(
+        "--layout-cache",
+        default=None,
+        metavar="FILE",
+        help="预计算布局的磁盘缓存文件，再次生成相同的图时直接读取（默认：只在内存中缓存）"
+    )
+    
+    weight_group = parser.add_mutually_exclusive_group()
+    
+    weight_group.add_argument(
+        "--measure-parse-time",
+        action="store_true",
+        help="单独编译每个头文件（-fsyntax-only）测量解析耗时，并作为节点权重"
+    )
+    
+    weight_group.add_argument(
+        "--i-file",
+        action="append",
+        help="使用预处理文件（.i）中每个头文件的代码行数作为节点权重（可多次使用）"
+    )
+    
+    parser.add_argument(
+        "--marker-root",
+        metavar="DIR",
+        default=None,
+        help="生成 .i 文件时编译器的工作目录，行标记中的相对路径相对它解析（默认：当前目录）"
+    )
+    
+    parser.add_argument(
+        "--compiler",
+        default="g++",
+        help="测量解析耗时使用的编译器（默认：g++）"
+    )
+    
+    parser.add_argument(
+        "--cxxflags",
+        default="",
+        help="测量解析耗时使用的额外编译参数（默认：空）"
+    )
+    
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="测量解析耗时时同时运行的编译器数（默认：CPU 核数；以编译器的 CPU 时间计时）"
+    )
+    
+    parser.add_argument(
+        "--parse-cache",
+        default=".parse_time_cache.json",
+        help="解析耗时缓存文件（默认：.parse_time_cache.json）"
+    )
+    
     args = parser.parse_args()
     
     # 准备 include 路径
@@ -130,21 +253,68 @@ def main():
     print(f"\n总共成功分析了 {len(modules_data)} 个模块。")
     print()
     
+    # 测量头文件解析耗时（如果需要）
+    node_weights = None
+    weight_unit = 'B'
+    if args.measure_parse_time:
+        source_paths = {os.path.abspath(m['source_file']) for m in modules_data}
+        headers = set()
+        for module in modules_data:
+            headers.update(n for n in module['nodes'] if n not in source_paths)
+        
+        flags = shlex.split(args.cxxflags)
+        for path in (args.include or []):
+            flags.append(f"-I{path}")
+        
+        print(f"正在测量 {len(headers)} 个头文件的解析耗时（编译器：{args.compiler}）...")
+        timer = ParseTimer(
+            compiler=args.compiler,
+            flags=flags,
+            jobs=args.jobs,
+            cache_file=args.parse_cache
+        )
+        node_weights = timer.measure(headers, analyzer)
+        weight_unit = 's'
+        
+        measured = {header: elapsed for header, elapsed in node_weights.items() if elapsed is not None}
+        failed = len(node_weights) - len(measured)
+        print(f"✓ 完成 {len(measured)} 个头文件的测量" +
+              (f"，{failed} 个无法单独编译（图中标记为编译失败）" if failed else ""))
+        slowest = sorted(measured.items(), key=lambda x: x[1], reverse=True)[:10]
+        for header, elapsed in slowest:
+            print(f"  {elapsed * 1000:8.1f}ms  {header}")
+        print()
+    elif args.i_file:
+        print(f"正在读取 {len(args.i_file)} 个预处理文件的头文件行数...")
+        node_weights = load_line_weights(args.i_file, marker_root=args.marker_root)
+        weight_unit = 'lines'
+        print(f"✓ 读取了 {len(node_weights)} 个头文件的预处理行数")
+        print()
+    
     # 生成 DOT 文件（如果需要）
     if args.format in ['dot', 'both'] and modules_data:
-        module = modules_data[0]
         dot_file = args.output if args.output and args.format == 'dot' else "dependencies.dot"
         
-        print(f"正在生成 DOT 文件：{dot_file}（仅第一个模块）...")
+        if len(modules_data) > 1:
+            print(f"正在生成 DOT 文件：{dot_file}（合并 {len(modules_data)} 个模块）...")
+        else:
+            print(f"正在生成 DOT 文件：{dot_file}...")
         
-        visualizer = DotVisualizer(
-            nodes=module['nodes'],
-            edges=module['edges'],
-            source_file=module['source_file']
+        visualizer = DotVisualizer.from_modules(
+            modules_data,
+            node_weights=node_weights,
+            weight_unit=weight_unit,
+            reduce=args.reduce
         )
         visualizer.generate(dot_file)
         
         print(f"✓ DOT 文件已生成：{dot_file}")
+        if args.reduce:
+            print(f"  传递归约去掉了 {visualizer.redundant_count} 条冗余依赖")
+        if args.dot_summary:
+            summary_file = os.path.splitext(dot_file)[0] + ".clusters.dot"
+            visualizer.generate_summary(summary_file)
+            print(f"✓ 分类汇总 DOT 文件已生成：{summary_file}")
         print(f"  运行 'dot -Tpng {dot_file} -o dependency_graph.png' 生成 PNG 图片")
         print(f"  或运行 'dot -Tsvg {dot_file} -o dependency_graph.svg' 生成 SVG 图片")
         print()
@@ -155,10 +325,18 @@ def main():
         
         print(f"正在生成交互式 HTML：{html_file}...")
         
-        visualizer = HtmlVisualizer(modules_data)
+        visualizer = HtmlVisualizer(
+            modules_data, node_weights=node_weights, weight_unit=weight_unit,
+            compress=args.compress, split=args.split,
+            presettle_ticks=args.presettle, canvas_threshold=args.canvas_threshold,
+            collapse_threshold=args.collapse_threshold, reduce=args.reduce,
+            precompute_layout=not args.browser_layout, layout_cache=args.layout_cache
+        )
         visualizer.generate(html_file)
         
         print(f"✓ 交互式 HTML 已生成：{html_file}")
+        if args.reduce:
+            print(f"  传递归约去掉了 {visualizer.redundant_count} 条冗余依赖（页面中可切换显示）")
         print()
         print("功能说明：")
         print("  • 点击节点查看依赖关系（红色=依赖的文件，绿色=被依赖的文件）")
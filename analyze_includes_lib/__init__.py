@@ -5,23 +5,50 @@ C++ 依赖关系分析工具库
 __version__ = "2.0.0"
 __author__ = "rufeng"
 
-from .config import DEFAULT_INCLUDE_PATHS, INCLUDE_PATTERN
+from .config import DEFAULT_INCLUDE_PATHS, INCLUDE_PATTERN, LINE_MARKER_PATTERN
 from .analyzer import DependencyAnalyzer
 from .dot_visualizer import DotVisualizer
 from .html_visualizer import HtmlVisualizer
 from .blade_parser import BladeParser, find_blade_root
+from .blade_target import TargetRecord
+from .blade_cache import BuildParseCache
+from .blade_glob import DirectoryIndex
+from .blade_index import BladeTargetIndex
+from .blade_rdeps import BladeReverseIndex
+from .blade_profile import build_profile, load_cost_csv
+from .blade_deps_check import BladeDepsChecker
+from .blade_cost import BladeCostEstimator
+from .blade_history import BladeRevisionParser, GitObjectReader, dependency_history, list_revisions
 from .blade_visualizer import BladeHtmlVisualizer
+from .parse_timer import ParseTimer
+from .graph_layout import LayoutCache
 from .utils import get_file_size, format_size, simplify_path
 
 __all__ = [
     'DEFAULT_INCLUDE_PATHS',
     'INCLUDE_PATTERN',
+    'LINE_MARKER_PATTERN',
     'DependencyAnalyzer',
     'DotVisualizer',
     'HtmlVisualizer',
     'BladeParser',
+    'TargetRecord',
+    'BuildParseCache',
+    'DirectoryIndex',
+    'BladeTargetIndex',
+    'BladeReverseIndex',
+    'BladeDepsChecker',
+    'BladeCostEstimator',
+    'BladeRevisionParser',
+    'GitObjectReader',
+    'dependency_history',
+    'list_revisions',
+    'build_profile',
+    'load_cost_csv',
     'BladeHtmlVisualizer',
     'find_blade_root',
+    'ParseTimer',
+    'LayoutCache',
     'get_file_size',
     'format_size',
     'simplify_path',
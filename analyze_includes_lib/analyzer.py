@@ -2,6 +2,7 @@
 依赖分析器：负责解析C++文件的依赖关系
 """
 import os
+from collections import deque
 from .config import INCLUDE_PATTERN
 
 
@@ -12,6 +13,9 @@ class DependencyAnalyzer:
         """
         初始化分析器
         
+        同一个分析器分析多个源文件时，共享头文件的 #include 解析结果和
+        路径查找结果，公共头文件只读取和查找一次。
+        
         Args:
             include_paths: include 搜索路径列表
             max_depth: 最大递归深度
@@ -20,6 +24,8 @@ class DependencyAnalyzer:
         self.include_paths = include_paths
         self.max_depth = max_depth
         self.deep_system = deep_system
+        self._includes_cache = {}  # 文件路径 -> [(include 名称, 是否为系统头文件)]
+        self._resolve_cache = {}   # (include 名称, 是否为系统头文件, 当前目录) -> 绝对路径或 None
     
     def find_file(self, filename, is_system, current_dir):
         """
@@ -33,6 +39,18 @@ class DependencyAnalyzer:
         Returns:
             文件的绝对路径，如果找不到返回 None
         """
+        # <> 包含的查找结果与当前目录无关
+        key = (filename, is_system, None if is_system else current_dir)
+        try:
+            return self._resolve_cache[key]
+        except KeyError:
+            pass
+        result = self._find_file(filename, is_system, current_dir)
+        self._resolve_cache[key] = result
+        return result
+    
+    def _find_file(self, filename, is_system, current_dir):
+        """在文件系统中查找头文件，不使用缓存"""
         # 如果是引号包含，先在当前目录查找
         if not is_system:
             candidate = os.path.join(current_dir, filename)
@@ -47,6 +65,34 @@ class DependencyAnalyzer:
                 
         return None
     
+    def get_includes(self, path):
+        """
+        读取文件中的 #include 语句（带缓存）
+        
+        Args:
+            path: 文件的绝对路径
+            
+        Returns:
+            [(include 名称, 是否为系统头文件), ...]，无法读取时返回空列表
+        """
+        includes = self._includes_cache.get(path)
+        if includes is not None:
+            return includes
+        
+        includes = []
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    match = INCLUDE_PATTERN.match(line)
+                    if match:
+                        includes.append((match.group(2), match.group(1) != '"'))
+        except OSError:
+            # 忽略无法读取的文件
+            pass
+        
+        self._includes_cache[path] = includes
+        return includes
+    
     def analyze(self, start_file):
         """
         分析指定文件的依赖关系
@@ -59,13 +105,13 @@ class DependencyAnalyzer:
             - nodes: 所有文件节点的集合
             - edges: 依赖关系边的列表 [(src, dst), ...]
         """
-        queue = [(os.path.abspath(start_file), 0)]
+        queue = deque([(os.path.abspath(start_file), 0)])
         visited = set()
         edges = []
         nodes = set()
         
         while queue:
-            current_path, depth = queue.pop(0)
+            current_path, depth = queue.popleft()
             
             if current_path in visited:
                 continue
@@ -83,26 +129,15 @@ class DependencyAnalyzer:
             current_dir = os.path.dirname(current_path)
             
             # 解析文件中的 #include 语句
-            try:
-                with open(current_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        match = INCLUDE_PATTERN.match(line)
-                        if match:
-                            is_quote = (match.group(1) == '"')
-                            inc_file = match.group(2)
-                            
-                            full_path = self.find_file(inc_file, not is_quote, current_dir)
-                            
-                            if full_path:
-                                edges.append((current_path, full_path))
-                                nodes.add(full_path)
-                                
-                                if full_path not in visited:
-                                    queue.append((full_path, depth + 1))
-                                    
-            except Exception as e:
-                # 忽略无法读取的文件
-                pass
+            for inc_file, is_system in self.get_includes(current_path):
+                full_path = self.find_file(inc_file, is_system, current_dir)
+                
+                if full_path:
+                    edges.append((current_path, full_path))
+                    nodes.add(full_path)
+                    
+                    if full_path not in visited:
+                        queue.append((full_path, depth + 1))
 
         return nodes, edges
 
@@ -0,0 +1,266 @@
+"""
+BUILD 文件静态解析：基于 ast 提取 target 定义，不执行 BUILD 文件中的代码
+"""
+import os
+import ast
+import glob as _glob
+
+
+class _Unknown:
+    """表示无法静态求值的表达式"""
+
+
+UNKNOWN = _Unknown()
+
+
+class _PartialList(list):
+    """只有部分元素能静态求值的列表，保存能求值的元素"""
+
+# 需要转换为字符串列表的规则参数
+_LIST_ARGS = ('deps', 'srcs', 'hdrs')
+
+
+class BuildFileEvaluator:
+    """
+    BUILD 文件的静态求值器
+
+    只支持 BUILD 文件中常见的表达式：字面量（字符串、数字、列表、元组、字典）、
+    列表/字符串拼接（+）、顶层变量引用以及 glob()。其他表达式求值为 UNKNOWN，
+    不会导致整个文件解析失败。列表按元素求值：无法求值的元素（或 + 中无法求值的
+    一侧）被丢弃，结果标记为不完整，使用它的 target 会在 'unresolved' 中记录参数名。
+    """
+
+    def __init__(self, build_dir, glob_func=None):
+        """
+        初始化求值器
+
+        Args:
+            build_dir: BUILD 文件所在目录（glob 的基准目录）
+            glob_func: 可选的 glob 实现 glob_func(build_dir, includes, excludes)，
+                       默认直接扫描文件系统
+        """
+        self.build_dir = build_dir
+        self.glob_func = glob_func or _filesystem_glob
+        self.variables = {}
+        self.targets = {}
+
+    def evaluate(self, node):
+        """对表达式节点求值，无法求值时返回 UNKNOWN"""
+        node_type = type(node)
+        if node_type is ast.Constant:
+            return node.value
+        if node_type is ast.List or node_type is ast.Tuple:
+            values = [self.evaluate(elt) for elt in node.elts]
+            known = [v for v in values if v is not UNKNOWN]
+            if len(known) < len(values):
+                return _PartialList(known)
+            return values
+        if node_type is ast.Name:
+            return self.variables.get(node.id, UNKNOWN)
+        if node_type is ast.BinOp:
+            if type(node.op) is not ast.Add:
+                return UNKNOWN
+            return _concat(self.evaluate(node.left), self.evaluate(node.right))
+        if node_type is ast.Call:
+            if _call_name(node) == 'glob':
+                return self._evaluate_glob(node)
+            return UNKNOWN
+        if node_type is ast.Dict:
+            result = {}
+            for key, value in zip(node.keys, node.values):
+                if key is None:
+                    return UNKNOWN
+                k = self.evaluate(key)
+                v = self.evaluate(value)
+                if k is UNKNOWN or v is UNKNOWN:
+                    return UNKNOWN
+                try:
+                    result[k] = v
+                except TypeError:
+                    return UNKNOWN
+            return result
+        return UNKNOWN
+
+    def _evaluate_glob(self, node):
+        """求值 glob(include, exclude=[...])"""
+        includes = self.evaluate(node.args[0]) if node.args else []
+        excludes = []
+        for keyword in node.keywords:
+            if keyword.arg == 'include':
+                includes = self.evaluate(keyword.value)
+            elif keyword.arg == 'exclude':
+                excludes = self.evaluate(keyword.value)
+        if isinstance(includes, str):
+            includes = [includes]
+        if isinstance(excludes, str):
+            excludes = [excludes]
+        if not isinstance(includes, list) or not isinstance(excludes, list):
+            return UNKNOWN
+        # 非字符串的模式（如 glob(["*.cc", 3])）无法匹配，丢弃后结果标记为不完整
+        include_patterns = [p for p in includes if isinstance(p, str)]
+        exclude_patterns = [p for p in excludes if isinstance(p, str)]
+        matched = self.glob_func(self.build_dir, include_patterns, exclude_patterns)
+        if (len(include_patterns) < len(includes) or len(exclude_patterns) < len(excludes)
+                or isinstance(includes, _PartialList) or isinstance(excludes, _PartialList)):
+            return _PartialList(matched)
+        return matched
+
+    def visit_statements(self, statements):
+        """依次处理语句：记录顶层赋值，提取 target 调用"""
+        for stmt in statements:
+            stmt_type = type(stmt)
+            if stmt_type is ast.Expr:
+                if type(stmt.value) is ast.Call:
+                    self._visit_call(stmt.value)
+            elif stmt_type is ast.Assign:
+                value = self.evaluate(stmt.value)
+                for target in stmt.targets:
+                    if type(target) is ast.Name:
+                        self.variables[target.id] = value
+            elif stmt_type is ast.AugAssign:
+                if type(stmt.target) is ast.Name:
+                    self._visit_aug_assign(stmt)
+            elif stmt_type in (ast.If, ast.For, ast.While, ast.With):
+                # 无法静态判断条件，两个分支中的 target 都收集
+                self.visit_statements(stmt.body)
+                self.visit_statements(getattr(stmt, 'orelse', []))
+            elif stmt_type is ast.Try:
+                self.visit_statements(stmt.body)
+                for handler in stmt.handlers:
+                    self.visit_statements(handler.body)
+                self.visit_statements(stmt.orelse)
+                self.visit_statements(stmt.finalbody)
+
+    def _visit_aug_assign(self, stmt):
+        """处理 X += [...]"""
+        name = stmt.target.id
+        if type(stmt.op) is not ast.Add:
+            self.variables[name] = UNKNOWN
+            return
+        current = self.variables.get(name, UNKNOWN)
+        self.variables[name] = _concat(current, self.evaluate(stmt.value))
+
+    def _visit_call(self, call):
+        """提取一个 target 调用，没有 name 参数的调用（load、config_items 等）会被忽略"""
+        rule = _call_name(call)
+        if rule is None:
+            return
+
+        args = {}
+        unresolved = []
+        for keyword in call.keywords:
+            if keyword.arg == 'name':
+                args['name'] = self.evaluate(keyword.value)
+            elif keyword.arg in _LIST_ARGS:
+                args[keyword.arg], complete = self._string_list(keyword.value)
+                if not complete:
+                    unresolved.append(keyword.arg)
+
+        name = args.get('name')
+        if not isinstance(name, str):
+            return
+
+        self.targets[name] = {
+            'type': rule,
+            'name': name,
+            'deps': args.get('deps', []),
+            'srcs': args.get('srcs', []),
+            'hdrs': args.get('hdrs', []),
+            'unresolved': unresolved,
+        }
+
+    def _string_list(self, node):
+        """
+        把参数求值为字符串列表，无法求值的部分被丢弃
+
+        Returns:
+            (字符串列表, 是否完整求值) 元组
+        """
+        value = self.evaluate(node)
+        if isinstance(value, str):
+            return [value], True
+        if isinstance(value, list):
+            strings = [v for v in value if isinstance(v, str)]
+            return strings, len(strings) == len(value) and not isinstance(value, _PartialList)
+        return [], False
+
+
+def _concat(left, right):
+    """
+    求值 left + right
+
+    列表与无法求值的值相加时保留列表中已知的元素，结果标记为不完整；
+    其他情况下任一侧无法求值则结果无法求值。
+    """
+    if left is UNKNOWN or right is UNKNOWN:
+        known = right if left is UNKNOWN else left
+        return _PartialList(known) if isinstance(known, list) else UNKNOWN
+    try:
+        result = left + right
+    except TypeError:
+        return UNKNOWN
+    if isinstance(left, _PartialList) or isinstance(right, _PartialList):
+        return _PartialList(result)
+    return result
+
+
+def _call_name(call):
+    """返回调用的函数名（如 cc_library），无法确定时返回 None"""
+    func = call.func
+    if type(func) is ast.Name:
+        return func.id
+    if type(func) is ast.Attribute:
+        return func.attr
+    return None
+
+
+def _filesystem_glob(build_dir, includes, excludes):
+    """直接扫描文件系统实现 glob，返回相对 build_dir、以 '/' 分隔的排序路径列表"""
+    def rel(path):
+        return os.path.relpath(path, build_dir).replace(os.sep, '/')
+
+    matched = set()
+    for pattern in includes:
+        for path in _glob.glob(os.path.join(build_dir, pattern), recursive=True):
+            if os.path.isfile(path):
+                matched.add(rel(path))
+    for pattern in excludes:
+        for path in _glob.glob(os.path.join(build_dir, pattern), recursive=True):
+            matched.discard(rel(path))
+    return sorted(matched)
+
+
+def parse_build_content(content, build_file, glob_func=None):
+    """
+    静态解析 BUILD 文件内容
+
+    Args:
+        content: BUILD 文件内容
+        build_file: BUILD 文件路径（用于错误信息和 glob 的基准目录）
+        glob_func: 可选的 glob 实现，见 BuildFileEvaluator
+
+    Returns:
+        字典 {target 名称: {'type', 'name', 'deps', 'srcs', 'hdrs', 'unresolved'}}，
+        'unresolved' 为无法完整求值的参数名列表（如 ['deps']）
+
+    Raises:
+        SyntaxError: BUILD 文件不是合法的 Python 语法
+    """
+    tree = ast.parse(content, filename=build_file)
+    evaluator = BuildFileEvaluator(os.path.dirname(build_file), glob_func)
+    evaluator.visit_statements(tree.body)
+    return evaluator.targets
+
+
+def warn_unresolved(parsed, location):
+    """
+    对无法完整求值的 deps/srcs/hdrs 打印警告
+
+    Args:
+        parsed: parse_build_content 的返回值
+        location: 警告中显示的 BUILD 文件位置
+    """
+    for name, info in parsed.items():
+        if info['unresolved']:
+            args = '/'.join(info['unresolved'])
+            print(f"⚠ 警告：{location} 中 {name} 的 {args} 无法完整静态求值，只保留了能确定的部分")
@@ -0,0 +1,139 @@
+"""
+BUILD 文件解析缓存：将每个 BUILD 文件的解析结果持久化到磁盘，文件未变化时直接复用
+"""
+import os
+import sys
+import marshal
+from .blade_glob import DirectoryIndex
+from .blade_target import build_target_records
+
+# 缓存格式版本，格式变化时递增以丢弃旧缓存
+CACHE_VERSION = 2
+
+# 默认的缓存文件名（位于 BLADE_ROOT 下）
+DEFAULT_CACHE_FILE = '.blade_parse_cache'
+
+# 缓存中保存的 target 字段（build_file、resolved_deps 可由路径和 deps 推出，不保存）
+_TARGET_FIELDS = ('type', 'deps', 'srcs', 'hdrs')
+
+
+class BuildParseCache:
+    """
+    BUILD 文件解析结果的磁盘缓存
+
+    每个条目以 BUILD 文件相对 BLADE_ROOT 的路径为键，记录 (mtime_ns, size)
+    和内容哈希。mtime 和大小不变时直接命中；mtime 变化但内容哈希相同时
+    （如 git checkout 后）同样命中并更新 mtime。使用 glob() 的 BUILD 文件
+    还记录匹配时列出的目录及其 mtime，这些目录有变化时视为未命中。
+    glob() 使用的目录列表缓存（DirectoryIndex）保存在同一个文件中。
+    使用 marshal 序列化，加载速度快且文件紧凑。
+    """
+
+    def __init__(self, blade_root, cache_file=None):
+        """
+        初始化缓存
+
+        Args:
+            blade_root: BLADE_ROOT 所在目录
+            cache_file: 缓存文件路径，默认为 BLADE_ROOT 下的 .blade_parse_cache
+        """
+        self.blade_root = os.path.abspath(blade_root)
+        self.cache_file = cache_file or os.path.join(self.blade_root, DEFAULT_CACHE_FILE)
+        self.entries = {}  # rel_path -> (mtime_ns, size, digest, {name: (type, deps, srcs, hdrs)}, globs)
+        self.directories = DirectoryIndex(self.blade_root)
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """读取缓存文件，版本或 Python 版本不匹配时忽略"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if (not isinstance(data, dict)
+                or data.get('version') != CACHE_VERSION
+                or data.get('python') != list(sys.version_info[:2])):
+            return
+        self.entries = data.get('entries', {})
+        self.directories = DirectoryIndex(self.blade_root, data.get('dirs', {}))
+
+    def save(self):
+        """有新条目时原子地写入缓存文件"""
+        if not self.dirty and not self.directories.dirty:
+            return
+        tmp_file = f"{self.cache_file}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_file, 'wb') as f:
+                marshal.dump({
+                    'version': CACHE_VERSION,
+                    'python': list(sys.version_info[:2]),
+                    'entries': self.entries,
+                    'dirs': self.directories.entries,
+                }, f)
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+            self.directories.dirty = False
+        except OSError as e:
+            print(f"⚠ 警告：无法写入解析缓存 {self.cache_file}：{e}")
+
+    def _key(self, build_file):
+        return os.path.relpath(build_file, self.blade_root)
+
+    def get(self, build_file, stamp):
+        """
+        按 (mtime_ns, size) 查找缓存
+
+        Returns:
+            (target 字典, glob 用到的目录) 元组，未命中时返回 None
+        """
+        entry = self.entries.get(self._key(build_file))
+        if (entry is None or (entry[0], entry[1]) != stamp
+                or not self.directories.unchanged(entry[4])):
+            return None
+        self.hits += 1
+        return self._expand(build_file, entry[3]), entry[4]
+
+    def get_by_digest(self, build_file, stamp, digest):
+        """
+        mtime 变化时按内容哈希查找缓存，命中时更新记录的 mtime
+
+        Returns:
+            (target 字典, glob 用到的目录) 元组，未命中时返回 None
+        """
+        key = self._key(build_file)
+        entry = self.entries.get(key)
+        if entry is None or entry[2] != digest or not self.directories.unchanged(entry[4]):
+            self.misses += 1
+            return None
+        self.entries[key] = (stamp[0], stamp[1], digest, entry[3], entry[4])
+        self.dirty = True
+        self.hits += 1
+        return self._expand(build_file, entry[3]), entry[4]
+
+    def put(self, build_file, stamp, digest, targets, globs=()):
+        """
+        保存一个 BUILD 文件的解析结果
+
+        Args:
+            globs: glob() 匹配时列出的目录 ((rel_dir, mtime_ns), ...)
+        """
+        compact = {
+            name: tuple(info[field] for field in _TARGET_FIELDS)
+            for name, info in targets.items()
+        }
+        self.entries[self._key(build_file)] = (stamp[0], stamp[1], digest, compact, globs)
+        self.dirty = True
+
+    def _expand(self, build_file, compact):
+        """将紧凑格式还原为 BladeParser 使用的 target 记录"""
+        rel_dir = os.path.relpath(os.path.dirname(build_file), self.blade_root)
+        parsed = {
+            name: dict(zip(_TARGET_FIELDS, values))
+            for name, values in compact.items()
+        }
+        return build_target_records(build_file, rel_dir, parsed)
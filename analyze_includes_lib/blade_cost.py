@@ -0,0 +1,172 @@
+"""
+Blade target 编译开销估算：以源文件 include 闭包的总字节数（近似预处理后的大小）
+衡量每个 target 的编译量，并沿依赖关系向上汇总
+"""
+import os
+from .analyzer import DependencyAnalyzer
+from .config import DEFAULT_INCLUDE_PATHS, SOURCE_EXTENSIONS
+from .graph_reduce import closure_weights
+from .utils import get_file_size
+
+
+class BladeCostEstimator:
+    """Blade target 编译开销估算器"""
+
+    def __init__(self, blade_root, include_paths=None, deep_system=True):
+        """
+        初始化估算器
+
+        所有 target 共享同一个 DependencyAnalyzer、头文件大小缓存和 include 关系缓存，
+        公共头文件只读取和查找一次。
+
+        Args:
+            blade_root: BLADE_ROOT 所在目录
+            include_paths: 额外的 include 搜索路径；BLADE_ROOT、BLADE_ROOT/build64_release
+                           和默认的系统 include 路径总是在搜索路径中
+            deep_system: 是否展开系统头文件的 include（默认展开，使 <vector> 等计入真实开销）
+        """
+        self.blade_root = os.path.abspath(blade_root)
+        paths = [self.blade_root, os.path.join(self.blade_root, 'build64_release')]
+        paths += [os.path.abspath(path) for path in include_paths or []]
+        paths += [path for path in DEFAULT_INCLUDE_PATHS if os.path.isabs(path)]
+        self.analyzer = DependencyAnalyzer(paths, deep_system=deep_system)
+        self.deep_system = deep_system
+        self._successors = {}     # 文件 -> [直接 include 的文件]
+        self._file_costs = {}     # 文件 -> 闭包总字节数
+        self._sizes = {}          # 文件 -> 字节数
+
+    @property
+    def scanned_files(self):
+        """已读取过 include 的文件数"""
+        return len(self._successors)
+
+    def _includes(self, path):
+        """返回文件直接 include 的文件（带缓存）"""
+        result = self._successors.get(path)
+        if result is None:
+            if path.startswith('/usr/') and not self.deep_system:
+                result = []
+            else:
+                current_dir = os.path.dirname(path)
+                result = []
+                for inc_file, is_system in self.analyzer.get_includes(path):
+                    full_path = self.analyzer.find_file(inc_file, is_system, current_dir)
+                    if full_path:
+                        result.append(full_path)
+            self._successors[path] = result
+        return result
+
+    def _size(self, path):
+        """返回文件大小（带缓存）"""
+        size = self._sizes.get(path)
+        if size is None:
+            size = self._sizes[path] = get_file_size(path)
+        return size
+
+    def file_costs(self, paths):
+        """
+        批量计算源文件 include 闭包（包含自身）的总字节数
+
+        先找出从这些文件可达的整个 include 图，再用 closure_weights 一次求出图中所有文件
+        的闭包字节数并缓存，不为每个文件保留闭包。请求的文件都已缓存时直接返回。
+
+        Args:
+            paths: 源文件绝对路径的可迭代对象
+
+        Returns:
+            字典 {path: 字节数}
+        """
+        paths = list(paths)
+        if all(path in self._file_costs for path in paths):
+            return {path: self._file_costs[path] for path in paths}
+
+        index = {}
+        files = []
+        stack = list(paths)
+        while stack:
+            path = stack.pop()
+            if path in index:
+                continue
+            index[path] = len(files)
+            files.append(path)
+            stack.extend(self._includes(path))
+
+        links = [
+            (index[path], index[child])
+            for path in files
+            for child in self._includes(path)
+        ]
+        weights = [self._size(path) for path in files]
+        for path, cost in zip(files, closure_weights(len(files), links, weights)):
+            self._file_costs[path] = cost
+        return {path: self._file_costs[path] for path in paths}
+
+    def file_cost(self, path):
+        """
+        计算单个源文件 include 闭包（包含自身）的总字节数
+
+        Args:
+            path: 源文件绝对路径
+
+        Returns:
+            字节数
+        """
+        return self.file_costs([path])[path]
+
+    def _source_files(self, target_spec, target_info):
+        """返回 target 中编译单元的绝对路径"""
+        if target_info.get('external'):
+            return []
+        directory = os.path.join(self.blade_root, target_spec.rsplit(':', 1)[0])
+        return [
+            os.path.abspath(os.path.join(directory, src))
+            for src in target_info.get('srcs', [])
+            if src.endswith(SOURCE_EXTENSIONS)
+        ]
+
+    def target_cost(self, target_spec, target_info):
+        """
+        计算 target 自身的编译量：每个源文件是一个编译单元，开销为各自闭包字节数之和
+
+        Args:
+            target_spec: target 规范
+            target_info: target 信息
+
+        Returns:
+            字节数，外部依赖和只有头文件的 target 为 0
+        """
+        paths = self._source_files(target_spec, target_info)
+        costs = self.file_costs(paths)
+        return sum(costs[path] for path in paths)
+
+    def rollup(self, nodes, edges):
+        """
+        计算每个 target 自身的编译量以及包含所有传递依赖的总编译量
+
+        每个依赖 target 只计算一次（同一个 target 在构建中只编译一次）。
+
+        Args:
+            nodes: target 节点字典 {target_spec: target_info}
+            edges: 依赖关系边列表 [(src_spec, dst_spec), ...]
+
+        Returns:
+            字典 {target_spec: {'own': 字节数, 'total': 字节数}}
+        """
+        # 所有 target 的编译单元一起计算，整个 include 图只求一次闭包字节数
+        self.file_costs(
+            path for spec, info in nodes.items() for path in self._source_files(spec, info)
+        )
+        specs = list(nodes)
+        own = [self.target_cost(spec, nodes[spec]) for spec in specs]
+
+        index = {spec: i for i, spec in enumerate(specs)}
+        links = [
+            (index[src], index[dst])
+            for src, dst in edges
+            if src in index and dst in index
+        ]
+        totals = closure_weights(len(specs), links, own)
+        return {
+            spec: {'own': own[i], 'total': totals[i]}
+            for i, spec in enumerate(specs)
+        }
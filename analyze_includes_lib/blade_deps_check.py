@@ -0,0 +1,204 @@
+"""
+Blade 依赖声明检查：结合源文件的 include 关系与 BUILD 中声明的 deps，
+找出缺失的依赖（include 了其他 target 的头文件却没有声明依赖）和多余的依赖
+（声明了依赖但从未 include 其头文件）
+"""
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from .analyzer import DependencyAnalyzer
+from .config import BLADE_SKIP_DIRS, HEADER_EXTENSIONS
+
+# 每个工作进程中复用的分析器，进程处理的所有 target 共享其头文件解析和路径查找缓存
+_WORKER_ANALYZER = None
+
+
+def _init_worker(include_paths):
+    """工作进程初始化：创建共享的分析器"""
+    global _WORKER_ANALYZER
+    _WORKER_ANALYZER = DependencyAnalyzer(include_paths, max_depth=1)
+
+
+def _scan_targets(jobs):
+    """
+    扫描一批 target 的源文件，返回它们直接 include 的文件（在子进程中运行）
+
+    Args:
+        jobs: [(target_spec, [源文件绝对路径, ...]), ...]
+
+    Returns:
+        [(target_spec, {被 include 的文件绝对路径}), ...]
+    """
+    analyzer = _WORKER_ANALYZER
+    results = []
+    for spec, files in jobs:
+        included = set()
+        for path in files:
+            current_dir = os.path.dirname(path)
+            for inc_file, is_system in analyzer.get_includes(path):
+                full_path = analyzer.find_file(inc_file, is_system, current_dir)
+                if full_path:
+                    included.add(full_path)
+        results.append((spec, included))
+    return results
+
+
+class BladeDepsChecker:
+    """基于 include 关系的 Blade 依赖声明检查器"""
+
+    def __init__(self, blade_root, targets, include_paths=None, jobs=None):
+        """
+        初始化检查器
+
+        Args:
+            blade_root: BLADE_ROOT 所在目录
+            targets: 全局 target 表 {target_spec: target_info}（如 BladeTargetIndex.targets），
+                     target_info 需包含 resolved_deps、srcs、hdrs
+            include_paths: 额外的 include 搜索路径，BLADE_ROOT 和 BLADE_ROOT/build64_release
+                           总是在搜索路径中（Blade 的 include 以项目根目录为基准）
+            jobs: 并行扫描的进程数，默认为 CPU 核数
+        """
+        self.blade_root = os.path.abspath(blade_root)
+        self.targets = targets
+        self.include_paths = [
+            self.blade_root,
+            os.path.join(self.blade_root, 'build64_release'),
+        ] + [os.path.abspath(path) for path in include_paths or []]
+        self.jobs = jobs or os.cpu_count() or 1
+        self.header_owners = self._build_header_owners()
+
+    def _build_header_owners(self):
+        """
+        建立头文件到所属 target 的映射
+
+        srcs/hdrs 中的头文件归属于列出它的 target；proto_library 还拥有生成的 .pb.h。
+
+        Returns:
+            字典 {相对 BLADE_ROOT 的头文件路径: [target_spec]}
+        """
+        owners = defaultdict(list)
+        for spec, info in self.targets.items():
+            rel_dir = spec.rsplit(':', 1)[0]
+            for path in info.get('hdrs', []) + info.get('srcs', []):
+                rel_path = os.path.normpath(os.path.join(rel_dir, path))
+                if rel_path.endswith(HEADER_EXTENSIONS):
+                    owners[rel_path].append(spec)
+                elif info.get('type') == 'proto_library' and rel_path.endswith('.proto'):
+                    owners[rel_path[:-len('.proto')] + '.pb.h'].append(spec)
+        return owners
+
+    def _relative_header(self, path):
+        """将 include 到的绝对路径转换为相对 BLADE_ROOT 的路径，项目外的文件返回 None"""
+        rel_path = os.path.relpath(path, self.blade_root)
+        if rel_path.startswith('..'):
+            return None
+        # 生成的文件（如 build64_release/a/b.pb.h）按源码目录归属
+        parts = rel_path.split(os.sep, 1)
+        if len(parts) == 2 and parts[0] in BLADE_SKIP_DIRS:
+            rel_path = parts[1]
+        return rel_path
+
+    def _source_files(self, spec, info):
+        """返回 target 中需要扫描的 C/C++ 源文件和头文件绝对路径"""
+        directory = os.path.join(self.blade_root, spec.rsplit(':', 1)[0])
+        return [
+            os.path.join(directory, path)
+            for path in info.get('srcs', []) + info.get('hdrs', [])
+            if not path.endswith('.proto')
+        ]
+
+    def scan(self, specs):
+        """
+        并行扫描 target 的源文件
+
+        按目录分批提交，同一目录下的 target 在同一进程中扫描，共享的头文件只解析一次。
+
+        Args:
+            specs: 要扫描的 target 规范列表
+
+        Returns:
+            字典 {target_spec: {被直接 include 的相对路径}}
+        """
+        jobs = []
+        for spec in sorted(specs):
+            info = self.targets.get(spec)
+            if info is None or info.get('external'):
+                continue
+            files = self._source_files(spec, info)
+            if files:
+                jobs.append((spec, files))
+
+        batch_size = max(1, min(64, len(jobs) // (self.jobs * 4) or 1))
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+        if self.jobs == 1 or len(batches) <= 1:
+            _init_worker(self.include_paths)
+            results = map(_scan_targets, batches)
+            return self._collect(results)
+
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(self.include_paths,)) as executor:
+            return self._collect(executor.map(_scan_targets, batches))
+
+    def _collect(self, batch_results):
+        """将扫描结果转换为相对 BLADE_ROOT 的路径"""
+        included = {}
+        for results in batch_results:
+            for spec, paths in results:
+                rel_paths = set()
+                for path in paths:
+                    rel_path = self._relative_header(path)
+                    if rel_path is not None:
+                        rel_paths.add(rel_path)
+                included[spec] = rel_paths
+        return included
+
+    def check(self, specs):
+        """
+        检查一组 target 的依赖声明
+
+        只有拥有头文件的内部 target 才参与多余依赖的判断；外部依赖（#xxx）
+        和不属于任何 target 的头文件不会被报告。头文件被多个 target 列出且一个都
+        没有声明时，无法确定应当依赖哪一个，放入 'ambiguous' 并列出所有候选。
+
+        Args:
+            specs: 要检查的 target 规范列表
+
+        Returns:
+            字典 {target_spec: {'missing': {dep_spec: [头文件, ...]},
+                                'ambiguous': {头文件: [候选 dep_spec, ...]},
+                                'unused': [dep_spec, ...]}}，
+            只包含有问题的 target
+        """
+        included = self.scan(specs)
+        header_owning_targets = set()
+        for owners in self.header_owners.values():
+            header_owning_targets.update(owners)
+
+        report = {}
+        for spec, headers in included.items():
+            declared = set(self.targets[spec].get('resolved_deps', []))
+
+            missing = defaultdict(list)
+            ambiguous = {}
+            used = set()
+            for header in sorted(headers):
+                owners = self.header_owners.get(header)
+                if not owners or spec in owners:
+                    continue
+                found = declared.intersection(owners)
+                if found:
+                    used.update(found)
+                elif len(owners) == 1:
+                    missing[owners[0]].append(header)
+                else:
+                    ambiguous[header] = sorted(owners)
+
+            unused = sorted(
+                dep for dep in declared
+                if dep not in used and dep in header_owning_targets
+            )
+
+            if missing or ambiguous or unused:
+                report[spec] = {'missing': dict(missing), 'ambiguous': ambiguous, 'unused': unused}
+        return report
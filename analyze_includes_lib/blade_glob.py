@@ -0,0 +1,168 @@
+"""
+BUILD 文件 glob() 的实现：基于工作区目录列表缓存匹配文件，
+同一目录在所有 BUILD 文件之间只列出一次
+"""
+import os
+from fnmatch import fnmatchcase
+from .config import BLADE_SKIP_DIRS
+
+# 含有这些字符的路径片段需要通配匹配
+_MAGIC_CHARS = frozenset('*?[')
+
+
+def _has_magic(part):
+    return not _MAGIC_CHARS.isdisjoint(part)
+
+
+class DirectoryIndex:
+    """
+    工作区目录列表缓存
+
+    以相对 BLADE_ROOT 的目录路径为键，记录目录的 mtime 以及其中的文件和子目录。
+    目录中增删文件会改变目录的 mtime，因此每个目录在一次运行中只需 stat 一次
+    即可判断缓存是否有效。条目可以随 BuildParseCache 一起持久化。
+    """
+
+    def __init__(self, blade_root, entries=None):
+        """
+        初始化目录列表缓存
+
+        Args:
+            blade_root: BLADE_ROOT 所在目录
+            entries: 之前保存的条目 {rel_dir: (mtime_ns, files, subdirs)}
+        """
+        self.blade_root = os.path.abspath(blade_root)
+        self.entries = entries or {}
+        self.dirty = False
+        self._checked = {}  # 本次运行中已验证过的目录 -> mtime_ns（目录不存在时为 None）
+
+    def stamp(self, rel_dir):
+        """返回目录当前的 mtime_ns（每次运行只 stat 一次），目录不存在时返回 None"""
+        if rel_dir in self._checked:
+            return self._checked[rel_dir]
+        try:
+            mtime = os.stat(os.path.join(self.blade_root, rel_dir)).st_mtime_ns
+        except OSError:
+            mtime = None
+        self._checked[rel_dir] = mtime
+        return mtime
+
+    def list_dir(self, rel_dir):
+        """
+        列出目录内容
+
+        Args:
+            rel_dir: 相对 BLADE_ROOT 的目录路径（根目录为 '.'）
+
+        Returns:
+            (mtime_ns, files, subdirs) 元组，目录不存在时返回 None
+        """
+        mtime = self.stamp(rel_dir)
+        if mtime is None:
+            if self.entries.pop(rel_dir, None) is not None:
+                self.dirty = True
+            return None
+
+        entry = self.entries.get(rel_dir)
+        if entry is not None and entry[0] == mtime:
+            return entry
+
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(os.path.join(self.blade_root, rel_dir)) as it:
+                for item in it:
+                    try:
+                        if item.is_dir():
+                            subdirs.append(item.name)
+                        elif item.is_file():
+                            files.append(item.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+
+        entry = (mtime, tuple(sorted(files)), tuple(sorted(subdirs)))
+        self.entries[rel_dir] = entry
+        self.dirty = True
+        return entry
+
+    def unchanged(self, stamps):
+        """
+        检查一组目录自记录以来是否没有变化
+
+        Args:
+            stamps: ((rel_dir, mtime_ns), ...)
+
+        Returns:
+            所有目录的 mtime 都未变化时返回 True
+        """
+        return all(self.stamp(rel_dir) == mtime for rel_dir, mtime in stamps)
+
+    def glob(self, build_dir, includes, excludes, used=None):
+        """
+        匹配 BUILD 目录下的文件，语义与 glob.glob(recursive=True) 一致：
+        '*' 不匹配以 '.' 开头的名称，'**' 匹配零个或多个目录（不进入隐藏目录和构建输出目录）
+
+        Args:
+            build_dir: BUILD 文件所在目录
+            includes: 包含的模式列表
+            excludes: 排除的模式列表
+            used: 可选的字典，记录匹配过程中列出的目录 {rel_dir: mtime_ns}
+
+        Returns:
+            相对 build_dir 的排序路径列表
+        """
+        rel_dir = os.path.relpath(os.path.abspath(build_dir), self.blade_root)
+        if used is None:
+            used = {}
+        matched = set()
+        for pattern in includes:
+            self._match(rel_dir, pattern.split('/'), '', matched, used)
+        for pattern in excludes:
+            excluded = set()
+            self._match(rel_dir, pattern.split('/'), '', excluded, used)
+            matched -= excluded
+        return sorted(matched)
+
+    def _match(self, rel_dir, parts, prefix, matched, used):
+        """在 rel_dir 中匹配剩余的路径片段，匹配到的文件路径（以 prefix 开头）加入 matched"""
+        listing = self.list_dir(rel_dir)
+        if listing is None:
+            return
+        used[rel_dir] = listing[0]
+        _, files, subdirs = listing
+
+        part, rest = parts[0], parts[1:]
+        if part in ('', '.'):
+            if rest:
+                self._match(rel_dir, rest, prefix, matched, used)
+            return
+
+        if part == '**':
+            if rest:
+                self._match(rel_dir, rest, prefix, matched, used)
+            else:
+                matched.update(prefix + name for name in files if not name.startswith('.'))
+            for name in subdirs:
+                if name.startswith('.') or name in BLADE_SKIP_DIRS:
+                    continue
+                self._match(os.path.join(rel_dir, name), parts, f"{prefix}{name}/", matched, used)
+            return
+
+        if rest:
+            for name in self._filter(subdirs, part):
+                self._match(os.path.join(rel_dir, name), rest, f"{prefix}{name}/", matched, used)
+        else:
+            matched.update(prefix + name for name in self._filter(files, part))
+
+    @staticmethod
+    def _filter(names, part):
+        """返回与路径片段匹配的名称"""
+        if not _has_magic(part):
+            return [part] if part in names else []
+        hidden_ok = part.startswith('.')
+        return [
+            name for name in names
+            if (hidden_ok or not name.startswith('.')) and fnmatchcase(name, part)
+        ]
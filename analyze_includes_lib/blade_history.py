@@ -0,0 +1,308 @@
+"""
+Blade 依赖历史：通过常驻的 git cat-file --batch 进程读取各个 revision 的 BUILD 文件，
+不需要 checkout，即可统计 target 依赖闭包随提交的变化
+"""
+import os
+import subprocess
+from .blade_ast import parse_build_content, warn_unresolved
+from .blade_glob import DirectoryIndex
+from .blade_parser import BladeParser, crawl_dependencies
+from .blade_target import build_target_records
+
+
+class GitObjectReader:
+    """
+    通过常驻的 git cat-file 进程读取对象
+
+    --batch-check 进程只返回对象的哈希和类型，--batch 进程返回内容，
+    调用方可以先按哈希判断是否已经处理过该对象，只在需要时读取内容。
+    """
+
+    def __init__(self, repo_dir):
+        """
+        启动 git cat-file 进程
+
+        Args:
+            repo_dir: git 仓库中的任意目录
+        """
+        self.repo_dir = repo_dir
+        self._check = self._spawn('--batch-check')
+        self._batch = self._spawn('--batch')
+
+    def _spawn(self, mode):
+        return subprocess.Popen(
+            ['git', 'cat-file', mode],
+            cwd=self.repo_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def info(self, object_name):
+        """
+        查询对象
+
+        Args:
+            object_name: 对象名，如 'HEAD~3:ads/serving/BUILD'
+
+        Returns:
+            (对象哈希, 类型) 元组，对象不存在时返回 None
+        """
+        self._check.stdin.write(object_name.encode('utf-8') + b'\n')
+        self._check.stdin.flush()
+        header = self._check.stdout.readline().split()
+        if len(header) != 3:
+            return None  # "<object> missing" 或 "<object> ambiguous"
+        return header[0].decode('ascii'), header[1].decode('ascii')
+
+    def read(self, sha):
+        """
+        读取对象内容
+
+        Args:
+            sha: 对象哈希
+
+        Returns:
+            内容字节串，对象不存在时返回 None
+        """
+        self._batch.stdin.write(sha.encode('ascii') + b'\n')
+        self._batch.stdin.flush()
+        header = self._batch.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        size = int(header[2])
+        return self._batch.stdout.read(size + 1)[:size]
+
+    def close(self):
+        """结束 git cat-file 进程"""
+        for proc in (self._check, self._batch):
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+
+
+def parse_tree(content):
+    """
+    解析 git tree 对象
+
+    Args:
+        content: tree 对象的原始内容
+
+    Returns:
+        (files, subdirs) 元组，均为排序后的名称元组
+    """
+    files = []
+    subdirs = []
+    pos = 0
+    while pos < len(content):
+        space = content.index(b' ', pos)
+        nul = content.index(b'\0', space)
+        mode = content[pos:space]
+        name = content[space + 1:nul].decode('utf-8', errors='replace')
+        if mode == b'40000':
+            subdirs.append(name)
+        elif mode != b'160000':  # 跳过子模块
+            files.append(name)
+        pos = nul + 21  # 名称后是 20 字节的对象哈希
+    return tuple(sorted(files)), tuple(sorted(subdirs))
+
+
+class GitDirectoryIndex(DirectoryIndex):
+    """
+    某个 revision 的目录列表，供 glob() 使用
+
+    以 tree 对象哈希代替 mtime 作为目录的版本标识，相同的 tree 在所有 revision 之间只解析一次。
+    """
+
+    def __init__(self, blade_root, reader, git_prefix):
+        """
+        Args:
+            blade_root: BLADE_ROOT 所在目录
+            reader: GitObjectReader
+            git_prefix: BLADE_ROOT 相对 git 仓库根目录的路径（位于仓库根目录时为空字符串）
+        """
+        super().__init__(blade_root)
+        self.reader = reader
+        self.git_prefix = git_prefix
+        self.revision = None
+        self._trees = {}  # tree 哈希 -> (files, subdirs)
+
+    def git_path(self, rel_path):
+        """将相对 BLADE_ROOT 的路径转换为 git 对象名中的路径"""
+        rel_path = os.path.normpath(os.path.join(self.git_prefix, rel_path))
+        return '' if rel_path == '.' else rel_path.replace(os.sep, '/')
+
+    def list_dir(self, rel_dir):
+        """列出当前 revision 中的目录，返回 (tree 哈希, files, subdirs)，目录不存在时返回 None"""
+        found = self.reader.info(f"{self.revision}:{self.git_path(rel_dir)}")
+        if found is None or found[1] != 'tree':
+            return None
+        sha = found[0]
+        listing = self._trees.get(sha)
+        if listing is None:
+            content = self.reader.read(sha)
+            if content is None:
+                return None
+            listing = self._trees[sha] = parse_tree(content)
+        return (sha,) + listing
+
+
+class BladeRevisionParser(BladeParser):
+    """
+    读取指定 revision 中 BUILD 文件的 BladeParser
+
+    BUILD 文件的解析结果按 blob 哈希缓存：blob 未变化的文件在各个 revision 之间
+    只解析一次；使用 glob() 的文件另外以所在目录的 tree 哈希区分。只支持显式的
+    target 规范，不支持 path/... 模式。
+    """
+
+    def __init__(self, blade_root, reader=None):
+        """
+        Args:
+            blade_root: BLADE_ROOT 所在目录（需要位于 git 仓库中）
+            reader: 可选的 GitObjectReader，默认新建
+        """
+        super().__init__(blade_root)
+        self.reader = reader or GitObjectReader(self.blade_root)
+        git_root = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'],
+            cwd=self.blade_root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        # git 返回的是真实路径，经过符号链接到达 BLADE_ROOT 时（如 macOS 的 /tmp）两边都要解析
+        git_prefix = os.path.relpath(os.path.realpath(self.blade_root), os.path.realpath(git_root))
+        if git_prefix == '.':
+            git_prefix = ''
+        self.directories = GitDirectoryIndex(self.blade_root, self.reader, git_prefix)
+        self.revision = None
+        self._blobs = {}      # build_file -> 当前 revision 中的 blob 哈希
+        # (build_file, blob 哈希) -> ('plain', targets) 或 ('glob', {目录 tree 哈希: targets})
+        self._parsed = {}
+        self.blobs_parsed = 0
+
+    def set_revision(self, revision):
+        """切换到另一个 revision，之前 revision 的 target 查询结果失效"""
+        self.revision = revision
+        self.directories.revision = revision
+        self.targets = {}
+        self._blobs = {}
+
+    def find_build_file(self, directory):
+        """在当前 revision 中查找 BUILD 文件，返回其路径（不要求在工作区中存在）"""
+        build_file = os.path.join(directory, 'BUILD')
+        rel_path = os.path.relpath(build_file, self.blade_root)
+        found = self.reader.info(f"{self.revision}:{self.directories.git_path(rel_path)}")
+        if found is None or found[1] != 'blob':
+            return None
+        self._blobs[build_file] = found[0]
+        return build_file
+
+    def parse_build_file(self, build_file):
+        """解析当前 revision 中的 BUILD 文件，blob（及 glob 目录）未变化时复用之前的结果"""
+        sha = self._blobs.get(build_file)
+        if sha is None and self.find_build_file(os.path.dirname(build_file)) is None:
+            return {}
+        sha = self._blobs[build_file]
+        rel_dir = os.path.relpath(os.path.dirname(build_file), self.blade_root)
+
+        key = (build_file, sha)
+        cached = self._parsed.get(key)
+        if cached is not None:
+            kind, value = cached
+            if kind == 'plain':
+                return value
+            tree = self.directories.list_dir(rel_dir)
+            if tree is not None and tree[0] in value:
+                return value[tree[0]]
+
+        used_dirs = {}
+
+        def glob_func(build_dir, includes, excludes):
+            return self.directories.glob(build_dir, includes, excludes, used_dirs)
+
+        data = self.reader.read(sha)
+        if data is None:
+            print(f"⚠ 警告：无法读取 {self.revision}:{rel_dir}/BUILD（对象 {sha}）")
+            return {}
+        try:
+            content = data.decode('utf-8')
+            parsed = parse_build_content(content, build_file, glob_func)
+        except (SyntaxError, ValueError, TypeError) as e:
+            print(f"⚠ 警告：解析 {self.revision}:{rel_dir}/BUILD 时出错：{e}")
+            parsed = {}
+        warn_unresolved(parsed, f"{self.revision}:{rel_dir}/BUILD")
+        targets = build_target_records(build_file, rel_dir, parsed)
+        self.blobs_parsed += 1
+
+        if not used_dirs:
+            self._parsed[key] = ('plain', targets)
+        else:
+            tree = self.directories.list_dir(rel_dir)
+            if tree is not None:
+                self._parsed.setdefault(key, ('glob', {}))[1][tree[0]] = targets
+        return targets
+
+    def expand_target_patterns(self, patterns):
+        """只支持显式的 target 规范"""
+        specs = []
+        for pattern in patterns:
+            if pattern.endswith('...') or pattern.endswith(':*'):
+                raise ValueError(f"历史分析不支持 target 模式：{pattern}")
+            specs.append(pattern[2:] if pattern.startswith('//') else pattern)
+        return specs
+
+    def close(self):
+        """结束 git cat-file 进程"""
+        self.reader.close()
+
+
+def list_revisions(repo_dir, revision='HEAD', max_count=200, first_parent=False):
+    """
+    列出 revision 之前的提交（从新到旧）
+
+    Returns:
+        [(commit 哈希, 提交时间戳, 标题), ...]
+    """
+    cmd = ['git', 'log', f'--max-count={max_count}', '--format=%H%x09%ct%x09%s']
+    if first_parent:
+        cmd.append('--first-parent')
+    cmd += [revision, '--']
+    output = subprocess.run(
+        cmd, cwd=repo_dir, capture_output=True, text=True, check=True,
+    ).stdout
+    commits = []
+    for line in output.splitlines():
+        sha, timestamp, subject = line.split('\t', 2)
+        commits.append((sha, int(timestamp), subject))
+    return commits
+
+
+def dependency_history(parser, target_specs, commits, max_depth=10):
+    """
+    统计每个提交中各个根 target 的依赖闭包大小和边数
+
+    Args:
+        parser: BladeRevisionParser
+        target_specs: 根 target 规范列表
+        commits: list_revisions 的结果
+        max_depth: 最大递归深度
+
+    Returns:
+        [{'commit', 'timestamp', 'subject', 'targets': {root: {'nodes', 'edges'}}}, ...]，
+        与 commits 顺序一致；根 target 在该提交中不存在时 nodes 和 edges 为 0
+    """
+    history = []
+    for sha, timestamp, subject in commits:
+        parser.set_revision(sha)
+        # 早期提交中 target 可能还不存在，不逐个警告
+        results = crawl_dependencies(parser.get_target_info, target_specs, max_depth, warn=False)
+        history.append({
+            'commit': sha,
+            'timestamp': timestamp,
+            'subject': subject,
+            'targets': {
+                root: {'nodes': len(nodes), 'edges': len(edges)}
+                for root, nodes, edges in results
+            },
+        })
+    return history
@@ -0,0 +1,224 @@
+"""
+Blade 工作区 target 索引：并行解析 BLADE_ROOT 下的所有 BUILD 文件，
+构建全局 target 表并持久化到磁盘
+"""
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from .blade_parser import BladeParser, crawl_dependencies
+from .blade_glob import DirectoryIndex
+from .blade_target import external_target
+from .config import BLADE_SKIP_DIRS
+
+# 索引文件格式版本，格式变化时递增以丢弃旧索引
+INDEX_VERSION = 3
+
+# 默认的索引文件名（位于 BLADE_ROOT 下）
+DEFAULT_INDEX_FILE = '.blade_target_index'
+
+
+def _parse_build_file(job):
+    """
+    解析单个 BUILD 文件（在子进程中运行）
+
+    Args:
+        job: (blade_root, build_file) 元组
+
+    Returns:
+        (build_file, mtime_ns, {target_spec: TargetRecord}, glob 用到的目录) 元组
+    """
+    blade_root, build_file = job
+    parser = BladeParser(blade_root)
+    try:
+        mtime = os.stat(build_file).st_mtime_ns
+    except OSError:
+        return build_file, None, {}, ()
+
+    targets = {record.spec: record for record in parser.parse_build_file(build_file).values()}
+    return build_file, mtime, targets, parser.glob_dirs(build_file)
+
+
+class BladeTargetIndex:
+    """Blade 工作区 target 索引"""
+
+    def __init__(self, blade_root, index_file=None, jobs=None):
+        """
+        初始化索引
+
+        Args:
+            blade_root: BLADE_ROOT 文件所在的项目根目录
+            index_file: 索引文件路径，默认为 BLADE_ROOT 下的 .blade_target_index
+            jobs: 并行解析的进程数，默认为 CPU 核数
+        """
+        self.blade_root = os.path.abspath(blade_root)
+        self.index_file = index_file or os.path.join(self.blade_root, DEFAULT_INDEX_FILE)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.files = {}    # build_file -> (mtime_ns, {target_spec: target_info}, glob 用到的目录)
+        self.targets = {}  # target_spec -> TargetRecord
+        self.directories = DirectoryIndex(self.blade_root)
+
+    def find_build_files(self):
+        """
+        查找 BLADE_ROOT 下的所有 BUILD 文件
+
+        Returns:
+            字典 {build_file: mtime_ns}
+        """
+        build_files = {}
+        for directory, dirnames, filenames in os.walk(self.blade_root):
+            dirnames[:] = [
+                d for d in dirnames
+                if not d.startswith('.') and d not in BLADE_SKIP_DIRS
+            ]
+            if 'BUILD' in filenames:
+                build_file = os.path.join(directory, 'BUILD')
+                try:
+                    build_files[build_file] = os.stat(build_file).st_mtime_ns
+                except OSError:
+                    pass
+        return build_files
+
+    def load(self):
+        """
+        加载或更新索引：只重新解析 mtime 变化或 glob() 匹配的目录有变化的 BUILD 文件，
+        并删除已不存在的文件
+
+        Returns:
+            (重新解析的文件数, BUILD 文件总数) 元组
+        """
+        self._load_index_file()
+
+        current = self.find_build_files()
+        stale = [
+            build_file for build_file, mtime in current.items()
+            if build_file not in self.files
+            or self.files[build_file][0] != mtime
+            or not self.directories.unchanged(self.files[build_file][2])
+        ]
+        removed = [build_file for build_file in self.files if build_file not in current]
+
+        for build_file in removed:
+            del self.files[build_file]
+
+        if stale:
+            self._parse_files(stale)
+
+        if stale or removed:
+            self._save_index_file()
+
+        self._rebuild_target_table()
+        return len(stale), len(current)
+
+    def _parse_files(self, build_files):
+        """在进程池中并行解析一组 BUILD 文件"""
+        jobs = [(self.blade_root, build_file) for build_file in build_files]
+        if len(jobs) == 1 or self.jobs == 1:
+            results = map(_parse_build_file, jobs)
+            self._store_results(results)
+            return
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            self._store_results(executor.map(_parse_build_file, jobs, chunksize=64))
+
+    def _store_results(self, results):
+        """保存解析结果"""
+        for build_file, mtime, targets, globs in results:
+            if mtime is None:
+                self.files.pop(build_file, None)
+            else:
+                self.files[build_file] = (mtime, targets, globs)
+
+    def _rebuild_target_table(self):
+        """由每个文件的解析结果合并出全局 target 表"""
+        self.targets = {}
+        for _, targets, _ in self.files.values():
+            self.targets.update(targets)
+
+    def _load_index_file(self):
+        """读取磁盘上的索引，版本或 BLADE_ROOT 不匹配时忽略"""
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return
+        if data.get('version') != INDEX_VERSION or data.get('blade_root') != self.blade_root:
+            return
+        self.files = data['files']
+
+    def _save_index_file(self):
+        """原子地写入索引文件"""
+        tmp_file = f"{self.index_file}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({
+                    'version': INDEX_VERSION,
+                    'blade_root': self.blade_root,
+                    'files': self.files,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"⚠ 警告：无法写入索引文件 {self.index_file}：{e}")
+
+    def get_target_info(self, target_spec):
+        """
+        查找 target 信息，返回格式与 BladeParser.get_target_info 一致
+
+        Args:
+            target_spec: target 规范
+
+        Returns:
+            TargetRecord，如果找不到返回 None
+        """
+        if target_spec.startswith('#'):
+            return external_target(target_spec)
+        if target_spec.startswith('//'):
+            target_spec = target_spec[2:]
+        return self.targets.get(target_spec)
+
+    def analyze_dependencies(self, target_spec, max_depth=10):
+        """
+        在索引中查询指定 target 的依赖关系，返回格式与 BladeParser.analyze_dependencies 一致
+
+        Args:
+            target_spec: target 规范
+            max_depth: 最大递归深度
+
+        Returns:
+            (nodes, edges) 元组
+        """
+        return self.analyze_dependencies_many([target_spec], max_depth)[0][1:]
+
+    def analyze_dependencies_many(self, target_specs, max_depth=10):
+        """
+        一次查询多个根 target 的依赖关系，返回格式与 BladeParser.analyze_dependencies_many 一致
+        """
+        target_specs = [spec[2:] if spec.startswith('//') else spec for spec in target_specs]
+        return crawl_dependencies(self.get_target_info, target_specs, max_depth)
+
+    def expand_target_patterns(self, patterns):
+        """
+        在索引中展开 target 模式（path:name、path:* 或 path/...），
+        语义与 BladeParser.expand_target_patterns 一致
+
+        Returns:
+            去重后的 target 规范列表
+        """
+        specs = []
+        for pattern in patterns:
+            if pattern.startswith('//'):
+                pattern = pattern[2:]
+
+            if pattern.endswith('...'):
+                base = pattern[:-3].rstrip('/')
+                specs.extend(sorted(
+                    spec for spec in self.targets
+                    if not base or spec.startswith(base + '/') or spec.startswith(base + ':')
+                ))
+            elif pattern.endswith(':*'):
+                prefix = pattern[:-1]
+                specs.extend(sorted(spec for spec in self.targets if spec.startswith(prefix)))
+            else:
+                specs.append(pattern)
+
+        return list(dict.fromkeys(specs))
@@ -2,22 +2,42 @@
 Blade BUILD 文件解析器：解析 Blade 构建系统的 BUILD 文件
 """
 import os
-import re
-from collections import defaultdict
+import hashlib
+from collections import deque
+from .blade_ast import parse_build_content, warn_unresolved
+from .blade_glob import DirectoryIndex
+from .blade_target import build_target_records, external_target, resolve_dep
+from .config import BLADE_SKIP_DIRS
+
+
+# 进程内的 BUILD 解析缓存：{build_file: ((mtime_ns, size), targets, glob 用到的目录)}
+_PARSE_CACHE = {}
+
+# 进程内的目录列表缓存：{blade_root: DirectoryIndex}，没有持久化缓存时使用
+_DIRECTORY_INDEXES = {}
 
 
 class BladeParser:
     """Blade BUILD 文件解析器"""
     
-    def __init__(self, blade_root):
+    def __init__(self, blade_root, parse_cache=None):
         """
         初始化解析器
         
         Args:
             blade_root: BLADE_ROOT 文件所在的项目根目录
+            parse_cache: 可选的 BuildParseCache，跨进程复用未变化 BUILD 文件的解析结果
+                         以及 glob() 使用的目录列表
         """
         self.blade_root = os.path.abspath(blade_root)
-        self.targets = {}  # 存储所有解析的 target: {name: target_info}
+        self.targets = {}  # 存储所有解析的 target: {build_file: {name: TargetRecord}}
+        self.parse_cache = parse_cache
+        if parse_cache is not None:
+            self.directories = parse_cache.directories
+        else:
+            self.directories = _DIRECTORY_INDEXES.get(self.blade_root)
+            if self.directories is None:
+                self.directories = _DIRECTORY_INDEXES[self.blade_root] = DirectoryIndex(self.blade_root)
         
     def parse_target_path(self, target_spec):
         """
@@ -63,58 +83,75 @@ class BladeParser:
         """
         解析 BUILD 文件，提取所有 target 定义
         
+        使用 ast 静态解析，不执行 BUILD 文件中的代码；未知的规则、load()、
+        config_items() 等调用不会导致解析失败。glob() 基于共享的目录列表缓存求值。
+        解析结果按文件 mtime 和大小缓存在进程内，同一进程中的多个 BladeParser
+        实例共享；glob() 匹配过的目录有变化时缓存失效。
+        
         Args:
             build_file: BUILD 文件路径
             
         Returns:
-            字典，key 为 target 名称，value 为 target 信息
+            字典，key 为 target 名称，value 为 TargetRecord（依赖已解析为完整规范）
         """
-        targets = {}
+        try:
+            stat = os.stat(build_file)
+        except OSError as e:
+            print(f"⚠ 警告：解析 BUILD 文件 {build_file} 时出错：{e}")
+            return {}
+        
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _PARSE_CACHE.get(build_file)
+        if cached and cached[0] == stamp and self.directories.unchanged(cached[2]):
+            return cached[1]
+        
+        if self.parse_cache is not None:
+            found = self.parse_cache.get(build_file, stamp)
+            if found is not None:
+                _PARSE_CACHE[build_file] = (stamp,) + found
+                return found[0]
+        
+        used_dirs = {}
+        
+        def glob_func(build_dir, includes, excludes):
+            return self.directories.glob(build_dir, includes, excludes, used_dirs)
         
         try:
-            with open(build_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 创建一个安全的执行环境
-            # 定义 Blade 的构建函数
-            def capture_target(target_type):
-                """创建一个捕获 target 信息的函数"""
-                def target_func(name, **kwargs):
-                    targets[name] = {
-                        'type': target_type,
-                        'name': name,
-                        'deps': kwargs.get('deps', []),
-                        'srcs': kwargs.get('srcs', []),
-                        'hdrs': kwargs.get('hdrs', []),
-                        'build_file': build_file,
-                        'directory': os.path.dirname(build_file)
-                    }
-                return target_func
+            with open(build_file, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()
             
-            # 创建执行环境，包含所有 Blade 构建函数
-            exec_env = {
-                'cc_library': capture_target('cc_library'),
-                'cc_binary': capture_target('cc_binary'),
-                'cc_test': capture_target('cc_test'),
-                'proto_library': capture_target('proto_library'),
-                'cc_plugin': capture_target('cc_plugin'),
-                'lex_yacc_library': capture_target('lex_yacc_library'),
-                'resource_library': capture_target('resource_library'),
-                'swig_library': capture_target('swig_library'),
-                'gen_rule': capture_target('gen_rule'),
-                'foreign_cc_library': capture_target('foreign_cc_library'),
-                # 可以根据需要添加更多 target 类型
-            }
+            if self.parse_cache is not None:
+                found = self.parse_cache.get_by_digest(build_file, stamp, digest)
+                if found is not None:
+                    _PARSE_CACHE[build_file] = (stamp,) + found
+                    return found[0]
             
-            # 执行 BUILD 文件内容
-            exec(content, exec_env)
-            
-        except Exception as e:
+            parsed = parse_build_content(raw.decode('utf-8'), build_file, glob_func)
+        except (OSError, SyntaxError, ValueError, TypeError) as e:
             print(f"⚠ 警告：解析 BUILD 文件 {build_file} 时出错：{e}")
             return {}
+        warn_unresolved(parsed, build_file)
+        
+        rel_dir = os.path.relpath(os.path.dirname(build_file), self.blade_root)
+        targets = build_target_records(build_file, rel_dir, parsed)
         
+        globs = tuple(sorted(used_dirs.items()))
+        if self.parse_cache is not None:
+            self.parse_cache.put(build_file, stamp, digest, targets, globs)
+        _PARSE_CACHE[build_file] = (stamp, targets, globs)
         return targets
     
+    def glob_dirs(self, build_file):
+        """
+        返回解析 BUILD 文件时 glob() 列出过的目录
+        
+        Returns:
+            ((rel_dir, mtime_ns), ...)，文件还没有解析过时返回空元组
+        """
+        cached = _PARSE_CACHE.get(build_file)
+        return cached[2] if cached else ()
+    
     def resolve_dep_path(self, dep, current_dir):
         """
         解析依赖路径为完整的 target 规范
@@ -126,21 +163,7 @@ class BladeParser:
         Returns:
             完整的 target 规范，如果是外部依赖返回原字符串
         """
-        # 外部依赖（以 # 开头）
-        if dep.startswith('#'):
-            return dep
-        
-        # 相对依赖（以 : 开头）
-        if dep.startswith(':'):
-            rel_path = os.path.relpath(current_dir, self.blade_root)
-            return f"{rel_path}:{dep[1:]}"
-        
-        # 绝对依赖（以 // 开头）
-        if dep.startswith('//'):
-            return dep[2:]
-        
-        # 其他形式的依赖
-        return dep
+        return resolve_dep(dep, os.path.relpath(current_dir, self.blade_root))
     
     def get_target_info(self, target_spec):
         """
@@ -150,16 +173,11 @@ class BladeParser:
             target_spec: target 规范
             
         Returns:
-            target 信息字典，如果找不到返回 None
+            TargetRecord，如果找不到返回 None
         """
-        # 如果是外部依赖，返回简化信息
+        # 外部依赖
         if target_spec.startswith('#'):
-            return {
-                'type': 'external',
-                'name': target_spec[1:],
-                'deps': [],
-                'external': True
-            }
+            return external_target(target_spec)
         
         # 解析 target 路径
         try:
@@ -176,21 +194,8 @@ class BladeParser:
         if build_file not in self.targets:
             self.targets[build_file] = self.parse_build_file(build_file)
         
-        # 获取 target 信息
-        targets = self.targets.get(build_file, {})
-        target_info = targets.get(target_name)
-        
-        if target_info:
-            # 解析依赖路径
-            resolved_deps = []
-            for dep in target_info.get('deps', []):
-                resolved_dep = self.resolve_dep_path(dep, build_dir)
-                resolved_deps.append(resolved_dep)
-            
-            target_info['resolved_deps'] = resolved_deps
-            target_info['full_spec'] = target_spec
-        
-        return target_info
+        # 获取 target 信息（依赖已在解析时解析完成）
+        return self.targets[build_file].get(target_name)
     
     def analyze_dependencies(self, target_spec, max_depth=10):
         """
@@ -205,22 +210,109 @@ class BladeParser:
             - nodes: 所有 target 节点的集合（包含 target 信息）
             - edges: 依赖关系边的列表 [(src_spec, dst_spec), ...]
         """
-        queue = [(target_spec, 0)]
+        return self.analyze_dependencies_many([target_spec], max_depth)[0][1:]
+    
+    def analyze_dependencies_many(self, target_specs, max_depth=10):
+        """
+        一次分析多个根 target 的依赖关系
+        
+        所有根共享同一份 target 查询结果：多个根共同依赖的子图只解析和
+        查询一次，之后每个根只在内存中遍历。
+        
+        Args:
+            target_specs: 根 target 规范列表
+            max_depth: 最大递归深度
+            
+        Returns:
+            [(root_spec, nodes, edges), ...] 列表，与 target_specs 顺序一致
+        """
+        return crawl_dependencies(self.get_target_info, target_specs, max_depth)
+    
+    def expand_target_patterns(self, patterns):
+        """
+        展开 target 模式
+        
+        支持三种形式：
+        - path/to/dir:name  单个 target
+        - path/to/dir:*     目录 BUILD 文件中的所有 target
+        - path/to/dir/...   目录及其所有子目录中的所有 target
+        
+        Args:
+            patterns: target 模式列表
+            
+        Returns:
+            去重后的 target 规范列表（保持模式顺序）
+        """
+        specs = []
+        for pattern in patterns:
+            if pattern.startswith('//'):
+                pattern = pattern[2:]
+            
+            if pattern.endswith('...'):
+                base_dir = os.path.join(self.blade_root, pattern[:-3].rstrip('/'))
+                for directory, dirnames, filenames in os.walk(base_dir):
+                    dirnames[:] = sorted(
+                        d for d in dirnames
+                        if not d.startswith('.') and d not in BLADE_SKIP_DIRS
+                    )
+                    if 'BUILD' in filenames:
+                        specs.extend(self._build_file_specs(directory))
+            elif pattern.endswith(':*'):
+                specs.extend(self._build_file_specs(os.path.join(self.blade_root, pattern[:-2])))
+            else:
+                specs.append(pattern)
+        
+        return list(dict.fromkeys(specs))
+    
+    def _build_file_specs(self, directory):
+        """返回目录 BUILD 文件中定义的所有 target 规范"""
+        build_file = self.find_build_file(directory)
+        if not build_file:
+            return []
+        rel_dir = os.path.relpath(directory, self.blade_root)
+        return [f"{rel_dir}:{name}" for name in self.parse_build_file(build_file)]
+
+
+def crawl_dependencies(get_target_info, target_specs, max_depth=10, warn=True):
+    """
+    按 BFS 分析多个根 target 的依赖关系
+    
+    每个 target 的信息只通过 get_target_info 查询一次，并在所有根之间共享。
+    
+    Args:
+        get_target_info: 查询函数 get_target_info(target_spec) -> target_info 或 None
+        target_specs: 根 target 规范列表
+        max_depth: 最大递归深度
+        warn: 找不到 target 时是否打印警告
+        
+    Returns:
+        [(root_spec, nodes, edges), ...] 列表
+    """
+    infos = {}  # target_spec -> target_info（找不到时为 None）
+    
+    def lookup(spec):
+        if spec not in infos:
+            infos[spec] = get_target_info(spec)
+            if not infos[spec] and warn:
+                print(f"⚠ 警告：找不到 target {spec}")
+        return infos[spec]
+    
+    results = []
+    for root_spec in target_specs:
+        queue = deque([(root_spec, 0)])
         visited = set()
         edges = []
         nodes = {}  # target_spec -> target_info
         
         while queue:
-            current_spec, depth = queue.pop(0)
+            current_spec, depth = queue.popleft()
             
             if current_spec in visited:
                 continue
             visited.add(current_spec)
             
-            # 获取 target 信息
-            target_info = self.get_target_info(current_spec)
+            target_info = lookup(current_spec)
             if not target_info:
-                print(f"⚠ 警告：找不到 target {current_spec}")
                 continue
             
             nodes[current_spec] = target_info
@@ -228,14 +320,15 @@ class BladeParser:
             if depth >= max_depth:
                 continue
             
-            # 处理依赖
             for dep in target_info.get('resolved_deps', []):
                 edges.append((current_spec, dep))
                 
                 if dep not in visited:
                     queue.append((dep, depth + 1))
         
-        return nodes, edges
+        results.append((root_spec, nodes, edges))
+    
+    return results
 
 
 def find_blade_root(start_path=None):
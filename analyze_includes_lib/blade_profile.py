@@ -0,0 +1,196 @@
+"""
+Blade 构建并行度分析：关键路径、每个拓扑层级可并行的 target 数以及每个 target 的松弛时间
+"""
+import csv
+from collections import defaultdict, deque
+from .graph_reduce import condense
+
+
+def load_cost_csv(csv_file):
+    """
+    读取 target 编译耗时 CSV
+
+    每行两列：target 规范、耗时（秒）。第一行不是数字时视为表头。
+
+    Args:
+        csv_file: CSV 文件路径
+
+    Returns:
+        字典 {target_spec: 耗时}
+    """
+    costs = {}
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            spec = row[0].strip()
+            if spec.startswith('//'):
+                spec = spec[2:]
+            try:
+                costs[spec] = float(row[1])
+            except ValueError:
+                continue  # 表头或无法解析的行
+    return costs
+
+
+def estimate_cost(target_info):
+    """
+    估算 target 的构建开销：以源文件数量为单位，外部依赖不计开销
+
+    Args:
+        target_info: target 信息
+
+    Returns:
+        估算的开销值
+    """
+    if target_info.get('external'):
+        return 0
+    return max(1, len(target_info.get('srcs', [])))
+
+
+def build_profile(nodes, edges, costs=None):
+    """
+    计算 target 图的关键路径和并行度，时间复杂度为 O(V + E)
+
+    边 (src, dst) 表示 src 依赖 dst，即 dst 必须先构建完成。
+
+    Args:
+        nodes: target 节点字典 {target_spec: target_info}
+        edges: 依赖关系边列表 [(src_spec, dst_spec), ...]
+        costs: 可选的实测耗时 {target_spec: 秒}，缺失的 target 使用 estimate_cost
+
+    Returns:
+        字典，包含：
+        - critical_path: 关键路径上的 target 列表（从最先构建的到最后构建的）
+        - critical_path_cost: 关键路径总开销
+        - total_cost: 所有 target 的总开销
+        - parallelism: 平均并行度（total_cost / critical_path_cost）
+        - levels: 每个拓扑层级可同时构建的 target 数
+        - cycles: 循环依赖（强连通分量）列表，每项为其中的 target 列表
+        - blocked: 不在循环中、但（直接或间接）依赖循环而无法排序的 target 列表
+        - targets: {target_spec: {'cost', 'level', 'earliest_start',
+                                  'earliest_finish', 'slack', 'critical'}}
+    """
+    costs = costs or {}
+    cost = {
+        spec: costs.get(spec, estimate_cost(info))
+        for spec, info in nodes.items()
+    }
+
+    # 用 dict 去重并保持边的顺序，使开销相同时关键路径的选择是确定的
+    deps = defaultdict(dict)        # target -> 它依赖的 target
+    dependents = defaultdict(dict)  # target -> 依赖它的 target
+    for src, dst in edges:
+        if src in nodes and dst in nodes and src != dst:
+            deps[src][dst] = None
+            dependents[dst][src] = None
+
+    # Kahn 拓扑排序：从没有依赖的 target 开始
+    remaining = {spec: len(deps[spec]) for spec in nodes}
+    queue = deque(spec for spec, count in remaining.items() if count == 0)
+    order = []
+    while queue:
+        spec = queue.popleft()
+        order.append(spec)
+        for dependent in dependents[spec]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                queue.append(dependent)
+
+    ordered = set(order)
+    cycles, blocked = _split_unordered(
+        [spec for spec in nodes if spec not in ordered], deps
+    )
+
+    # 正向：最早开始/完成时间和层级
+    earliest_finish = {}
+    level = {}
+    best_dep = {}
+    for spec in order:
+        start = 0
+        spec_level = 0
+        for dep in deps[spec]:
+            if spec not in best_dep or earliest_finish[dep] > start:
+                start = earliest_finish[dep]
+                best_dep[spec] = dep
+            spec_level = max(spec_level, level[dep] + 1)
+        earliest_finish[spec] = start + cost[spec]
+        level[spec] = spec_level
+
+    total = max(earliest_finish.values(), default=0)
+
+    # 反向：最晚完成时间和松弛时间
+    latest_finish = {}
+    for spec in reversed(order):
+        finish = total
+        for dependent in dependents[spec]:
+            if dependent in latest_finish:
+                finish = min(finish, latest_finish[dependent] - cost[dependent])
+        latest_finish[spec] = finish
+
+    # 关键路径：从完成时间最晚的 target 沿开销最大的依赖回溯
+    critical_path = []
+    if order:
+        current = max(order, key=lambda s: earliest_finish[s])
+        while current is not None:
+            critical_path.append(current)
+            current = best_dep.get(current)
+        critical_path.reverse()
+    critical = set(critical_path)
+
+    levels = defaultdict(int)
+    for spec in order:
+        levels[level[spec]] += 1
+
+    total_cost = sum(cost[spec] for spec in order)
+    targets = {
+        spec: {
+            'cost': cost[spec],
+            'level': level[spec],
+            'earliest_start': earliest_finish[spec] - cost[spec],
+            'earliest_finish': earliest_finish[spec],
+            'slack': latest_finish[spec] - earliest_finish[spec],
+            'critical': spec in critical,
+        }
+        for spec in order
+    }
+
+    return {
+        'critical_path': critical_path,
+        'critical_path_cost': total,
+        'total_cost': total_cost,
+        'parallelism': (total_cost / total) if total else 0,
+        'levels': [levels[i] for i in range(len(levels))],
+        'cycles': cycles,
+        'blocked': blocked,
+        'targets': targets,
+    }
+
+
+def _split_unordered(unordered, deps):
+    """
+    把拓扑排序剩下的 target 分为循环依赖的成员和被循环阻塞的下游 target
+
+    Args:
+        unordered: 拓扑排序剩下的 target 列表
+        deps: target -> 它依赖的 target
+
+    Returns:
+        (cycles, blocked) 元组：cycles 为每个强连通分量（多于一个 target）的成员列表，
+        blocked 为其余的 target，均保持 unordered 中的顺序
+    """
+    index = {spec: i for i, spec in enumerate(unordered)}
+    links = [
+        (index[spec], index[dep])
+        for spec in unordered for dep in deps[spec] if dep in index
+    ]
+    component, count = condense(len(unordered), links)
+    members = [[] for _ in range(count)]
+    for spec, group in zip(unordered, component):
+        members[group].append(spec)
+    cycles = sorted(
+        (group for group in members if len(group) > 1),
+        key=lambda group: index[group[0]],
+    )
+    blocked = [spec for spec, group in zip(unordered, component) if len(members[group]) == 1]
+    return cycles, blocked
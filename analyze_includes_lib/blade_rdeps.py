@@ -0,0 +1,141 @@
+"""
+Blade 反向依赖查询：由变更文件找到所属 target，再沿反向依赖找到受影响的 target 和测试
+"""
+import os
+import subprocess
+from collections import defaultdict, deque
+
+
+def find_git_root(path):
+    """
+    返回 path 所在 git 仓库的根目录
+
+    Args:
+        path: 仓库中的目录
+
+    Returns:
+        仓库根目录的绝对路径，不在 git 仓库中或没有 git 命令时返回 None
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'],
+            cwd=path, capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+class BladeReverseIndex:
+    """基于全局 target 表的反向依赖索引"""
+
+    def __init__(self, blade_root, targets, path_root=None):
+        """
+        构建反向索引
+
+        Args:
+            blade_root: BLADE_ROOT 所在目录
+            targets: 全局 target 表 {target_spec: target_info}（如 BladeTargetIndex.targets），
+                     target_info 需包含 resolved_deps、srcs、hdrs、build_file
+            path_root: 相对的变更文件路径的基准目录，默认为 BLADE_ROOT 所在 git 仓库的
+                       根目录（与 git diff --name-only 的输出一致），不在 git 仓库中时为 BLADE_ROOT
+        """
+        self.blade_root = os.path.abspath(blade_root)
+        self.path_root = os.path.abspath(
+            path_root or find_git_root(self.blade_root) or self.blade_root
+        )
+        # 经过符号链接到达 BLADE_ROOT 时（如 macOS 的 /tmp），git 返回的是真实路径
+        self._real_root = os.path.realpath(self.blade_root)
+        self.targets = targets
+        self.file_owners = defaultdict(list)   # 相对 BLADE_ROOT 的文件路径 -> [target_spec]
+        self.build_owners = defaultdict(list)  # 相对 BLADE_ROOT 的 BUILD 路径 -> [target_spec]
+        self.dependents = defaultdict(list)    # target_spec -> [依赖它的 target_spec]
+
+        for spec, info in targets.items():
+            rel_dir = spec.rsplit(':', 1)[0]
+            for path in info.get('srcs', []) + info.get('hdrs', []):
+                self.file_owners[os.path.normpath(os.path.join(rel_dir, path))].append(spec)
+            build_file = info.get('build_file')
+            if build_file:
+                self.build_owners[os.path.relpath(build_file, self.blade_root)].append(spec)
+            for dep in info.get('resolved_deps', []):
+                self.dependents[dep].append(spec)
+
+    def normalize_path(self, path):
+        """将变更文件路径（绝对路径或相对 path_root）转换为相对 BLADE_ROOT 的路径"""
+        path = os.path.join(self.path_root, path)
+        # 只解析目录中的符号链接，文件本身是符号链接时仍按链接所在的位置归属
+        directory, name = os.path.split(os.path.normpath(path))
+        return os.path.relpath(os.path.join(os.path.realpath(directory), name), self._real_root)
+
+    def owners(self, paths):
+        """
+        查找变更文件所属的 target
+
+        源文件/头文件归属于在 srcs/hdrs 中列出它的 target；
+        BUILD 文件变化时，其中定义的所有 target 都视为变化。
+
+        Args:
+            paths: 变更文件路径列表
+
+        Returns:
+            (owners, unowned) 元组
+            - owners: 所属 target 规范的集合
+            - unowned: 找不到所属 target 的文件列表
+        """
+        owners = set()
+        unowned = []
+        for path in paths:
+            rel_path = self.normalize_path(path)
+            found = self.file_owners.get(rel_path) or self.build_owners.get(rel_path)
+            if found:
+                owners.update(found)
+            else:
+                unowned.append(path)
+        return owners, unowned
+
+    def reverse_closure(self, specs):
+        """
+        计算一组 target 的反向依赖闭包（包含自身）
+
+        Args:
+            specs: target 规范的可迭代对象
+
+        Returns:
+            受影响的 target 规范集合
+        """
+        affected = set(specs)
+        queue = deque(affected)
+        while queue:
+            current = queue.popleft()
+            for dependent in self.dependents.get(current, ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+        return affected
+
+    def affected_targets(self, paths):
+        """
+        由变更文件计算所有受影响的 target
+
+        Returns:
+            (affected, unowned) 元组，affected 为排序后的 target 规范列表
+        """
+        owners, unowned = self.owners(paths)
+        return sorted(self.reverse_closure(owners)), unowned
+
+    def affected_tests(self, paths):
+        """
+        由变更文件计算需要运行的 cc_test target
+
+        Returns:
+            (tests, unowned) 元组，tests 为排序后的 target 规范列表
+        """
+        affected, unowned = self.affected_targets(paths)
+        tests = [
+            spec for spec in affected
+            if self.targets.get(spec, {}).get('type') == 'cc_test'
+        ]
+        return tests, unowned
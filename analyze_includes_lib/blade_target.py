@@ -0,0 +1,156 @@
+"""
+Blade target 记录：紧凑的 target 表示，依赖在解析时一次性解析完成
+"""
+import os
+import sys
+
+
+class TargetRecord:
+    """
+    单个 Blade target 的只读记录
+
+    使用 __slots__ 避免每个实例携带 __dict__；target 规范、类型、BUILD 文件路径
+    等重复出现的字符串经过 intern，整个工作区只保留一份；列表字段保存为元组。
+    为兼容现有代码，支持 info['deps'] 和 info.get('srcs', []) 形式的读取。
+    """
+
+    __slots__ = ('spec', 'type', 'name', 'deps', 'srcs', 'hdrs', 'resolved_deps', 'build_file')
+
+    # 可以通过 get()/[] 读取的字段（除 __slots__ 外还有派生字段）
+    _DERIVED = ('directory', 'full_spec', 'external')
+
+    def __init__(self, spec, target_type, name, deps=(), srcs=(), hdrs=(),
+                 resolved_deps=(), build_file=None):
+        """
+        初始化记录
+
+        Args:
+            spec: 完整的 target 规范（如 ads/proto:ranking_proto，外部依赖为 #glog）
+            target_type: 规则类型（如 cc_library）
+            name: target 名称
+            deps: BUILD 文件中声明的原始依赖
+            srcs: 源文件列表
+            hdrs: 头文件列表
+            resolved_deps: 解析为完整规范的依赖
+            build_file: 定义 target 的 BUILD 文件路径
+        """
+        self.spec = sys.intern(spec)
+        self.type = sys.intern(target_type)
+        self.name = sys.intern(name)
+        self.deps = tuple(deps)
+        self.srcs = tuple(srcs)
+        self.hdrs = tuple(hdrs)
+        self.resolved_deps = tuple(sys.intern(dep) for dep in resolved_deps)
+        self.build_file = sys.intern(build_file) if build_file else None
+
+    @property
+    def directory(self):
+        """BUILD 文件所在目录"""
+        return os.path.dirname(self.build_file) if self.build_file else None
+
+    @property
+    def full_spec(self):
+        """
+        规范化的 target 规范（rel_dir:name，不带 '//'）
+
+        记录在所有查询间共享，因此不再保留调用方传入的写法（如 //a/b:c 或 a/b:c），
+        与 spec 相同。
+        """
+        return self.spec
+
+    @property
+    def external(self):
+        return self.type == 'external'
+
+    def get(self, key, default=None):
+        """按字段名读取，与 dict.get 一致；外部依赖以外的记录没有 external 字段"""
+        if key in self.__slots__ or key in self._DERIVED:
+            value = getattr(self, key)
+            if value is None or (key == 'external' and not value):
+                return default
+            return value
+        return default
+
+    def __getitem__(self, key):
+        if key in self.__slots__ or key in self._DERIVED:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        # __slots__ 与 __init__ 的参数顺序一致；经由 __init__ 重新 intern 所有字符串字段，
+        # 使反序列化的记录与 build_target_records 创建的记录共享字符串
+        TargetRecord.__init__(self, *state)
+
+    def __repr__(self):
+        return f"TargetRecord({self.spec!r}, {self.type!r})"
+
+
+# 外部依赖（#xxx）的记录，每个名称只创建一次
+_EXTERNAL_TARGETS = {}
+
+
+def external_target(target_spec):
+    """
+    返回外部依赖的记录
+
+    Args:
+        target_spec: 以 # 开头的外部依赖规范
+
+    Returns:
+        TargetRecord
+    """
+    record = _EXTERNAL_TARGETS.get(target_spec)
+    if record is None:
+        record = TargetRecord(target_spec, 'external', target_spec[1:])
+        _EXTERNAL_TARGETS[target_spec] = record
+    return record
+
+
+def resolve_dep(dep, rel_dir):
+    """
+    解析依赖字符串为完整的 target 规范
+
+    Args:
+        dep: 依赖字符串，如 ':cpc_util', '//ads/proto:ranking_cpc_proto', '#glog'
+        rel_dir: 当前 BUILD 文件相对 BLADE_ROOT 的目录
+
+    Returns:
+        完整的 target 规范，外部依赖返回原字符串
+    """
+    if dep.startswith(':'):
+        return f"{rel_dir}:{dep[1:]}"
+    if dep.startswith('//'):
+        return dep[2:]
+    return dep
+
+
+def build_target_records(build_file, rel_dir, parsed):
+    """
+    由 BUILD 文件的解析结果创建 target 记录，依赖在此一次性解析
+
+    Args:
+        build_file: BUILD 文件路径
+        rel_dir: BUILD 文件相对 BLADE_ROOT 的目录
+        parsed: 字典 {name: {'type', 'deps', 'srcs', 'hdrs', ...}}
+
+    Returns:
+        字典 {name: TargetRecord}
+    """
+    build_file = sys.intern(build_file)
+    return {
+        name: TargetRecord(
+            f"{rel_dir}:{name}", info['type'], name,
+            deps=info['deps'],
+            srcs=info['srcs'],
+            hdrs=info['hdrs'],
+            resolved_deps=[resolve_dep(dep, rel_dir) for dep in info['deps']],
+            build_file=build_file,
+        )
+        for name, info in parsed.items()
+    }
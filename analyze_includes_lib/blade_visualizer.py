@@ -2,25 +2,71 @@
 Blade 依赖可视化器：生成 Blade 依赖关系的 HTML 可视化
 """
 import os
-import json
-from collections import defaultdict
+from collections import defaultdict, deque
+from .utils import scale_weights_to_sizes
+from .graph_payload import (
+    CHUNK_LOADER_JS, PAYLOAD_DECODER_JS, PAYLOAD_PLACEHOLDER, StringTable,
+    encode_payload, chunk_location, write_chunk, module_summary, write_html
+)
+from .force_layout import FORCE_LAYOUT_JS
+from .canvas_renderer import CANVAS_RENDERER_JS
+from .graph_layout import PRECOMPUTED_LAYOUT_JS, LayoutCache, module_layout
+from .cluster_view import CLUSTER_VIEW_JS, summarize_clusters
+
+
+def _cluster_priority(cluster_name):
+    """返回分类的排序优先级（与页面中的 getClusterPriority 相同）"""
+    return 3 if cluster_name.startswith('External/') else 0
 
 
 class BladeHtmlVisualizer:
     """Blade 依赖关系 HTML 可视化器"""
     
-    def __init__(self, nodes, edges, root_target):
+    def __init__(self, nodes=None, edges=None, root_target=None, modules_data=None,
+                 target_costs=None, compress=False, split=False, presettle_ticks=0,
+                 canvas_threshold=3000, precompute_layout=True, layout_cache=None,
+                 collapse_threshold=500):
         """
         初始化可视化器
         
+        可以传入单个根 target 的 nodes/edges/root_target，也可以通过
+        modules_data 传入多个根 target，生成支持 Previous/Next 切换的页面。
+        
         Args:
             nodes: target 节点字典 {target_spec: target_info}
             edges: 依赖关系边列表 [(src_spec, dst_spec), ...]
             root_target: 根 target 规范
+            modules_data: 模块数据列表，每个元素是字典
+                          {'root_target': str, 'nodes': dict, 'edges': list}，
+                          可选的 'profile' 为 blade_profile.build_profile 的结果，
+                          提供时在图中高亮关键路径
+            target_costs: 可选的编译开销 {target_spec: {'own': 字节数, 'total': 字节数}}
+                          （见 BladeCostEstimator.rollup），提供时按自身编译量确定节点大小
+            compress: 是否压缩嵌入的图数据（页面用 DecompressionStream 解码）
+            split: 是否分块输出：每个根 target 的数据写入 <输出文件名>_data/ 下的单独文件，
+                   页面切换到该模块时再加载
+            presettle_ticks: 力导向布局首次绘制前在 Web Worker 中迭代的次数
+            canvas_threshold: 模块节点数超过该值时页面使用 Canvas 代替 SVG 渲染
+            precompute_layout: 是否在生成时预先计算层次布局和应力布局的坐标，
+                               为 False 时由页面在浏览器中计算
+            layout_cache: 预计算布局的缓存文件路径，为 None 时不缓存到磁盘
+            collapse_threshold: 模块节点数超过该值时页面初始按分类折叠显示
         """
-        self.nodes = nodes
-        self.edges = edges
-        self.root_target = root_target
+        if modules_data is None:
+            modules_data = [{'root_target': root_target, 'nodes': nodes, 'edges': edges}]
+        self.modules_data = modules_data
+        self.target_costs = target_costs
+        self.compress = compress
+        self.split = split
+        self.presettle_ticks = presettle_ticks
+        self.canvas_threshold = canvas_threshold
+        self.precompute_layout = precompute_layout
+        self.layout_cache = layout_cache
+        self.collapse_threshold = collapse_threshold
+        self._scaled_sizes = (
+            scale_weights_to_sizes({spec: cost['own'] for spec, cost in target_costs.items()})
+            if target_costs is not None else None
+        )
     
     def _classify_target(self, target_spec, target_info):
         """
@@ -72,6 +118,12 @@ class BladeHtmlVisualizer:
         
         return size
     
+    def _node_size(self, target_spec, target_info):
+        """返回节点用于可视化的大小：有编译开销数据时使用换算后的编译量"""
+        if self._scaled_sizes is None:
+            return self._get_target_size(target_info)
+        return self._scaled_sizes.get(target_spec, 0)
+    
     def generate(self, output_file):
         """
         生成 HTML 文件
@@ -79,102 +131,257 @@ class BladeHtmlVisualizer:
         Args:
             output_file: 输出文件路径
         """
-        # 准备节点数据
-        nodes_data = []
-        node_id_map = {}
+        # 节点属性对每个 target 只计算一次：{target_spec: (size, cluster, type, srcs, hdrs)}
+        self._node_attrs = {}
+        self._layout_cache = LayoutCache(self.layout_cache) if self.precompute_layout else None
+        
+        if self.split:
+            chunk_dir, url_prefix = chunk_location(output_file)
+            os.makedirs(chunk_dir, exist_ok=True)
+        
+        def write_payload(writer):
+            # 逐个根 target 生成并写入，写入后即释放；节点表在所有模块之后写入
+            writer.write_raw('{"modules":[')
+            self._reset_node_table()
+            for index, module_info in enumerate(self.modules_data):
+                if index:
+                    writer.write_raw(',')
+                if self.split:
+                    # 每个根 target 写入单独的分块（自带节点表），页面中只保留模块摘要
+                    self._reset_node_table()
+                    module_json = self._prepare_module_data(module_info)
+                    chunk = encode_payload(
+                        {'nodes': self._node_table_data(), 'modules': [module_json]}, self.compress
+                    )
+                    url = write_chunk(chunk_dir, url_prefix, index, chunk)
+                    writer.write_json(module_summary(module_json, url))
+                else:
+                    # 所有根 target 共享一张节点表
+                    writer.write_json(self._prepare_module_data(module_info))
+            writer.write_raw('],"nodes":')
+            writer.write_json(None if self.split else self._node_table_data())
+            writer.write_raw('}')
+        
+        head, tail = self._html_parts()
+        write_html(output_file, head, tail, write_payload, self.compress)
+        if self._layout_cache is not None:
+            self._layout_cache.save()
+    
+    def _reset_node_table(self):
+        """清空按列保存的节点表"""
+        self._node_index = {}
+        self._clusters = StringTable()
+        self._types = StringTable()
+        self._node_table = {
+            'specs': [],
+            'sizes': [],
+            'clusters': [],  # cluster_names 的下标
+            'types': [],     # type_names 的下标
+            'srcs_counts': [],
+            'hdrs_counts': [],
+        }
+        if self.target_costs is not None:
+            self._node_table['compile_bytes'] = []
+            self._node_table['total_compile_bytes'] = []
+    
+    def _node_table_data(self):
+        """返回用于输出的节点表"""
+        return dict(
+            self._node_table,
+            cluster_names=self._clusters.values,
+            type_names=self._types.values,
+        )
+    
+    def _node_ref(self, target_spec, target_info):
+        """
+        返回 target 在节点表中的下标，首次出现时加入节点表
+        
+        Args:
+            target_spec: target 规范
+            target_info: target 信息
+            
+        Returns:
+            节点下标
+        """
+        index = self._node_index.get(target_spec)
+        if index is None:
+            attrs = self._node_attrs.get(target_spec)
+            if attrs is None:
+                attrs = self._node_attrs[target_spec] = (
+                    self._node_size(target_spec, target_info),
+                    self._classify_target(target_spec, target_info),
+                    target_info.get('type', 'unknown'),
+                    len(target_info.get('srcs', [])),
+                    len(target_info.get('hdrs', [])),
+                )
+            table = self._node_table
+            index = self._node_index[target_spec] = len(table['specs'])
+            table['specs'].append(target_spec)
+            table['sizes'].append(attrs[0])
+            table['clusters'].append(self._clusters.add(attrs[1]))
+            table['types'].append(self._types.add(attrs[2]))
+            table['srcs_counts'].append(attrs[3])
+            table['hdrs_counts'].append(attrs[4])
+            if self.target_costs is not None:
+                target_cost = self.target_costs.get(target_spec)
+                table['compile_bytes'].append(target_cost['own'] if target_cost else None)
+                table['total_compile_bytes'].append(target_cost['total'] if target_cost else None)
+        return index
+    
+    def _prepare_module_data(self, module_info):
+        """
+        为单个根 target 准备 JSON 数据
+        
+        节点和边都以节点表的下标表示，层级、依赖数和关键路径信息等
+        与根 target 相关的属性按模块保存（平行数组）。
+        
+        Args:
+            module_info: 模块信息字典 {'root_target', 'nodes', 'edges'}，可选 'profile'
+            
+        Returns:
+            准备好的模块数据字典
+        """
+        root_target = module_info['root_target']
+        nodes = module_info['nodes']
+        edges = module_info['edges']
+        profile = module_info.get('profile')
+        
+        # 关键路径上相邻的边（src 依赖 dst，路径按构建顺序排列）
+        critical_path = profile['critical_path'] if profile else []
+        critical_edges = set(zip(critical_path[1:], critical_path))
+        target_profiles = profile['targets'] if profile else {}
         
         # 构建依赖图
         dependencies = defaultdict(list)  # node -> [依赖的节点]
-        dependents = defaultdict(list)    # node -> [依赖它的节点]
+        dependent_counts = defaultdict(int)
         
-        for src, dst in self.edges:
+        for src, dst in edges:
             dependencies[src].append(dst)
-            dependents[dst].append(src)
+            dependent_counts[dst] += 1
         
         # 使用 BFS 计算每个节点的层级
-        queue = [(self.root_target, 0)]
-        visited_level = {self.root_target: 0}
+        queue = deque([root_target])
+        visited_level = {root_target: 0}
         
         while queue:
-            current, level = queue.pop(0)
+            current = queue.popleft()
+            level = visited_level[current] + 1
             for dep in dependencies.get(current, []):
-                if dep not in visited_level or visited_level[dep] > level + 1:
-                    visited_level[dep] = level + 1
-                    queue.append((dep, level + 1))
-        
-        # 为所有节点准备数据
-        for target_spec, target_info in self.nodes.items():
-            node_id = target_spec
-            node_id_map[target_spec] = node_id
-            
-            level = visited_level.get(target_spec, 999)
-            cluster = self._classify_target(target_spec, target_info)
-            
-            # 提取 target 名称
-            if target_spec.startswith('#'):
-                name = target_spec[1:]
-            elif ':' in target_spec:
-                name = target_spec.split(':')[-1]
-            else:
-                name = target_spec
-            
-            nodes_data.append({
-                'id': node_id,
-                'name': name,
-                'path': target_spec,
-                'size': self._get_target_size(target_info),
-                'cluster': cluster,
-                'is_source': target_spec == self.root_target,
-                'level': level,
-                'dep_count': len(dependencies.get(target_spec, [])),
-                'dependent_count': len(dependents.get(target_spec, [])),
-                'type': target_info.get('type', 'unknown'),
-                'srcs_count': len(target_info.get('srcs', [])),
-                'hdrs_count': len(target_info.get('hdrs', []))
-            })
+                if dep not in visited_level:
+                    visited_level[dep] = level
+                    queue.append(dep)
         
         # 按层级和分类排序
-        nodes_data.sort(key=lambda x: (x['level'], x['cluster'], x['name']))
-        
-        # 准备边数据
-        edges_data = []
-        for src, dst in self.edges:
-            dst_info = self.nodes.get(dst, {})
-            edges_data.append({
-                'source': node_id_map.get(src, src),
-                'target': node_id_map.get(dst, dst),
-                'size': self._get_target_size(dst_info)
-            })
-        
-        # 准备模块数据
-        module_data = {
-            'source_file': self.root_target,
-            'source_path': self.root_target,
-            'nodes': nodes_data,
-            'links': edges_data,
-            'node_count': len(nodes_data),
-            'edge_count': len(edges_data)
-        }
-        
-        # 生成 HTML
-        html_content = self._generate_html([module_data])
-        
-        # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        cluster_names = self._clusters.values
+        clusters = self._node_table['clusters']
+        specs = sorted(
+            nodes,
+            key=lambda spec: (
+                visited_level.get(spec, 999),
+                cluster_names[clusters[self._node_ref(spec, nodes[spec])]],
+                self._target_name(spec),
+            )
+        )
+        
+        # 边以节点下标对的平铺数组表示；找不到的依赖同样加入节点表
+        links = []
+        critical_links = []
+        for src, dst in edges:
+            if (src, dst) in critical_edges:
+                critical_links.append(len(links) // 2)
+            links.append(self._node_ref(src, nodes.get(src, {})))
+            links.append(self._node_ref(dst, nodes.get(dst, {})))
+        
+        levels = [visited_level.get(spec, 999) for spec in specs]
+        module_json = {
+            'source_file': root_target,
+            'source': self._node_index.get(root_target) if root_target in nodes else None,
+            'nodes': [self._node_index[spec] for spec in specs],
+            'levels': levels,
+            'dep_counts': [len(dependencies.get(spec, ())) for spec in specs],
+            'dependent_counts': [dependent_counts.get(spec, 0) for spec in specs],
+            'links': links,
+            'node_count': len(specs),
+            'edge_count': len(edges),
+            'critical_path_cost': profile['critical_path_cost'] if profile else None,
+            'parallelism': profile['parallelism'] if profile else None
+        }
+        if profile:
+            module_json['critical'] = [
+                1 if spec in target_profiles and target_profiles[spec]['critical'] else 0
+                for spec in specs
+            ]
+            module_json['costs'] = [
+                target_profiles[spec]['cost'] if spec in target_profiles else None
+                for spec in specs
+            ]
+            module_json['slacks'] = [
+                target_profiles[spec]['slack'] if spec in target_profiles else None
+                for spec in specs
+            ]
+            module_json['critical_links'] = critical_links
+        # 预计算布局和分类汇总中的边以模块内的节点下标表示，端点不在节点列表中的边跳过
+        local = {spec: index for index, spec in enumerate(specs)}
+        local_links = []
+        local_critical = []  # 关键路径上的边在 local_links 中的下标
+        for src, dst in edges:
+            if src in local and dst in local:
+                if (src, dst) in critical_edges:
+                    local_critical.append(len(local_links))
+                local_links.append((local[src], local[dst]))
+        if self.precompute_layout:
+            module_json.update(module_layout(
+                specs,
+                levels,
+                [cluster_names[clusters[self._node_index[spec]]] for spec in specs],
+                local_links,
+                self._layout_cache,
+                _cluster_priority
+            ))
+        if len(specs) > self.collapse_threshold:
+            sizes = self._node_table['sizes']
+            refs = module_json['nodes']
+            summary, link_groups = summarize_clusters(
+                [clusters[ref] for ref in refs],
+                [sizes[ref] for ref in refs],
+                levels,
+                local_links
+            )
+            module_json.update(summary)
+            if profile:
+                module_json['cluster_critical_links'] = sorted(
+                    {link_groups[i] for i in local_critical} - {None}
+                )
+        return module_json
+    
+    @staticmethod
+    def _target_name(target_spec):
+        """提取 target 名称"""
+        if target_spec.startswith('#'):
+            return target_spec[1:]
+        if ':' in target_spec:
+            return target_spec.split(':')[-1]
+        return target_spec
     
-    def _generate_html(self, modules_data):
+    def _html_parts(self):
+        """
+        返回以图数据为界拆分的 HTML 页面，用于流式写入
+        
+        Returns:
+            (head, tail) 元组，图数据写在两者之间
+        """
+        return self._generate_html(PAYLOAD_PLACEHOLDER).split(PAYLOAD_PLACEHOLDER)
+    
+    def _generate_html(self, modules_json):
         """
         生成 HTML 内容
         
         Args:
-            modules_data: 模块数据列表
+            modules_json: 图数据的 JavaScript 表达式（见 graph_payload.encode_payload）
             
         Returns:
             HTML 字符串
         """
-        modules_json = json.dumps(modules_data, ensure_ascii=False)
-        
         return f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -213,6 +420,11 @@ class BladeHtmlVisualizer:
             background: #fafafa;
         }
         
+        #graph-canvas {
+            display: none;
+            background: #fafafa;
+        }
+        
         .node {
             cursor: pointer;
         }
@@ -242,6 +454,16 @@ class BladeHtmlVisualizer:
             text-shadow: 0 1px 2px rgba(255,255,255,0.8);
         }
         
+        .node.cluster-node circle {
+            stroke: #607D8B;
+            stroke-width: 3px;
+            stroke-dasharray: 4,2;
+        }
+        
+        .node.cluster-node text {
+            font-weight: bold;
+        }
+        
         .link {
             stroke: #999;
             stroke-opacity: 0.3;
@@ -259,6 +481,12 @@ class BladeHtmlVisualizer:
             stroke-width: 2px;
         }
         
+        .link.critical {
+            stroke: #9c27b0;
+            stroke-width: 3px;
+            stroke-opacity: 0.8;
+        }
+        
         .link.dependency {
             stroke: #f44336 !important;
             stroke-width: 2.5px !important;
@@ -458,6 +686,43 @@ class BladeHtmlVisualizer:
             color: #666;
         }
         
+        .module-nav {
+            display: flex;
+            align-items: center;
+            gap: 10px;
+            margin-top: 15px;
+            padding-top: 15px;
+            border-top: 1px solid #eee;
+        }
+        
+        .nav-btn {
+            padding: 8px 16px;
+            border: 1px solid #2196F3;
+            background: white;
+            color: #2196F3;
+            border-radius: 4px;
+            cursor: pointer;
+            font-size: 12px;
+            transition: all 0.3s ease;
+            flex-shrink: 0;
+        }
+        
+        .nav-btn:hover:not(:disabled) {
+            background: #E3F2FD;
+        }
+        
+        .nav-btn:disabled {
+            opacity: 0.3;
+            cursor: not-allowed;
+        }
+        
+        .module-info {
+            flex: 1;
+            text-align: center;
+            font-size: 12px;
+            color: #666;
+        }
+        
         #toggle-btn {
             position: absolute;
             top: 20px;
@@ -503,15 +768,25 @@ class BladeHtmlVisualizer:
             </div>
         </div>
         
+        <div class="module-nav" id="module-nav">
+            <button class="nav-btn" id="btn-prev">◀ Previous</button>
+            <div class="module-info">
+                <span id="module-index">1</span> / <span id="module-total">1</span>
+            </div>
+            <button class="nav-btn" id="btn-next">Next ▶</button>
+        </div>
+        
         <input type="text" id="search" placeholder="搜索 target 名称..." />
         
         <div class="layout-buttons">
             <button class="layout-btn active" id="btn-tree">📊 树状布局</button>
             <button class="layout-btn" id="btn-force">🔄 力导向</button>
+            <button class="layout-btn" id="btn-clusters" style="display: none;">📁 展开全部</button>
         </div>
         
         <div class="info" style="margin-top: 10px; font-size: 11px; color: #999;">
-            💡 树状布局：从左到右按依赖层级排列，相同模块的 target 分组显示
+            💡 树状布局：从左到右按依赖层级排列，相同模块的 target 分组显示<br>
+            💡 Target 较多时按模块分类折叠显示，点击分类节点展开
         </div>
         
         <div class="legend">
@@ -542,23 +817,112 @@ class BladeHtmlVisualizer:
                 <div class="legend-line" style="background: #4caf50;"></div>
                 <span>依赖当前节点的 Target</span>
             </div>
+            <div class="legend-item" id="legend-critical" style="display: none;">
+                <div class="legend-line" style="background: #9c27b0;"></div>
+                <span>关键路径（<span id="critical-cost">-</span>，并行度 <span id="parallelism">-</span>）</span>
+            </div>
         </div>
         
         <div id="node-info" class="empty"></div>
     </div>
     
-    <svg id="graph"></svg>"""
+    <svg id="graph"></svg>
+    <canvas id="graph-canvas"></canvas>"""
     
     def _get_javascript_code(self, modules_json):
         """返回 JavaScript 代码"""
         return f"""// 所有模块的数据
-        const allModules = {modules_json};
+        const graphData = {modules_json};
+        // 全局节点表（按列保存），各模块以下标引用其中的节点
+        let nodeTable = null;
+        let allModules = [];
         let currentModuleIndex = 0;
         
         // 当前模块的数据
         let nodesData = [];
         let linksData = [];
         
+        // 已展开的模块节点和边（切换回来时保留节点位置）
+        const moduleGraphs = [];
+        
+        {PAYLOAD_DECODER_JS}
+        
+        {CHUNK_LOADER_JS}
+        
+        function tableNode(table, ref) {{
+            const spec = table.specs[ref];
+            let name = spec;
+            if (spec.startsWith('#')) name = spec.slice(1);
+            else if (spec.includes(':')) name = spec.slice(spec.lastIndexOf(':') + 1);
+            return {{
+                id: spec,
+                name: name,
+                path: spec,
+                size: table.sizes[ref],
+                cluster: table.cluster_names[table.clusters[ref]],
+                type: table.type_names[table.types[ref]],
+                srcs_count: table.srcs_counts[ref],
+                hdrs_count: table.hdrs_counts[ref],
+                compile_bytes: table.compile_bytes ? table.compile_bytes[ref] : null,
+                total_compile_bytes: table.total_compile_bytes ? table.total_compile_bytes[ref] : null
+            }};
+        }}
+        
+        function buildModuleGraph(table, module) {{
+            const nodes = module.nodes.map((ref, i) => Object.assign(tableNode(table, ref), {{
+                is_source: ref === module.source,
+                level: module.levels[i],
+                dep_count: module.dep_counts[i],
+                dependent_count: module.dependent_counts[i],
+                critical: module.critical ? module.critical[i] === 1 : false,
+                cost: module.costs ? module.costs[i] : null,
+                slack: module.slacks ? module.slacks[i] : null
+            }}));
+            const critical = new Set(module.critical_links || []);
+            // 边的两端直接引用节点对象（不在节点列表中的端点无法绘制，跳过）
+            const byRef = new Map(module.nodes.map((ref, i) => [ref, nodes[i]]));
+            const links = [];
+            for (let i = 0; i < module.links.length; i += 2) {{
+                const source = byRef.get(module.links[i]);
+                const target = byRef.get(module.links[i + 1]);
+                if (!source || !target) continue;
+                links.push({{
+                    source,
+                    target,
+                    size: table.sizes[module.links[i + 1]],
+                    critical: critical.has(i / 2)
+                }});
+            }}
+            // 预计算的布局（生成时使用 --browser-layout 则没有）
+            const layout = module.tree_xy
+                ? {{tree: module.tree_xy, groups: module.tree_groups, force: module.force_xy}}
+                : null;
+            const graph = {{nodes, links, layout}};
+            // 节点较多的模块带有分类汇总，初始按分类折叠显示
+            graph.clusters = module.cluster_ids ? buildClusterGraph(graph, module, table.cluster_names) : null;
+            if (graph.clusters) {{
+                // 包含关键路径上的边或 target 的分类同样标记为关键路径
+                for (const i of module.cluster_critical_links || []) graph.clusters.links[i].critical = true;
+                graph.clusters.nodes.forEach(c => {{
+                    c.critical = c.members.some(d => d.critical);
+                }});
+            }}
+            return graph;
+        }}
+        
+        // 返回模块的节点和边；分块输出时先加载该模块的分块
+        function moduleGraph(index) {{
+            if (moduleGraphs[index]) return Promise.resolve(moduleGraphs[index]);
+            const module = allModules[index];
+            const data = module.chunk
+                ? loadChunk(index, module.chunk).then(chunk => [chunk.nodes, chunk.modules[0]])
+                : Promise.resolve([nodeTable, module]);
+            return data.then(([table, moduleData]) => {{
+                if (!moduleGraphs[index]) moduleGraphs[index] = buildModuleGraph(table, moduleData);
+                return moduleGraphs[index];
+            }});
+        }}
+        
         const width = window.innerWidth;
         const height = window.innerHeight;
         
@@ -580,6 +944,20 @@ class BladeHtmlVisualizer:
             return "#EF9A9A";
         }}
         
+        function formatSize(bytes) {{
+            const units = ['B', 'KB', 'MB', 'GB'];
+            let i = 0;
+            while (bytes >= 1024 && i < units.length - 1) {{
+                bytes /= 1024;
+                i++;
+            }}
+            return `${{bytes.toFixed(1)}}${{units[i]}}`;
+        }}
+        
+        function formatCost(value) {{
+            return Number.isInteger(value) ? `${{value}}` : value.toFixed(2);
+        }}
+        
         function getNodeRadius(size) {{
             return Math.max(8, Math.min(30, Math.sqrt(size) / 50 + 8));
         }}
@@ -590,11 +968,12 @@ class BladeHtmlVisualizer:
             return 0;
         }}
         
-        // 计算层次化布局位置
-        function calculateTreeLayout() {{
-            g.selectAll('.cluster-rect').remove();
-            g.selectAll('.cluster-label').remove();
-            
+        function levelLabelText(level) {{
+            return level === 0 ? '根 Target' : `依赖层级 ${{level}}`;
+        }}
+        
+        // 在页面中计算层次化布局位置，返回集群框和层级标签
+        function computeTreeLayout() {{
             const levelClusterGroups = {{}};
             
             nodesData.forEach(d => {{
@@ -665,11 +1044,26 @@ class BladeHtmlVisualizer:
                 levelLabels.push({{
                     x: x,
                     y: 30,
-                    text: level === 0 ? '根 Target' : `依赖层级 ${{level}}`,
+                    text: levelLabelText(level),
                     level: level
                 }});
             }});
             
+            return {{clusterRects, levelLabels}};
+        }}
+        
+        // 计算层次化布局位置（有预计算的布局时直接使用）
+        function calculateTreeLayout() {{
+            g.selectAll('.cluster-rect').remove();
+            g.selectAll('.cluster-label').remove();
+            
+            const {{clusterRects, levelLabels}} = precomputedLayout
+                ? applyPrecomputedTreeLayout(nodesData, precomputedLayout, width, levelLabelText)
+                : computeTreeLayout();
+            
+            treeDecorations = {{clusterRects, levelLabels}};
+            if (useCanvas) return;
+            
             const clusterGroup = g.insert('g', ':first-child')
                 .attr('class', 'cluster-rects');
             
@@ -700,12 +1094,84 @@ class BladeHtmlVisualizer:
                 .text(d => d.text);
         }}
         
-        const simulation = d3.forceSimulation(nodesData)
-            .force("link", d3.forceLink(linksData).id(d => d.id).distance(100))
-            .force("charge", d3.forceManyBody().strength(-400))
-            .force("center", d3.forceCenter(width / 2, height / 2))
-            .force("collision", d3.forceCollide().radius(d => getNodeRadius(d.size) + 5))
-            .stop();
+        {FORCE_LAYOUT_JS}
+        
+        {PRECOMPUTED_LAYOUT_JS}
+        
+        {CLUSTER_VIEW_JS}
+        
+        // 力导向布局前先在 Worker 中迭代的次数（迭代完成后才首次绘制）
+        const PRESETTLE_TICKS = {self.presettle_ticks};
+        
+        const forceOptions = {{
+            distance: d => 100,
+            charge: -400,
+            radius: d => getNodeRadius(d.size),
+            width: width,
+            height: height,
+            preSettle: PRESETTLE_TICKS,
+            alpha: 1
+        }};
+        
+        // 每帧最多更新一次节点和边的位置
+        let renderScheduled = false;
+        function scheduleRender() {{
+            if (renderScheduled) return;
+            renderScheduled = true;
+            requestAnimationFrame(() => {{
+                renderScheduled = false;
+                setGraphVisibility(null);
+                if (useCanvas || (node && link)) updatePositions();
+            }});
+        }}
+        
+        const forceLayout = createForceLayout(scheduleRender);
+        
+        {CANVAS_RENDERER_JS}
+        
+        // 节点数超过该值时使用 Canvas 代替 SVG 渲染
+        const CANVAS_NODE_THRESHOLD = {self.canvas_threshold};
+        let useCanvas = false;
+        let treeDecorations = null;
+        let precomputedLayout = null;  // 当前模块的预计算布局
+        let currentGraph = null;       // 当前模块的完整图（moduleGraph 的结果）
+        
+        const canvasView = createCanvasRenderer(document.getElementById('graph-canvas'), {{
+            width: width,
+            height: height,
+            nodeRadius: d => getNodeRadius(d.size),
+            nodeFill: d => getNodeColor(d.size),
+            nodeStroke: d => d.is_source ? {{color: "#2196F3", width: 4}}
+                : (d.critical ? {{color: "#9c27b0", width: 4}}
+                    : (d.collapsed ? {{color: "#607D8B", width: 3}} : {{color: "#fff", width: 2}})),
+            // 与 .link 的 CSS 样式对应，后面的样式绘制在上层
+            linkStyles: {{
+                dimmed: {{stroke: "#999", width: 1.5, opacity: 0.05}},
+                normal: {{stroke: "#999", width: 1.5, opacity: 0.3}},
+                critical: {{stroke: "#9c27b0", width: 3, opacity: 0.8}},
+                dependent: {{stroke: "#4caf50", width: 2.5, opacity: 0.8}},
+                dependency: {{stroke: "#f44336", width: 2.5, opacity: 0.8}}
+            }},
+            linkStyle: l => l.dependency ? 'dependency' : l.dependent ? 'dependent'
+                : l.critical ? 'critical' : l.dimmed ? 'dimmed' : 'normal',
+            labelLimit: 2000,
+            onClick: (event, d) => {{
+                if (d) {{
+                    toggleNodeSelection(d);
+                }} else {{
+                    resetHighlight();
+                    selectedNode = null;
+                }}
+            }},
+            onDragStart: dragstarted,
+            onDrag: dragged,
+            onDragEnd: dragended
+        }});
+        
+        function setGraphVisibility(value) {{
+            g.style("visibility", value);
+            d3.select("#graph-canvas").style("visibility", value);
+        }}
         
         svg.append("defs").append("marker")
             .attr("id", "arrowhead")
@@ -730,13 +1196,31 @@ class BladeHtmlVisualizer:
             }}
         }});
         
-        function resetHighlight() {{
+        // 将节点和边数据上的高亮状态应用到图上
+        function applyHighlight() {{
+            if (useCanvas) {{
+                canvasView.render();
+                return;
+            }}
             if (!node || !link) return;
             
-            node.classed("dimmed", false).classed("highlighted", false);
-            link.classed("dimmed", false)
-                .classed("dependency", false)
-                .classed("dependent", false);
+            node.classed("dimmed", d => d.dimmed).classed("highlighted", d => d.highlighted);
+            link.classed("dimmed", l => l.dimmed)
+                .classed("dependency", l => l.dependency)
+                .classed("dependent", l => l.dependent);
+        }}
+        
+        function resetHighlight() {{
+            nodesData.forEach(d => {{
+                d.dimmed = false;
+                d.highlighted = false;
+            }});
+            linksData.forEach(l => {{
+                l.dimmed = false;
+                l.dependency = false;
+                l.dependent = false;
+            }});
+            applyHighlight();
             
             const nodeInfo = document.getElementById("node-info");
             nodeInfo.className = "empty";
@@ -751,19 +1235,23 @@ class BladeHtmlVisualizer:
                 return;
             }}
             
-            if (!node || !link) return;
-            
-            node.classed("dimmed", d => !d.name.toLowerCase().includes(searchTerm))
-                .classed("highlighted", d => d.name.toLowerCase().includes(searchTerm));
-            
-            link.classed("dimmed", l => {{
-                const sourceMatch = l.source.name.toLowerCase().includes(searchTerm);
-                const targetMatch = l.target.name.toLowerCase().includes(searchTerm);
-                return !sourceMatch && !targetMatch;
+            nodesData.forEach(d => {{
+                const match = matchesSearch(d, searchTerm);
+                d.dimmed = !match;
+                d.highlighted = match;
             }});
+            linksData.forEach(l => {{
+                l.dimmed = l.source.dimmed && l.target.dimmed;
+            }});
+            applyHighlight();
         }});
         
         function updatePositions() {{
+            if (useCanvas) {{
+                canvasView.update();
+                return;
+            }}
+            
             link.attr("d", d => {{
                 const sx = d.source.x || 0;
                 const sy = d.source.y || 0;
@@ -775,24 +1263,28 @@ class BladeHtmlVisualizer:
             node.attr("transform", d => `translate(${{d.x || 0}},${{d.y || 0}})`);
         }}
         
-        simulation.on("tick", updatePositions);
-        
         let currentLayout = 'tree';
         
         function switchToTreeLayout() {{
             currentLayout = 'tree';
-            simulation.stop();
+            forceLayout.stop();
+            setGraphVisibility(null);
             calculateTreeLayout();
             
-            g.selectAll('.cluster-rects').style('display', 'block');
-            
-            node.transition()
-                .duration(750)
-                .attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-            
-            link.transition()
-                .duration(750)
-                .attr("d", d => `M${{d.source.x}},${{d.source.y}}L${{d.target.x}},${{d.target.y}}`);
+            if (useCanvas) {{
+                canvasView.setDecorations(treeDecorations);
+                canvasView.update();
+            }} else {{
+                g.selectAll('.cluster-rects').style('display', 'block');
+                
+                node.transition()
+                    .duration(750)
+                    .attr("transform", d => `translate(${{d.x}},${{d.y}})`);
+                
+                link.transition()
+                    .duration(750)
+                    .attr("d", d => `M${{d.source.x}},${{d.source.y}}L${{d.target.x}},${{d.target.y}}`);
+            }}
             
             document.getElementById('btn-tree').classList.add('active');
             document.getElementById('btn-force').classList.remove('active');
@@ -802,13 +1294,21 @@ class BladeHtmlVisualizer:
             currentLayout = 'force';
             
             g.selectAll('.cluster-rects').style('display', 'none');
+            canvasView.setDecorations(null);
             
             nodesData.forEach(d => {{
                 d.fx = null;
                 d.fy = null;
             }});
             
-            simulation.alpha(1).restart();
+            if (precomputedLayout) {{
+                // 直接使用预计算的坐标，模拟只在拖动节点时运行
+                applyPrecomputedForceLayout(nodesData, precomputedLayout, width, height);
+                forceLayout.start(nodesData, linksData, Object.assign({{}}, forceOptions, {{alpha: 0, preSettle: 0}}));
+            }} else {{
+                if (PRESETTLE_TICKS > 0) setGraphVisibility("hidden");
+                forceLayout.start(nodesData, linksData, forceOptions);
+            }}
             
             document.getElementById('btn-tree').classList.remove('active');
             document.getElementById('btn-force').classList.add('active');
@@ -819,23 +1319,25 @@ class BladeHtmlVisualizer:
         
         function dragstarted(event, d) {{
             if (currentLayout === 'force') {{
-                if (!event.active) simulation.alphaTarget(0.3).restart();
+                if (!event.active) forceLayout.alphaTarget(0.3);
             }}
             d.fx = d.x;
             d.fy = d.y;
+            forceLayout.fix(d);
         }}
         
         function dragged(event, d) {{
             d.fx = event.x;
             d.fy = event.y;
-            if (currentLayout === 'tree') {{
-                updatePositions();
-            }}
+            d.x = d.fx;
+            d.y = d.fy;
+            forceLayout.fix(d);
+            scheduleRender();
         }}
         
         function dragended(event, d) {{
             if (currentLayout === 'force') {{
-                if (!event.active) simulation.alphaTarget(0);
+                if (!event.active) forceLayout.alphaTarget(0);
             }}
         }}
         
@@ -845,27 +1347,126 @@ class BladeHtmlVisualizer:
             currentModuleIndex = index;
             const module = allModules[index];
             
-            nodesData = module.nodes;
-            linksData = module.links;
-            
             document.getElementById('current-module').textContent = module.source_file;
             document.getElementById('node-count').textContent = module.node_count;
             document.getElementById('edge-count').textContent = module.edge_count;
+            document.getElementById('module-index').textContent = index + 1;
+            document.getElementById('module-total').textContent = allModules.length;
+            
+            document.getElementById('btn-prev').disabled = (index === 0);
+            document.getElementById('btn-next').disabled = (index === allModules.length - 1);
+            
+            if (allModules.length === 1) {{
+                document.getElementById('module-nav').style.display = 'none';
+            }}
+            
+            const hasProfile = module.critical_path_cost !== null && module.critical_path_cost !== undefined;
+            document.getElementById('legend-critical').style.display = hasProfile ? 'flex' : 'none';
+            if (hasProfile) {{
+                document.getElementById('critical-cost').textContent = formatCost(module.critical_path_cost);
+                document.getElementById('parallelism').textContent = module.parallelism.toFixed(2);
+            }}
+            
+            moduleGraph(index).then(graph => {{
+                if (index !== currentModuleIndex) return;  // 加载期间已切换到其他模块
+                currentGraph = graph;
+                showModuleView();
+                
+                // 预取相邻模块
+                for (const neighbor of [index + 1, index - 1]) {{
+                    if (neighbor >= 0 && neighbor < allModules.length) {{
+                        moduleGraph(neighbor).catch(() => {{}});
+                    }}
+                }}
+            }}).catch(error => {{
+                document.getElementById('node-info').textContent = '加载模块数据失败：' + error.message;
+            }});
+        }}
+        
+        // 显示当前模块：有分类汇总且还有折叠的分类时显示折叠视图，否则显示完整的图
+        function showModuleView() {{
+            const clusters = currentGraph.clusters;
+            const collapsed = clusters !== null && clusters.expanded.size < clusters.nodes.length;
+            if (collapsed) {{
+                const view = clusterViewGraph(currentGraph, (merged, l) => {{
+                    if (l.critical) merged.critical = true;
+                }});
+                nodesData = view.nodes;
+                linksData = view.links;
+                precomputedLayout = null;  // 预计算的布局只适用于完整的图
+            }} else {{
+                nodesData = currentGraph.nodes;
+                linksData = currentGraph.links;
+                precomputedLayout = currentGraph.layout;
+            }}
             
+            const button = document.getElementById('btn-clusters');
+            button.style.display = clusters ? '' : 'none';
+            button.textContent = collapsed ? '📁 展开全部' : '📁 折叠分类';
             redrawGraph();
         }}
         
+        // 展开一个分类：其中的节点从超级节点的位置出发
+        function expandCluster(c) {{
+            c.members.forEach(d => {{
+                d.x = c.x + (Math.random() - 0.5) * 40;
+                d.y = c.y + (Math.random() - 0.5) * 40;
+            }});
+            currentGraph.clusters.expanded.add(c.cluster);
+            showModuleView();
+        }}
+        
+        // 折叠一个分类：超级节点放在其中节点的中心
+        function collapseCluster(c) {{
+            c.x = d3.mean(c.members, d => d.x);
+            c.y = d3.mean(c.members, d => d.y);
+            currentGraph.clusters.expanded.delete(c.cluster);
+            showModuleView();
+        }}
+        
+        document.getElementById('btn-clusters').addEventListener('click', () => {{
+            const clusters = currentGraph.clusters;
+            if (clusters.expanded.size < clusters.nodes.length) {{
+                clusters.nodes.forEach(c => clusters.expanded.add(c.cluster));
+            }} else {{
+                clusters.expanded.clear();
+            }}
+            showModuleView();
+        }});
+        
         function redrawGraph() {{
+            forceLayout.stop();
             g.selectAll("*").remove();
             
-            simulation.nodes(nodesData);
-            simulation.force("link").links(linksData);
+            // 节点较多时使用 Canvas 渲染
+            useCanvas = nodesData.length > CANVAS_NODE_THRESHOLD;
+            svg.style("display", useCanvas ? "none" : null);
+            canvasView.show(useCanvas);
+            if (useCanvas) {{
+                link = null;
+                node = null;
+                canvasView.setGraph(nodesData, linksData);
+            }} else {{
+                drawSvgGraph();
+            }}
+            
+            resetHighlight();
+            selectedNode = null;
             
+            if (currentLayout === 'tree') {{
+                switchToTreeLayout();
+            }} else {{
+                switchToForceLayout();
+            }}
+        }}
+        
+        function drawSvgGraph() {{
             const newLink = g.append("g")
                 .selectAll("path")
                 .data(linksData)
                 .join("path")
                 .attr("class", "link")
+                .classed("critical", d => d.critical)
                 .attr("marker-end", "url(#arrowhead)");
             
             link = newLink;
@@ -874,7 +1475,7 @@ class BladeHtmlVisualizer:
                 .selectAll("g")
                 .data(nodesData)
                 .join("g")
-                .attr("class", "node")
+                .attr("class", d => d.collapsed ? "node cluster-node" : "node")
                 .call(d3.drag()
                     .on("start", dragstarted)
                     .on("drag", dragged)
@@ -883,8 +1484,8 @@ class BladeHtmlVisualizer:
             newNode.append("circle")
                 .attr("r", d => getNodeRadius(d.size))
                 .attr("fill", d => getNodeColor(d.size))
-                .attr("stroke", d => d.is_source ? "#2196F3" : "#fff")
-                .attr("stroke-width", d => d.is_source ? 4 : 2);
+                .attr("stroke", d => d.is_source ? "#2196F3" : (d.critical ? "#9c27b0" : "#fff"))
+                .attr("stroke-width", d => (d.is_source || d.critical) ? 4 : 2);
             
             newNode.append("text")
                 .text(d => d.name)
@@ -896,72 +1497,95 @@ class BladeHtmlVisualizer:
             
             node.on("click", function(event, d) {{
                 event.stopPropagation();
-                
-                if (selectedNode === d.id) {{
-                    resetHighlight();
-                    selectedNode = null;
-                    return;
-                }}
-                
-                selectedNode = d.id;
-                
-                node.classed("dimmed", true).classed("highlighted", false);
-                link.classed("dimmed", true)
-                    .classed("dependency", false)
-                    .classed("dependent", false);
-                
-                d3.select(this).classed("dimmed", false).classed("highlighted", true);
-                
-                const relatedNodes = new Set([d.id]);
-                let dependencyCount = 0;
-                let dependentCount = 0;
-                
-                link.each(function(l) {{
-                    if (l.source.id === d.id) {{
-                        d3.select(this)
-                            .classed("dimmed", false)
-                            .classed("dependency", true);
-                        relatedNodes.add(l.target.id);
-                        dependencyCount++;
-                    }} else if (l.target.id === d.id) {{
-                        d3.select(this)
-                            .classed("dimmed", false)
-                            .classed("dependent", true);
-                        relatedNodes.add(l.source.id);
-                        dependentCount++;
-                    }}
-                }});
-                
-                node.filter(n => relatedNodes.has(n.id))
-                    .classed("dimmed", false)
-                    .classed("highlighted", true);
-                
-                const nodeInfo = document.getElementById("node-info");
-                nodeInfo.className = "";
-                nodeInfo.innerHTML = `
-                    <strong>${{d.name}}</strong>
-                    <div><strong>Target：</strong>${{d.path}}</div>
-                    <div><strong>类型：</strong>${{d.type}}</div>
-                    <div><strong>模块：</strong>${{d.cluster}}</div>
-                    <div><strong>源文件：</strong>${{d.srcs_count}} 个</div>
-                    <div><strong>头文件：</strong>${{d.hdrs_count}} 个</div>
-                    <div style="margin-top: 10px;">
-                        <strong>依赖：</strong><span style="color: #f44336;">${{dependencyCount}}</span> 个 Target<br>
-                        <strong>被依赖：</strong><span style="color: #4caf50;">${{dependentCount}}</span> 个 Target
-                    </div>
-                `;
+                toggleNodeSelection(d);
             }});
+        }}
+        
+        // 点击节点：高亮它的依赖和被依赖，再次点击取消高亮
+        function toggleNodeSelection(d) {{
+            if (d.collapsed) {{
+                expandCluster(d);
+                return;
+            }}
             
-            resetHighlight();
-            selectedNode = null;
+            if (selectedNode === d.id) {{
+                resetHighlight();
+                selectedNode = null;
+                return;
+            }}
             
-            if (currentLayout === 'tree') {{
-                switchToTreeLayout();
-            }} else {{
-                switchToForceLayout();
+            selectedNode = d.id;
+            
+            nodesData.forEach(n => {{
+                n.dimmed = true;
+                n.highlighted = false;
+            }});
+            d.dimmed = false;
+            d.highlighted = true;
+            
+            let dependencyCount = 0;
+            let dependentCount = 0;
+            
+            linksData.forEach(l => {{
+                l.dimmed = true;
+                l.dependency = false;
+                l.dependent = false;
+                if (l.source === d) {{
+                    l.dimmed = false;
+                    l.dependency = true;
+                    l.target.dimmed = false;
+                    l.target.highlighted = true;
+                    dependencyCount += l.count || 1;
+                }} else if (l.target === d) {{
+                    l.dimmed = false;
+                    l.dependent = true;
+                    l.source.dimmed = false;
+                    l.source.highlighted = true;
+                    dependentCount += l.count || 1;
+                }}
+            }});
+            applyHighlight();
+            
+            const nodeInfo = document.getElementById("node-info");
+            nodeInfo.className = "";
+            nodeInfo.innerHTML = `
+                <strong>${{d.name}}</strong>
+                <div><strong>Target：</strong>${{d.path}}</div>
+                <div><strong>类型：</strong>${{d.type}}</div>
+                <div><strong>模块：</strong>${{d.cluster}}</div>
+                <div><strong>源文件：</strong>${{d.srcs_count}} 个</div>
+                <div><strong>头文件：</strong>${{d.hdrs_count}} 个</div>
+                ${{d.compile_bytes !== null ? `<div><strong>编译量：</strong>${{formatSize(d.compile_bytes)}}（含依赖 ${{formatSize(d.total_compile_bytes)}}）</div>` : ''}}
+                ${{d.cost !== null ? `<div><strong>开销：</strong>${{formatCost(d.cost)}}，<strong>松弛：</strong>${{formatCost(d.slack)}}${{d.critical ? '（关键路径）' : ''}}</div>` : ''}}
+                <div style="margin-top: 10px;">
+                    <strong>依赖：</strong><span style="color: #f44336;">${{dependencyCount}}</span> 个 Target<br>
+                    <strong>被依赖：</strong><span style="color: #4caf50;">${{dependentCount}}</span> 个 Target
+                </div>
+                ${{d.clusterNode ? `<button class="nav-btn" id="btn-collapse-cluster" style="margin-top: 10px;">折叠 ${{d.cluster}}</button>` : ''}}
+            `;
+            if (d.clusterNode) {{
+                document.getElementById('btn-collapse-cluster')
+                    .addEventListener('click', () => collapseCluster(d.clusterNode));
             }}
         }}
         
+        document.getElementById('btn-prev').addEventListener('click', () => {{
+            loadModule(currentModuleIndex - 1);
+        }});
+        
+        document.getElementById('btn-next').addEventListener('click', () => {{
+            loadModule(currentModuleIndex + 1);
+        }});
+        
+        document.addEventListener('keydown', (e) => {{
+            if (e.target.tagName === 'INPUT') return;
+            if (e.key === 'ArrowLeft' && currentModuleIndex > 0) {{
+                loadModule(currentModuleIndex - 1);
+            }} else if (e.key === 'ArrowRight' && currentModuleIndex < allModules.length - 1) {{
+                loadModule(currentModuleIndex + 1);
+            }}
+        }});
+        
         // 控制面板收起/展开功能
         const toggleBtn = document.getElementById('toggle-btn');
         const controls = document.getElementById('controls');
@@ -983,5 +1607,11 @@ class BladeHtmlVisualizer:
             }}
         }});
         
-        loadModule(0);"""
+        decodePayload(graphData).then(data => {{
+            nodeTable = data.nodes;
+            allModules = data.modules;
+            loadModule(0);
+        }}).catch(error => {{
+            document.getElementById('node-info').textContent = '加载图数据失败：' + error.message;
+        }});"""
 
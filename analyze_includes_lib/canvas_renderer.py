@@ -0,0 +1,275 @@
+"""
+Canvas 渲染器：节点数较多时用单个 <canvas> 代替 SVG 绘制依赖图
+
+SVG 为每个节点和边创建 DOM 元素，数万个节点时页面无法使用。Canvas 渲染器
+每帧按样式分批绘制（每种样式一次 fill/stroke），只绘制视口内的元素，
+节点较多时不绘制标签。节点的半径和样式只依赖节点的静态属性，在 setGraph
+时计算一次；高亮状态由页面写在节点和边的数据上（dimmed 等字段）。
+点击、悬停和拖动通过 d3.quadtree 命中测试，缩放仍使用 d3.zoom。
+"""
+
+# 页面中的渲染器：createCanvasRenderer(canvas, options) 返回
+# {setGraph(nodes, links), setDecorations(decorations), update(), render(), show(visible)}
+CANVAS_RENDERER_JS = """// Canvas 渲染（节点数超过阈值时代替 SVG）
+        function createCanvasRenderer(canvas, options) {
+            const context = canvas.getContext('2d');
+            const ratio = window.devicePixelRatio || 1;
+            let nodes = [];
+            let links = [];
+            let radii = null;         // 节点半径（与 nodes 平行）
+            let styleIds = null;      // 节点样式在 nodeStyles 中的下标（与 nodes 平行）
+            let nodeStyles = [];      // 不同的 {fill, stroke: {color, width}}
+            let nodeIndex = new Map();
+            let decorations = null;   // 树形布局的集群框和层级标签
+            let transform = d3.zoomIdentity;
+            let tree = null;          // 节点位置的四叉树，位置变化后重建
+            let maxRadius = 0;
+            let hovered = null;
+            let frame = null;
+
+            canvas.width = options.width * ratio;
+            canvas.height = options.height * ratio;
+            canvas.style.width = options.width + 'px';
+            canvas.style.height = options.height + 'px';
+
+            function findNode(px, py) {
+                if (!tree) tree = d3.quadtree(nodes, d => d.x || 0, d => d.y || 0);
+                const x = transform.invertX(px);
+                const y = transform.invertY(py);
+                const d = tree.find(x, y, maxRadius + 2);
+                if (!d) return null;
+                const dx = (d.x || 0) - x;
+                const dy = (d.y || 0) - y;
+                const r = radii[nodeIndex.get(d)] + 2;
+                return dx * dx + dy * dy <= r * r ? d : null;
+            }
+
+            function graphEvent(event) {
+                return {
+                    active: event.active,
+                    x: transform.invertX(event.x),
+                    y: transform.invertY(event.y),
+                    sourceEvent: event.sourceEvent
+                };
+            }
+
+            function drawDecorations() {
+                context.save();
+                context.lineWidth = 2;
+                context.setLineDash([5, 5]);
+                context.globalAlpha = 0.6;
+                context.fillStyle = 'rgba(33, 150, 243, 0.03)';
+                context.strokeStyle = '#2196F3';
+                context.beginPath();
+                for (const rect of decorations.clusterRects) {
+                    context.rect(rect.x, rect.y, rect.width, rect.height);
+                }
+                context.fill();
+                context.stroke();
+                context.restore();
+
+                context.fillStyle = '#2196F3';
+                context.font = 'bold 11px sans-serif';
+                context.textAlign = 'start';
+                for (const rect of decorations.clusterRects) {
+                    context.fillText(`${rect.cluster} (${rect.nodeCount})`, rect.x + 10, rect.y + 16);
+                }
+                context.fillStyle = '#666';
+                context.font = 'bold 14px sans-serif';
+                context.textAlign = 'center';
+                for (const label of decorations.levelLabels) {
+                    context.fillText(label.text, label.x, label.y);
+                }
+                context.textAlign = 'start';
+            }
+
+            function draw() {
+                frame = null;
+                context.setTransform(ratio, 0, 0, ratio, 0, 0);
+                context.clearRect(0, 0, options.width, options.height);
+                context.translate(transform.x, transform.y);
+                context.scale(transform.k, transform.k);
+
+                // 视口在图坐标中的范围（留出最大节点半径的余量）
+                const x0 = transform.invertX(0) - maxRadius;
+                const y0 = transform.invertY(0) - maxRadius;
+                const x1 = transform.invertX(options.width) + maxRadius;
+                const y1 = transform.invertY(options.height) + maxRadius;
+
+                if (decorations) drawDecorations();
+
+                // 边：按样式分组，每组一次 stroke；放大到一定程度后再绘制箭头
+                const groups = new Map(Object.keys(options.linkStyles).map(key => [key, []]));
+                for (const l of links) {
+                    const sx = l.source.x || 0, sy = l.source.y || 0;
+                    const tx = l.target.x || 0, ty = l.target.y || 0;
+                    if ((sx < x0 && tx < x0) || (sx > x1 && tx > x1) ||
+                        (sy < y0 && ty < y0) || (sy > y1 && ty > y1)) continue;
+                    groups.get(options.linkStyle(l)).push(l);
+                }
+                const arrows = transform.k >= 0.5;
+                for (const [key, group] of groups) {
+                    if (!group.length) continue;
+                    const style = options.linkStyles[key];
+                    context.globalAlpha = style.opacity;
+                    context.strokeStyle = style.stroke;
+                    context.fillStyle = style.stroke;
+                    context.lineWidth = style.width;
+                    context.setLineDash(style.dash || []);
+                    context.beginPath();
+                    for (const l of group) {
+                        context.moveTo(l.source.x || 0, l.source.y || 0);
+                        context.lineTo(l.target.x || 0, l.target.y || 0);
+                    }
+                    context.stroke();
+                    context.setLineDash([]);
+                    if (!arrows) continue;
+                    context.beginPath();
+                    for (const l of group) {
+                        const sx = l.source.x || 0, sy = l.source.y || 0;
+                        const dx = (l.target.x || 0) - sx, dy = (l.target.y || 0) - sy;
+                        const length = Math.sqrt(dx * dx + dy * dy);
+                        if (!length) continue;
+                        const ux = dx / length, uy = dy / length;
+                        const tip = length - radii[nodeIndex.get(l.target)];
+                        const px = sx + ux * tip, py = sy + uy * tip;
+                        context.moveTo(px, py);
+                        context.lineTo(px - ux * 8 - uy * 4, py - uy * 8 + ux * 4);
+                        context.lineTo(px - ux * 8 + uy * 4, py - uy * 8 - ux * 4);
+                        context.closePath();
+                    }
+                    context.fill();
+                }
+
+                // 节点：按样式和是否变暗分组（组下标为 样式下标 * 2 + 是否变暗）
+                const nodeGroups = nodeStyles.flatMap(() => [[], []]);
+                const visible = [];
+                for (let i = 0; i < nodes.length; i++) {
+                    const d = nodes[i];
+                    const x = d.x || 0, y = d.y || 0;
+                    if (x < x0 || x > x1 || y < y0 || y > y1) continue;
+                    visible.push(i);
+                    nodeGroups[styleIds[i] * 2 + (d.dimmed ? 1 : 0)].push(i);
+                }
+                nodeGroups.forEach((group, index) => {
+                    if (!group.length) return;
+                    const style = nodeStyles[index >> 1];
+                    context.globalAlpha = index & 1 ? 0.2 : 1;
+                    context.fillStyle = style.fill;
+                    context.strokeStyle = style.stroke.color;
+                    context.lineWidth = style.stroke.width;
+                    context.beginPath();
+                    for (const i of group) {
+                        const x = nodes[i].x || 0, y = nodes[i].y || 0;
+                        context.moveTo(x + radii[i], y);
+                        context.arc(x, y, radii[i], 0, 2 * Math.PI);
+                    }
+                    context.fill();
+                    context.stroke();
+                });
+
+                // 标签：只在可见节点不多且字号足够大时绘制，悬停的节点总是显示
+                const labeled = visible.length <= options.labelLimit && transform.k * 11 >= 6 ? visible : [];
+                const hoveredIndex = hovered ? nodeIndex.get(hovered) : -1;
+                context.font = '11px sans-serif';
+                context.lineWidth = 3;
+                context.strokeStyle = 'rgba(255, 255, 255, 0.8)';
+                context.fillStyle = '#000';
+                for (const i of hovered ? labeled.concat([hoveredIndex]) : labeled) {
+                    const d = nodes[i];
+                    const x = (d.x || 0) + radii[i] + 5;
+                    const y = (d.y || 0) + 4;
+                    context.globalAlpha = d.dimmed && d !== hovered ? 0.2 : 1;
+                    context.strokeText(d.name, x, y);
+                    context.fillText(d.name, x, y);
+                }
+
+                if (hovered) {
+                    const stroke = nodeStyles[styleIds[hoveredIndex]].stroke;
+                    context.globalAlpha = 1;
+                    context.strokeStyle = stroke.color;
+                    context.lineWidth = stroke.width + 1;
+                    context.beginPath();
+                    context.arc(hovered.x || 0, hovered.y || 0, radii[hoveredIndex], 0, 2 * Math.PI);
+                    context.stroke();
+                }
+                context.globalAlpha = 1;
+            }
+
+            const selection = d3.select(canvas);
+            selection
+                .call(d3.drag()
+                    .container(canvas)
+                    .subject(event => {
+                        const d = findNode(event.x, event.y);
+                        return d ? {node: d, x: event.x, y: event.y} : null;
+                    })
+                    .on('start', event => options.onDragStart(graphEvent(event), event.subject.node))
+                    .on('drag', event => options.onDrag(graphEvent(event), event.subject.node))
+                    .on('end', event => options.onDragEnd(graphEvent(event), event.subject.node)))
+                .call(d3.zoom()
+                    .scaleExtent([0.1, 10])
+                    .on('zoom', event => {
+                        transform = event.transform;
+                        renderer.render();
+                    }))
+                .on('click', event => {
+                    const [px, py] = d3.pointer(event);
+                    options.onClick(event, findNode(px, py));
+                })
+                .on('mousemove.hover', event => {
+                    const [px, py] = d3.pointer(event);
+                    const d = findNode(px, py);
+                    if (d === hovered) return;
+                    hovered = d;
+                    canvas.style.cursor = d ? 'pointer' : 'default';
+                    renderer.render();
+                })
+                .on('mouseleave.hover', () => {
+                    if (!hovered) return;
+                    hovered = null;
+                    canvas.style.cursor = 'default';
+                    renderer.render();
+                });
+
+            const renderer = {
+                setGraph(newNodes, newLinks) {
+                    nodes = newNodes;
+                    links = newLinks;
+                    hovered = null;
+                    nodeIndex = new Map(nodes.map((d, i) => [d, i]));
+                    radii = Float32Array.from(nodes, options.nodeRadius);
+                    maxRadius = radii.reduce((r, value) => Math.max(r, value), 0);
+                    const styleIndex = new Map();
+                    nodeStyles = [];
+                    styleIds = Int32Array.from(nodes, d => {
+                        const fill = options.nodeFill(d);
+                        const stroke = options.nodeStroke(d);
+                        const key = `${fill}|${stroke.color}|${stroke.width}`;
+                        if (!styleIndex.has(key)) {
+                            styleIndex.set(key, nodeStyles.length);
+                            nodeStyles.push({fill, stroke});
+                        }
+                        return styleIndex.get(key);
+                    });
+                    this.update();
+                },
+                setDecorations(value) {
+                    decorations = value;
+                    this.render();
+                },
+                // 节点位置变化后调用
+                update() {
+                    tree = null;
+                    this.render();
+                },
+                // 下一帧重绘（同一帧内的多次调用合并为一次）
+                render() {
+                    if (frame === null) frame = requestAnimationFrame(draw);
+                },
+                show(visible) {
+                    canvas.style.display = visible ? 'block' : 'none';
+                }
+            };
+            return renderer;
+        }"""
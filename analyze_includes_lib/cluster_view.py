@@ -0,0 +1,156 @@
+"""
+分类折叠视图：节点较多时页面初始把每个目录分类折叠为一个超级节点，点击后再展开
+
+分类汇总（每个分类的节点数、总大小、最小层级，以及分类之间合并后的边和边数）
+在生成 HTML 时计算，页面首次绘制只需要创建几百个元素。展开部分分类后，
+页面按两端所在的视图节点重新合并边。
+"""
+
+
+def summarize_clusters(clusters, sizes, levels, links):
+    """
+    计算模块的分类汇总
+
+    Args:
+        clusters: 每个节点的分类（通常是分类名在字符串表中的下标）
+        sizes: 每个节点的大小
+        levels: 每个节点的层级
+        links: 以节点下标表示的边列表 [(src, dst), ...]
+
+    Returns:
+        (summary, link_groups) 元组：summary 为写入模块数据的字典
+        {'cluster_ids', 'cluster_counts', 'cluster_sizes', 'cluster_levels', 'cluster_links'}，
+        其中 cluster_links 为每条分类间的边的 [源分类, 目标分类, 边数, 最大的目标大小] 依次拼接；
+        link_groups 为每条边合并到的分类间的边的下标，两端在同一分类时为 None
+    """
+    group_index = {}  # 分类 -> 分类下标
+    ids = []
+    counts = []
+    total_sizes = []
+    min_levels = []
+    node_groups = []
+    for cluster, size, level in zip(clusters, sizes, levels):
+        group = group_index.get(cluster)
+        if group is None:
+            group = group_index[cluster] = len(ids)
+            ids.append(cluster)
+            counts.append(0)
+            total_sizes.append(0)
+            min_levels.append(level)
+        counts[group] += 1
+        total_sizes[group] += size
+        min_levels[group] = min(min_levels[group], level)
+        node_groups.append(group)
+
+    link_index = {}  # (源分类, 目标分类) -> 分类间的边的下标
+    cluster_links = []
+    link_groups = []
+    for src, dst in links:
+        pair = (node_groups[src], node_groups[dst])
+        if pair[0] == pair[1]:
+            link_groups.append(None)
+            continue
+        index = link_index.get(pair)
+        if index is None:
+            index = link_index[pair] = len(cluster_links) // 4
+            cluster_links.extend([pair[0], pair[1], 0, 0])
+        cluster_links[4 * index + 2] += 1
+        cluster_links[4 * index + 3] = max(cluster_links[4 * index + 3], sizes[dst])
+        link_groups.append(index)
+
+    summary = {
+        'cluster_ids': ids,
+        'cluster_counts': counts,
+        'cluster_sizes': total_sizes,
+        'cluster_levels': min_levels,
+        'cluster_links': cluster_links,
+    }
+    return summary, link_groups
+
+
+# 页面中的折叠视图函数：buildClusterGraph(graph, module, clusterNames) 返回
+# {nodes, links, expanded}，clusterViewGraph(graph, mergeLink) 返回当前视图的 {nodes, links}
+CLUSTER_VIEW_JS = """// 分类折叠视图（分类汇总在生成 HTML 时计算）
+        // 根据模块的分类汇总创建超级节点和超级节点之间的边，并记录每个节点所属的超级节点
+        function buildClusterGraph(graph, module, clusterNames) {
+            const nodes = module.cluster_ids.map((id, i) => ({
+                id: `[${clusterNames[id]}]`,
+                name: `${clusterNames[id]} (${module.cluster_counts[i]})`,
+                path: clusterNames[id],
+                cluster: clusterNames[id],
+                size: module.cluster_sizes[i],
+                weight: module.cluster_sizes[i],
+                level: module.cluster_levels[i],
+                is_source: false,
+                collapsed: true,
+                members: []
+            }));
+            const byName = new Map(nodes.map(c => [c.cluster, c]));
+            for (const d of graph.nodes) {
+                d.clusterNode = byName.get(d.cluster);
+                d.clusterNode.members.push(d);
+                if (d.is_source) d.clusterNode.is_source = true;
+            }
+            const redundant = new Set(module.cluster_redundant_links || []);
+            const links = [];
+            for (let i = 0; i < module.cluster_links.length; i += 4) {
+                links.push({
+                    source: nodes[module.cluster_links[i]],
+                    target: nodes[module.cluster_links[i + 1]],
+                    count: module.cluster_links[i + 2],
+                    size: module.cluster_links[i + 3],
+                    redundant: redundant.has(i / 4)
+                });
+            }
+            return {nodes, links, expanded: new Set()};
+        }
+
+        // 返回当前视图的节点和边：展开的分类显示其中的节点，折叠的分类显示为超级节点。
+        // 两端不变的边直接使用，其余的边按两端所在的视图节点合并（count 为合并的边数），
+        // mergeLink(merged, link) 合并页面特有的属性
+        function clusterViewGraph(graph, mergeLink) {
+            const clusters = graph.clusters;
+            const expanded = clusters.expanded;
+            if (!expanded.size) return {nodes: clusters.nodes, links: clusters.links};
+
+            const nodes = [];
+            for (const c of clusters.nodes) {
+                if (!expanded.has(c.cluster)) {
+                    nodes.push(c);
+                    continue;
+                }
+                for (const d of c.members) nodes.push(d);
+            }
+            const visible = d => expanded.has(d.cluster) ? d : d.clusterNode;
+            const links = [];
+            const merged = new Map();  // 源视图节点 -> Map(目标视图节点 -> 合并的边)
+            for (const l of graph.links) {
+                const source = visible(l.source);
+                const target = visible(l.target);
+                if (source === l.source && target === l.target) {
+                    links.push(l);
+                    continue;
+                }
+                if (source === target) continue;
+                if (!merged.has(source)) merged.set(source, new Map());
+                let m = merged.get(source).get(target);
+                if (!m) {
+                    m = {source, target, count: 0, size: 0};
+                    merged.get(source).set(target, m);
+                    links.push(m);
+                }
+                m.count++;
+                m.size = Math.max(m.size, l.size);
+                if (mergeLink) mergeLink(m, l);
+            }
+            return {nodes, links};
+        }
+
+        // 搜索：超级节点匹配分类名或其中任一节点的名称
+        function matchesSearch(d, term) {
+            if (d.collapsed) {
+                return d.cluster.toLowerCase().includes(term)
+                    || d.members.some(m => m.name.toLowerCase().includes(term));
+            }
+            return d.name.toLowerCase().includes(term);
+        }"""
@@ -17,6 +17,15 @@ DEFAULT_INCLUDE_PATHS = [
 # 匹配 #include 语句的正则表达式
 INCLUDE_PATTERN = re.compile(r'^\s*#\s*include\s+(["<])([^">]+)[">]')
 
+# 匹配预处理文件（.i）中行标记的正则表达式，如：# 1 "/usr/include/stdio.h" 1 3 4
+LINE_MARKER_PATTERN = re.compile(rb'^#\s+\d+\s+"([^"]+)"')
+
+# C/C++ 头文件扩展名
+HEADER_EXTENSIONS = ('.h', '.hh', '.hpp', '.hxx', '.inl', '.ipp', '.tcc')
+
+# C/C++ 源文件扩展名（每个源文件是一个编译单元）
+SOURCE_EXTENSIONS = ('.c', '.cc', '.cpp', '.cxx', '.C')
+
 # 第三方库识别配置
 THIRD_PARTY_LIBS = {
     'boost': 'Boost',
@@ -40,3 +49,13 @@ SIZE_COLOR_MAP = [
     (float('inf'), "#EF9A9A"), # > 200KB: 红色（巨大）
 ]
 
+
+# 扫描 Blade 工作区时跳过的目录（构建输出、版本控制等）
+BLADE_SKIP_DIRS = {
+    'build32_debug',
+    'build32_release',
+    'build64_debug',
+    'build64_release',
+    'blade-bin',
+    'node_modules',
+}
@@ -1,30 +1,126 @@
 """
 DOT 格式可视化器：生成 Graphviz DOT 文件
 """
+import math
 import os
 import re
 from collections import defaultdict
 from .utils import (
-    get_file_size, format_size, get_node_color,
-    simplify_path, get_directory_cluster
+    get_file_size, get_node_color, simplify_path,
+    get_directory_cluster, scale_weights_to_sizes, format_weight
 )
+from .graph_reduce import transitive_reduction
 
 
 class DotVisualizer:
     """DOT 格式可视化器"""
     
-    def __init__(self, nodes, edges, source_file):
+    def __init__(self, nodes, edges, source_file, node_weights=None, weight_unit='B',
+                 reduce=False):
         """
         初始化可视化器
         
         Args:
             nodes: 文件节点集合
             edges: 依赖关系边列表
-            source_file: 源文件路径
+            source_file: 源文件路径，合并多个模块时为源文件路径的列表
+            node_weights: 可选的节点权重字典 {path: weight}（如解析耗时），
+                          提供时替代文件大小决定节点颜色和边的高亮
+            weight_unit: 节点权重的单位，'B'、's' 或 'lines'
+            reduce: 是否去掉传递归约中冗余的边（可由其他依赖路径推出的边）
         """
         self.nodes = nodes
         self.edges = edges
-        self.source_file = os.path.abspath(source_file)
+        self.redundant_count = 0
+        if reduce:
+            self.edges = self._reduce_edges(edges)
+        source_files = [source_file] if isinstance(source_file, str) else source_file
+        self.source_files = {os.path.abspath(path) for path in source_files}
+        self.node_weights = node_weights
+        self.weight_unit = weight_unit if node_weights is not None else 'B'
+        self._scaled_sizes = (
+            scale_weights_to_sizes(node_weights) if node_weights is not None else None
+        )
+        self._attrs = None  # 节点属性表，generate 时计算
+    
+    @classmethod
+    def from_modules(cls, modules_data, **kwargs):
+        """
+        合并多个模块的依赖图
+        
+        Args:
+            modules_data: 模块列表，格式同 HtmlVisualizer（每项含 source_file、nodes、edges）
+            **kwargs: 传给构造函数的其他参数
+        
+        Returns:
+            DotVisualizer 实例，所有模块的源文件都高亮显示
+        """
+        nodes = {}
+        edges = {}
+        for module in modules_data:
+            nodes.update(dict.fromkeys(module['nodes']))
+            edges.update(dict.fromkeys(module['edges']))
+        return cls(
+            list(nodes), list(edges),
+            [module['source_file'] for module in modules_data],
+            **kwargs
+        )
+    
+    def _reduce_edges(self, edges):
+        """去掉冗余的边（静态 DOT 无法切换显示，直接省略）"""
+        edges = list(edges)
+        index = {}
+        for node in self.nodes:
+            index.setdefault(node, len(index))
+        for src, dst in edges:
+            index.setdefault(src, len(index))
+            index.setdefault(dst, len(index))
+        redundant = set(transitive_reduction(
+            len(index), [(index[src], index[dst]) for src, dst in edges]
+        ))
+        self.redundant_count = len(redundant)
+        return [edge for i, edge in enumerate(edges) if i not in redundant]
+    
+    def _node_size(self, path):
+        """返回节点用于配色的等效字节数"""
+        if self._scaled_sizes is None:
+            return get_file_size(path)
+        return self._scaled_sizes.get(path, 0)
+    
+    def _node_weight(self, path):
+        """返回节点的原始权重（未提供权重时为文件大小）"""
+        if self.node_weights is None:
+            return get_file_size(path)
+        return self.node_weights.get(path, 0)
+    
+    def _build_attrs(self):
+        """
+        计算节点属性表，每个路径只计算一次
+        
+        Returns:
+            字典 {path: (node_id, size, weight, cluster)}
+        """
+        attrs = {}
+        paths = list(self.nodes)
+        for src, dst in self.edges:
+            paths.append(src)
+            paths.append(dst)
+        for path in paths:
+            if path not in attrs:
+                attrs[path] = (
+                    simplify_path(path),
+                    self._node_size(path),
+                    self._node_weight(path),
+                    get_directory_cluster(path),
+                )
+        return attrs
+    
+    def _write_header(self, f):
+        """写入图的公共属性"""
+        f.write("digraph Dependencies {\n")
+        f.write("  rankdir=LR;\n")  # Left to Right layout
+        f.write("  node [shape=box, style=\"filled,rounded\", fontname=\"Helvetica\"];\n")
+        f.write("  edge [color=\"#55555533\", arrowsize=0.5, weight=1];\n")
     
     def generate(self, output_file):
         """
@@ -33,28 +129,16 @@ class DotVisualizer:
         Args:
             output_file: 输出文件路径
         """
+        self._attrs = self._build_attrs()
         with open(output_file, "w") as f:
-            f.write("digraph Dependencies {\n")
-            f.write("  rankdir=LR;\n")  # Left to Right layout
-            f.write("  node [shape=box, style=\"filled,rounded\", fontname=\"Helvetica\"];\n")
-            f.write("  edge [color=\"#55555533\", arrowsize=0.5, weight=1];\n")
+            self._write_header(f)
             f.write("  compound=true;\n")  # Allow edges between clusters
             f.write("  concentrate=true;\n")  # Merge multiple edges
             
             # 按目录分组节点
             clusters = defaultdict(list)
-            cluster_edges = set()
-
             for node in self.nodes:
-                cluster_name = get_directory_cluster(node)
-                clusters[cluster_name].append(node)
-
-            # 识别跨集群的边
-            for src, dst in self.edges:
-                src_cluster = get_directory_cluster(src)
-                dst_cluster = get_directory_cluster(dst)
-                if src_cluster != dst_cluster:
-                    cluster_edges.add((src_cluster, dst_cluster))
+                clusters[self._attrs[node][3]].append(node)
 
             # 绘制集群
             self._draw_clusters(f, clusters)
@@ -64,6 +148,77 @@ class DotVisualizer:
                 
             f.write("}\n")
     
+    def generate_summary(self, output_file):
+        """
+        生成分类级别的汇总 DOT 文件
+        
+        每个目录分类为一个节点（文件数和总权重），分类之间的边合并为一条，
+        标注合并的边数和目标文件的总权重。节点数只有分类数，大型项目也能用
+        Graphviz 完成布局。
+        
+        Args:
+            output_file: 输出文件路径
+        """
+        if self._attrs is None:
+            self._attrs = self._build_attrs()
+        attrs = self._attrs
+        
+        counts = defaultdict(int)
+        weights = defaultdict(int)
+        max_sizes = defaultdict(int)
+        sources = set()
+        for node in self.nodes:
+            _, size, weight, cluster = attrs[node]
+            counts[cluster] += 1
+            weights[cluster] += weight or 0
+            max_sizes[cluster] = max(max_sizes[cluster], size)
+            if node in self.source_files:
+                sources.add(cluster)
+        
+        # (源分类, 目标分类) -> [边数, 目标文件集合]
+        links = {}
+        for src, dst in self.edges:
+            pair = (attrs[src][3], attrs[dst][3])
+            if pair[0] == pair[1]:
+                continue
+            link = links.get(pair)
+            if link is None:
+                link = links[pair] = [0, set()]
+            link[0] += 1
+            link[1].add(dst)
+        
+        with open(output_file, "w") as f:
+            self._write_header(f)
+            
+            for cluster in sorted(counts):
+                label = f"{cluster}\\n({counts[cluster]} files, "\
+                        f"{format_weight(weights[cluster], self.weight_unit)})"
+                color = get_node_color(max_sizes[cluster])
+                penwidth = "3.0" if cluster in sources else "1.0"
+                f.write(f"  \"{cluster}\" [label=\"{label}\", fillcolor=\"{color}\", penwidth={penwidth}];\n")
+            
+            # 边数少的先画，边数多的后画（前景）
+            f.write("\n  # Edges\n")
+            for (src, dst), (count, targets) in sorted(links.items(), key=lambda x: x[1][0]):
+                if src not in counts or dst not in counts:
+                    continue
+                target_weight = sum(attrs[path][2] or 0 for path in targets)
+                label = f"{count} edges\\n{format_weight(target_weight, self.weight_unit)}"
+                max_size = max(attrs[path][1] for path in targets)
+                if max_size > 200 * 1024:
+                    color = "#B71C1C"
+                elif max_size > 50 * 1024:
+                    color = "#EF9A9A"
+                else:
+                    color = "#1E88E5"
+                penwidth = min(1 + math.log2(count), 8)
+                f.write(
+                    f"  \"{src}\" -> \"{dst}\" "
+                    f"[label=\"{label}\", color=\"{color}\", penwidth={penwidth:.1f}, weight={count}];\n"
+                )
+            
+            f.write("}\n")
+    
     def _draw_clusters(self, f, clusters):
         """绘制集群（分组）"""
         cluster_id = 0
@@ -81,20 +236,21 @@ class DotVisualizer:
             f.write("    fillcolor=\"#f5f5f5\";\n")
             
             for path in file_paths:
-                size = get_file_size(path)
+                node_id, size, weight, _ = self._attrs[path]
                 color = get_node_color(size)
                 
-                # 创建标签：文件名 + 大小
+                # 创建标签：文件名 + 大小（或权重）
                 filename = os.path.basename(path)
-                label = f"{filename}\\n({format_size(size)})"
-                
-                # DOT 中的节点 ID
-                node_id = simplify_path(path)
+                label = f"{filename}\\n({format_weight(weight, self.weight_unit)})"
                 
                 # 源文件特殊高亮
-                penwidth = "3.0" if path == self.source_file else "1.0"
+                penwidth = "3.0" if path in self.source_files else "1.0"
                 
-                f.write(f"    \"{node_id}\" [label=\"{label}\", fillcolor=\"{color}\", penwidth={penwidth}];\n")
+                # 编译失败的头文件用红色虚线边框标出
+                failed = weight is None and self.weight_unit == 's'
+                extra = ", color=\"#E53935\", style=\"filled,rounded,dashed\"" if failed else ""
+                
+                f.write(f"    \"{node_id}\" [label=\"{label}\", fillcolor=\"{color}\", penwidth={penwidth}{extra}];\n")
             
             f.write("  }\n")
             cluster_id += 1
@@ -104,15 +260,15 @@ class DotVisualizer:
         f.write("\n  # Edges\n")
         
         # 按目标文件大小排序：小文件先画（背景），大文件后画（前景）
+        attrs = self._attrs
         edges_list = list(self.edges)
-        edges_list.sort(key=lambda x: get_file_size(x[1]))
+        edges_list.sort(key=lambda x: attrs[x[1]][1])
 
         for src, dst in edges_list:
-            src_id = simplify_path(src)
-            dst_id = simplify_path(dst)
+            src_id, _, _, src_cluster = attrs[src]
+            dst_id, dst_size, _, dst_cluster = attrs[dst]
             
             # 计算边的样式
-            dst_size = get_file_size(dst)
             edge_style = ""
             weight = 1
             
@@ -125,9 +281,6 @@ class DotVisualizer:
                 weight = 3
             
             # 高亮跨模块依赖
-            src_cluster = get_directory_cluster(src)
-            dst_cluster = get_directory_cluster(dst)
-            
             if src_cluster != dst_cluster:
                 if not edge_style:  # 如果还没有被大小高亮
                     edge_style = " [color=\"#1E88E5\", penwidth=1.2]"  # 蓝色表示跨模块
@@ -0,0 +1,179 @@
+"""
+力导向布局：在内联 Web Worker 中运行 d3-force 模拟，主线程只负责渲染
+
+Worker 每轮尽量多地迭代（约 12ms），然后把所有节点坐标打包成 Float32Array
+发回主线程；主线程收到坐标后通过 requestAnimationFrame 合并渲染，每帧最多
+更新一次 DOM。可以在首次渲染前先在 Worker 中迭代指定次数（pre-settle）；
+节点已有布局坐标时以 alpha 0 启动，模拟只在拖动节点时运行。
+浏览器不支持 Worker 或 Worker 中无法加载 d3 时退回到主线程模拟。
+"""
+
+# 页面中的布局控制器：createForceLayout(onUpdate) 返回
+# {start(nodes, links, options), fix(node), alphaTarget(value), stop()}
+FORCE_LAYOUT_JS = """// Worker 中运行的代码（通过 toString() 生成内联脚本）
+        function forceWorkerMain() {
+            let simulation = null;
+            let nodes = [];
+            let generation = 0;
+            let timer = null;
+
+            function post() {
+                const positions = new Float32Array(nodes.length * 2);
+                for (let i = 0; i < nodes.length; i++) {
+                    positions[2 * i] = nodes[i].x;
+                    positions[2 * i + 1] = nodes[i].y;
+                }
+                self.postMessage({generation, positions}, [positions.buffer]);
+            }
+
+            function step() {
+                timer = null;
+                if (!simulation) return;
+                const start = performance.now();
+                do {
+                    simulation.tick();
+                } while (simulation.alpha() >= simulation.alphaMin() && performance.now() - start < 12);
+                post();
+                if (simulation.alpha() >= simulation.alphaMin()) timer = setTimeout(step, 0);
+            }
+
+            function resume() {
+                if (timer === null && simulation) timer = setTimeout(step, 0);
+            }
+
+            self.onmessage = event => {
+                const msg = event.data;
+                if (msg.type === 'init') {
+                    importScripts(msg.d3Url);
+                } else if (msg.type === 'start') {
+                    if (timer !== null) clearTimeout(timer);
+                    timer = null;
+                    generation = msg.generation;
+                    nodes = [];
+                    for (let i = 0; i < msg.radii.length; i++) {
+                        // NaN 坐标由 d3 按默认方式初始化
+                        nodes.push({x: msg.positions[2 * i], y: msg.positions[2 * i + 1], r: msg.radii[i]});
+                    }
+                    const links = [];
+                    for (let i = 0; i < msg.distances.length; i++) {
+                        links.push({source: msg.links[2 * i], target: msg.links[2 * i + 1], distance: msg.distances[i]});
+                    }
+                    simulation = d3.forceSimulation(nodes)
+                        .alpha(msg.alpha)
+                        .force('link', d3.forceLink(links).distance(l => l.distance))
+                        .force('charge', d3.forceManyBody().strength(msg.charge))
+                        .force('center', d3.forceCenter(msg.width / 2, msg.height / 2))
+                        .force('collision', d3.forceCollide().radius(d => d.r + 5))
+                        .stop();
+                    simulation.tick(msg.preSettle);
+                    post();
+                    resume();
+                } else if (msg.type === 'fix' && simulation) {
+                    nodes[msg.index].fx = msg.x;
+                    nodes[msg.index].fy = msg.y;
+                } else if (msg.type === 'alphaTarget' && simulation) {
+                    simulation.alphaTarget(msg.value);
+                    resume();
+                } else if (msg.type === 'stop') {
+                    if (timer !== null) clearTimeout(timer);
+                    timer = null;
+                    simulation = null;
+                }
+            };
+        }
+
+        function createForceLayout(onUpdate) {
+            let worker = null;
+            let generation = 0;
+            let current = null;    // 当前布局的 {nodes, links, options, index}
+            let fallback = null;   // 主线程中的 d3 模拟（无法使用 Worker 时）
+
+            try {
+                const d3Script = document.querySelector('script[src*="d3"]');
+                const source = '(' + forceWorkerMain.toString() + ')()';
+                worker = new Worker(URL.createObjectURL(new Blob([source], {type: 'text/javascript'})));
+                worker.postMessage({type: 'init', d3Url: d3Script.src});
+                worker.onmessage = event => {
+                    const msg = event.data;
+                    if (!current || msg.generation !== generation) return;  // 已切换到其他布局
+                    const nodes = current.nodes;
+                    for (let i = 0; i < nodes.length; i++) {
+                        nodes[i].x = msg.positions[2 * i];
+                        nodes[i].y = msg.positions[2 * i + 1];
+                    }
+                    onUpdate();
+                };
+                worker.onerror = event => {
+                    event.preventDefault();
+                    worker.terminate();
+                    worker = null;
+                    if (current) startFallback();
+                };
+            } catch (e) {
+                worker = null;
+            }
+
+            function startFallback() {
+                const {nodes, links, options} = current;
+                fallback = d3.forceSimulation(nodes)
+                    .alpha(options.alpha)
+                    .force('link', d3.forceLink(links).distance(options.distance))
+                    .force('charge', d3.forceManyBody().strength(options.charge))
+                    .force('center', d3.forceCenter(options.width / 2, options.height / 2))
+                    .force('collision', d3.forceCollide().radius(d => options.radius(d) + 5))
+                    .stop();
+                fallback.tick(options.preSettle);
+                onUpdate();
+                fallback.on('tick', onUpdate).restart();
+            }
+
+            return {
+                start(nodes, links, options) {
+                    this.stop();
+                    generation++;
+                    const index = new Map(nodes.map((d, i) => [d, i]));
+                    current = {nodes, links, options, index};
+                    if (!worker) {
+                        startFallback();
+                        return;
+                    }
+                    const positions = new Float32Array(nodes.length * 2);
+                    const radii = new Float32Array(nodes.length);
+                    nodes.forEach((d, i) => {
+                        positions[2 * i] = d.x === undefined ? NaN : d.x;
+                        positions[2 * i + 1] = d.y === undefined ? NaN : d.y;
+                        radii[i] = options.radius(d);
+                    });
+                    const pairs = new Int32Array(links.length * 2);
+                    const distances = new Float32Array(links.length);
+                    links.forEach((l, i) => {
+                        pairs[2 * i] = index.get(l.source);
+                        pairs[2 * i + 1] = index.get(l.target);
+                        distances[i] = options.distance(l);
+                    });
+                    worker.postMessage({
+                        type: 'start', generation, positions, radii, links: pairs, distances,
+                        charge: options.charge, width: options.width, height: options.height,
+                        preSettle: options.preSettle, alpha: options.alpha
+                    }, [positions.buffer, radii.buffer, pairs.buffer, distances.buffer]);
+                },
+                fix(node) {
+                    if (worker && current) {
+                        worker.postMessage({type: 'fix', index: current.index.get(node), x: node.fx, y: node.fy});
+                    }
+                },
+                alphaTarget(value) {
+                    if (worker) {
+                        worker.postMessage({type: 'alphaTarget', value});
+                    } else if (fallback) {
+                        fallback.alphaTarget(value).restart();
+                    }
+                },
+                stop() {
+                    if (worker) worker.postMessage({type: 'stop'});
+                    if (fallback) fallback.stop();
+                    fallback = null;
+                    current = null;
+                }
+            };
+        }"""
@@ -0,0 +1,411 @@
+"""
+图布局：生成 HTML 时预先计算节点坐标，页面打开后直接使用，不再在浏览器中计算布局
+
+- 层次布局：与页面中的 calculateTreeLayout 相同，按 BFS 层级分列、按目录分组；
+  列的宽度取决于浏览器窗口宽度，只保存列号，由页面换算为 x 坐标
+- 应力布局：PivotMDS（从少量枢轴节点做 BFS，对图距离做经典多维缩放），
+  有 NumPy 时矩阵运算向量化，否则使用纯 Python 实现
+
+计算结果按图的哈希缓存在磁盘上，图没有变化时直接复用。
+"""
+import os
+import sys
+import json
+import math
+import random
+import marshal
+import hashlib
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时使用纯 Python 实现
+    np = None
+
+from .utils import get_cluster_priority
+
+# 布局算法或输出格式变化时递增，使旧的缓存条目失效
+LAYOUT_VERSION = 1
+
+# 应力布局中边的平均长度（与页面中力导向布局的 link distance 相当）
+LINK_DISTANCE = 100
+
+# 应力布局中坐标相同的节点散开的间距
+NODE_SPACING = 25
+
+# PivotMDS 的枢轴节点数
+PIVOTS = 30
+
+# 缓存中最多保留的布局数
+MAX_CACHE_ENTRIES = 256
+
+# 没有 NumPy 时，节点数超过该值的应力布局会提示一次（纯 Python 实现明显更慢）
+PURE_PYTHON_WARN_NODES = 5000
+
+_warned_pure_python = False
+
+
+def layered_layout(levels, clusters, cluster_priority=get_cluster_priority):
+    """
+    计算层次布局：每个层级一列，列内按目录分组，每组画一个集群框
+
+    Args:
+        levels: 每个节点的层级
+        clusters: 每个节点的目录分类名
+        cluster_priority: 目录分类的排序优先级函数
+
+    Returns:
+        (positions, groups) 元组：positions 为 [列号0, y0, 列号1, y1, ...]；
+        groups 为每个集群框的 [第一个节点的下标, 节点数, 列号, 框的 y, 框的高度] 依次拼接
+    """
+    members = {}  # (level, cluster) -> [节点下标]
+    for index, key in enumerate(zip(levels, clusters)):
+        members.setdefault(key, []).append(index)
+
+    positions = [0] * (2 * len(levels))
+    groups = []
+    column = -1
+    last_level = None
+    current_y = 0
+    for level, cluster in sorted(members, key=lambda key: (key[0], cluster_priority(key[1]), key[1])):
+        if level != last_level:
+            column += 1
+            last_level = level
+            current_y = 80
+        nodes = members[(level, cluster)]
+        spacing = max(45, min(60, 300 / len(nodes)))
+        for offset, index in enumerate(nodes):
+            positions[2 * index] = column
+            positions[2 * index + 1] = round(current_y + 25 + offset * spacing)
+        height = len(nodes) * spacing + 30
+        groups.extend([nodes[0], len(nodes), column, round(current_y), round(height)])
+        current_y += height + 15
+    return positions, groups
+
+
+def _bfs_distances(adjacency, start):
+    """返回从 start 出发的无向 BFS 距离，不可达的节点为 -1"""
+    distances = [-1] * len(adjacency)
+    distances[start] = 0
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        level = distances[current] + 1
+        for neighbor in adjacency[current]:
+            if distances[neighbor] < 0:
+                distances[neighbor] = level
+                queue.append(neighbor)
+    return distances
+
+
+def _pivot_distances(adjacency, pivots):
+    """
+    按 max-min 策略选取枢轴节点（每次选离已有枢轴最远的节点），返回各枢轴的距离列
+
+    不可达节点的距离记为该列最大距离加一。
+    """
+    count = len(adjacency)
+    nearest = [math.inf] * count
+    columns = []
+    pivot = 0
+    for _ in range(min(pivots, count)):
+        distances = _bfs_distances(adjacency, pivot)
+        farthest = max(distances) + 1
+        column = [d if d >= 0 else farthest for d in distances]
+        columns.append(column)
+        nearest = [min(a, b if b >= 0 else math.inf) for a, b in zip(nearest, distances)]
+        pivot = max(range(count), key=nearest.__getitem__)
+        if nearest[pivot] == 0:
+            break  # 所有节点都已是枢轴
+    return columns
+
+
+def _top_eigenvectors(matrix, count, seed=0):
+    """用幂迭代加收缩求对称半正定矩阵（嵌套列表）最大的 count 个特征值和特征向量"""
+    size = len(matrix)
+    matrix = [row[:] for row in matrix]
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        vector = [rng.random() + 0.5 for _ in range(size)]
+        value = 0.0
+        for _ in range(200):
+            product = [sum(map(float.__mul__, row, vector)) for row in matrix]
+            norm = math.sqrt(sum(a * a for a in product))
+            if norm == 0:
+                break
+            vector = [a / norm for a in product]
+            if abs(norm - value) <= 1e-9 * norm:
+                value = norm
+                break
+            value = norm
+        result.append((value, vector))
+        # 收缩：去掉已求出的分量
+        matrix = [
+            [m - value * vector[i] * vector[j] for j, m in enumerate(row)]
+            for i, row in enumerate(matrix)
+        ]
+    return result
+
+
+def _pivot_mds(columns):
+    """
+    PivotMDS：对 (节点数 × 枢轴数) 的平方距离矩阵做双中心化，取前两个主成分作为坐标
+
+    Args:
+        columns: 每个枢轴的距离列
+
+    Returns:
+        (xs, ys) 两个坐标列表
+    """
+    if np is not None:
+        c = np.asarray(columns, dtype=float).T ** 2
+        c -= c.mean(axis=0)
+        c -= c.mean(axis=1)[:, None]
+        c *= -0.5
+        values, vectors = np.linalg.eigh(c.T @ c)  # 特征值升序
+        axes = []
+        for k in (1, 2):
+            if k > len(values):
+                axes.append(np.zeros(len(c)))
+                continue
+            axis = c @ vectors[:, -k]
+            norm = np.linalg.norm(axis)
+            axes.append(axis / norm * max(values[-k], 0) ** 0.25 if norm else axis)
+        return axes[0].tolist(), axes[1].tolist()
+
+    count = len(columns[0])
+    squared = [[d * d for d in column] for column in columns]
+    column_means = [sum(column) / count for column in squared]
+    squared = [[d - m for d in column] for column, m in zip(squared, column_means)]
+    row_means = [sum(row) / len(squared) for row in zip(*squared)]
+    centered = [[-0.5 * (d - m) for d, m in zip(column, row_means)] for column in squared]
+    gram = [[0.0] * len(centered) for _ in centered]
+    for i, a in enumerate(centered):
+        for j in range(i, len(centered)):
+            gram[i][j] = gram[j][i] = sum(map(float.__mul__, a, centered[j]))
+    axes = []
+    for value, vector in _top_eigenvectors(gram, 2):
+        axis = [0.0] * count
+        for weight, column in zip(vector, centered):
+            axis = [a + weight * d for a, d in zip(axis, column)]
+        norm = math.sqrt(sum(a * a for a in axis))
+        scale = max(value, 0) ** 0.25 / norm if norm else 0.0
+        axes.append([a * scale for a in axis])
+    return axes[0], axes[1]
+
+
+def _warn_pure_python(count):
+    """大图使用纯 Python 的 PivotMDS 时提示安装 NumPy（每个进程只提示一次）"""
+    global _warned_pure_python
+    if np is not None or count <= PURE_PYTHON_WARN_NODES or _warned_pure_python:
+        return
+    _warned_pure_python = True
+    print(f"⚠ 警告：未安装 NumPy，{count} 个节点的应力布局使用纯 Python 计算，速度较慢"
+          f"（pip install numpy 可以加速，或使用 --browser-layout 在浏览器中计算布局）")
+
+
+def stress_layout(count, links, pivots=PIVOTS):
+    """
+    计算应力布局（PivotMDS），坐标以原点为中心，边的平均长度为 LINK_DISTANCE
+
+    Args:
+        count: 节点数
+        links: 边列表 [(源节点下标, 目标节点下标), ...]
+        pivots: 枢轴节点数
+
+    Returns:
+        [x0, y0, x1, y1, ...]
+    """
+    if count == 0:
+        return []
+    adjacency = [[] for _ in range(count)]
+    for src, dst in links:
+        adjacency[src].append(dst)
+        adjacency[dst].append(src)
+    if count < 3:
+        xs, ys = [i * LINK_DISTANCE for i in range(count)], [0.0] * count
+    else:
+        _warn_pure_python(count)
+        xs, ys = _pivot_mds(_pivot_distances(adjacency, pivots))
+
+    # 缩放到边的平均长度；直径小的图（所有节点都离得很近）按节点数放大，
+    # 保证每个节点平均占有 NODE_SPACING 见方的面积
+    lengths = [math.hypot(xs[a] - xs[b], ys[a] - ys[b]) for a, b in links]
+    mean = sum(lengths) / len(lengths) if lengths else 0
+    scale = LINK_DISTANCE / mean if mean > 0 else 1.0
+    spread = math.sqrt(sum(x * x + y * y for x, y in zip(xs, ys)) / count)
+    if spread > 0:
+        scale = max(scale, NODE_SPACING * math.sqrt(count / (2 * math.pi)) / spread)
+
+    # 图距离相同的节点（如同一父节点下的叶子）坐标重合，沿黄金角螺旋散开
+    cells = {}
+    positions = [0] * (2 * count)
+    for index in range(count):
+        x, y = xs[index] * scale, ys[index] * scale
+        key = (round(x / NODE_SPACING), round(y / NODE_SPACING))
+        order = cells.get(key, 0)
+        cells[key] = order + 1
+        if order:
+            radius = NODE_SPACING * math.sqrt(order)
+            x += radius * math.cos(order * 2.39996)
+            y += radius * math.sin(order * 2.39996)
+        positions[2 * index] = x
+        positions[2 * index + 1] = y
+
+    center_x = sum(positions[0::2]) / count
+    center_y = sum(positions[1::2]) / count
+    return [
+        round(value - (center_x if i % 2 == 0 else center_y))
+        for i, value in enumerate(positions)
+    ]
+
+
+def graph_key(node_keys, levels, clusters, links):
+    """返回图的哈希（节点、层级、目录分类和边都相同时布局相同）"""
+    text = json.dumps(
+        [LAYOUT_VERSION, node_keys, levels, clusters, links],
+        ensure_ascii=False, separators=(',', ':')
+    )
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class LayoutCache:
+    """
+    布局的磁盘缓存：以图的哈希为键保存层次布局和应力布局的坐标
+
+    使用 marshal 序列化，最多保留 MAX_CACHE_ENTRIES 个最近使用的布局。
+    """
+
+    def __init__(self, cache_file=None):
+        """
+        Args:
+            cache_file: 缓存文件路径，为 None 时只在内存中缓存
+        """
+        self.cache_file = cache_file
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """读取缓存文件，版本或 Python 版本不匹配时忽略"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if (isinstance(data, dict)
+                and data.get('version') == LAYOUT_VERSION
+                and data.get('python') == list(sys.version_info[:2])):
+            self.entries = data.get('entries', {})
+
+    def get(self, key):
+        """返回缓存的布局，未命中时返回 None"""
+        layout = self.entries.pop(key, None)
+        if layout is None:
+            self.misses += 1
+            return None
+        self.entries[key] = layout  # 移到最近使用的位置
+        self.hits += 1
+        return layout
+
+    def put(self, key, layout):
+        """加入一个布局，超出上限时丢弃最久未使用的条目"""
+        self.entries[key] = layout
+        while len(self.entries) > MAX_CACHE_ENTRIES:
+            del self.entries[next(iter(self.entries))]
+        self.dirty = True
+
+    def save(self):
+        """有新条目时原子地写入缓存文件"""
+        if not self.cache_file or not self.dirty:
+            return
+        tmp_file = f"{self.cache_file}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_file, 'wb') as f:
+                marshal.dump({
+                    'version': LAYOUT_VERSION,
+                    'python': list(sys.version_info[:2]),
+                    'entries': self.entries,
+                }, f)
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except OSError:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+
+def module_layout(node_keys, levels, clusters, links, cache=None,
+                  cluster_priority=get_cluster_priority):
+    """
+    计算（或从缓存读取）一个模块的预计算布局
+
+    Args:
+        node_keys: 每个节点的唯一标识（路径或 target 规范），用于计算图的哈希
+        levels: 每个节点的层级
+        clusters: 每个节点的目录分类名
+        links: 以节点下标表示的边列表 [(src, dst), ...]
+        cache: 可选的 LayoutCache
+        cluster_priority: 目录分类的排序优先级函数
+
+    Returns:
+        字典 {'tree_xy': 层次布局坐标, 'tree_groups': 集群框, 'force_xy': 应力布局坐标}
+    """
+    key = graph_key(node_keys, levels, clusters, links) if cache is not None else None
+    layout = cache.get(key) if cache is not None else None
+    if layout is None:
+        tree_xy, tree_groups = layered_layout(levels, clusters, cluster_priority)
+        layout = {
+            'tree_xy': tree_xy,
+            'tree_groups': tree_groups,
+            'force_xy': stress_layout(len(levels), links),
+        }
+        if cache is not None:
+            cache.put(key, layout)
+    return layout
+
+
+# 页面中使用预计算布局的函数；layout 为 {tree, groups, force}（见 module_layout）
+PRECOMPUTED_LAYOUT_JS = """// 预计算的布局（生成 HTML 时已算好坐标）
+        // 按层次布局放置节点，返回集群框和层级标签（列宽与页面中计算时相同）
+        function applyPrecomputedTreeLayout(nodes, layout, width, levelText) {
+            const maxLevel = nodes.reduce((max, d) => Math.max(max, d.level), 0);
+            const levelWidth = Math.max(250, (width - 300) / (maxLevel + 1));
+            const columnX = column => 150 + column * levelWidth;
+            nodes.forEach((d, i) => {
+                d.fx = d.x = columnX(layout.tree[2 * i]);
+                d.fy = d.y = layout.tree[2 * i + 1];
+            });
+            const clusterRects = [];
+            const levelLabels = [];
+            for (let i = 0; i < layout.groups.length; i += 5) {
+                const first = nodes[layout.groups[i]];
+                const x = columnX(layout.groups[i + 2]);
+                clusterRects.push({
+                    x: x - 50,
+                    y: layout.groups[i + 3],
+                    width: 220,
+                    height: layout.groups[i + 4],
+                    cluster: first.cluster,
+                    level: first.level,
+                    nodeCount: layout.groups[i + 1]
+                });
+                const last = levelLabels[levelLabels.length - 1];
+                if (!last || last.level !== first.level) {
+                    levelLabels.push({x: x, y: 30, text: levelText(first.level), level: first.level});
+                }
+            }
+            return {clusterRects, levelLabels};
+        }
+
+        // 按应力布局放置节点（坐标以视图中心为原点）
+        function applyPrecomputedForceLayout(nodes, layout, width, height) {
+            nodes.forEach((d, i) => {
+                d.x = width / 2 + layout.force[2 * i];
+                d.y = height / 2 + layout.force[2 * i + 1];
+            });
+        }"""
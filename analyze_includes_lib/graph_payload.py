@@ -0,0 +1,227 @@
+"""
+图数据载荷：HTML 可视化页面中嵌入的数据的编码
+
+节点属性按列保存为平行数组，重复出现的字符串（目录分类、target 类型等）
+保存为字符串表下标；可选地用 zlib 压缩后以 base64 字符串嵌入，由页面中的
+DecompressionStream 解码。
+
+分块输出时每个模块的数据写入单独的 .js 文件（调用 registerModuleChunk），
+页面通过 <script> 标签按需加载，因此直接以 file:// 打开也可以使用。
+"""
+import os
+import json
+import zlib
+import base64
+
+
+class StringTable:
+    """字符串表：为每个不同的字符串分配一个下标"""
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def add(self, value):
+        """返回字符串的下标，首次出现时加入表中"""
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+def encode_payload(data, compress=False):
+    """
+    将数据编码为可直接嵌入 <script> 的 JavaScript 表达式
+
+    Args:
+        data: 可 JSON 序列化的数据
+        compress: 是否压缩；为 True 时返回 base64 字符串字面量，需要在页面中用 decodePayload 解码
+
+    Returns:
+        JavaScript 表达式字符串
+    """
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    if compress:
+        packed = zlib.compress(text.encode('utf-8'), 9)
+        return '"' + base64.b64encode(packed).decode('ascii') + '"'
+    # 避免数据中的 </script> 提前结束脚本
+    return text.replace('</', '<\\/')
+
+
+class PayloadWriter:
+    """
+    将图数据逐段写入文件，输出格式与 encode_payload 相同
+
+    调用方按 JSON 语法依次写入片段（write_raw 写结构字符，write_json 写完整的值），
+    每个片段写入后即可释放，内存占用不超过最大的单个片段。压缩时数据经
+    zlib.compressobj 增量压缩并按 3 字节对齐分段进行 base64 编码。
+    """
+
+    def __init__(self, f, compress=False):
+        """
+        Args:
+            f: 以文本模式打开的输出文件
+            compress: 是否压缩
+        """
+        self.f = f
+        self.compress = compress
+        if compress:
+            self._compressor = zlib.compressobj(9)
+            self._pending = b''  # 尚未 base64 编码的字节（不足 3 字节的部分）
+            f.write('"')
+
+    def write_raw(self, text):
+        """写入一段 JSON 文本"""
+        if not self.compress:
+            # 避免数据中的 </script> 提前结束脚本
+            self.f.write(text.replace('</', '<\\/'))
+        else:
+            self._emit(self._compressor.compress(text.encode('utf-8')))
+
+    def write_json(self, value):
+        """写入一个 JSON 值"""
+        self.write_raw(json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+
+    def close(self):
+        """结束写入（不关闭文件）"""
+        if self.compress:
+            self._emit(self._compressor.flush())
+            self.f.write(base64.b64encode(self._pending).decode('ascii'))
+            self._pending = b''
+            self.f.write('"')
+
+    def _emit(self, data):
+        data = self._pending + data
+        cut = len(data) - len(data) % 3
+        if cut:
+            self.f.write(base64.b64encode(data[:cut]).decode('ascii'))
+        self._pending = data[cut:]
+
+
+def write_html(output_file, head, tail, write_payload, compress=False):
+    """
+    流式写入 HTML 文件：页面头部、逐段写入的图数据、页面尾部
+
+    先写入临时文件，完成后再替换目标文件，出错时不会留下不完整的页面。
+
+    Args:
+        output_file: 输出文件路径
+        head: 图数据之前的页面内容
+        tail: 图数据之后的页面内容
+        write_payload: 回调函数 write_payload(writer)，通过 PayloadWriter 写入图数据
+        compress: 是否压缩图数据
+    """
+    tmp_file = f"{output_file}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(head)
+            writer = PayloadWriter(f, compress)
+            write_payload(writer)
+            writer.close()
+            f.write(tail)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+# 页面模板中图数据的占位符，用于将模板拆分为头部和尾部
+PAYLOAD_PLACEHOLDER = '__GRAPH_PAYLOAD__'
+
+
+# 页面中的解码函数：未压缩的载荷原样返回，压缩的载荷为 base64 字符串
+PAYLOAD_DECODER_JS = """// 解码嵌入的图数据（压缩时为 base64 编码的 zlib 数据）
+        async function decodePayload(payload) {
+            if (typeof payload !== 'string') return payload;
+            if (typeof DecompressionStream === 'undefined') {
+                throw new Error('浏览器不支持 DecompressionStream，请使用未压缩的输出');
+            }
+            const binary = atob(payload);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+            return JSON.parse(await new Response(stream).text());
+        }"""
+
+
+def chunk_location(output_file):
+    """
+    返回分块数据的目录和页面中引用分块时使用的相对路径前缀
+
+    Args:
+        output_file: HTML 文件路径
+
+    Returns:
+        (目录路径, 相对路径前缀)，如 ('out/graph_data', 'graph_data')
+    """
+    prefix = os.path.splitext(os.path.basename(output_file))[0] + '_data'
+    return os.path.join(os.path.dirname(output_file), prefix), prefix
+
+
+def write_chunk(chunk_dir, url_prefix, index, payload):
+    """
+    写入一个模块的分块数据文件
+
+    Args:
+        chunk_dir: 分块目录
+        url_prefix: 页面中引用分块时使用的相对路径前缀
+        index: 模块下标
+        payload: encode_payload 的结果
+
+    Returns:
+        页面中引用该分块的相对 URL
+    """
+    name = f"module_{index}.js"
+    with open(os.path.join(chunk_dir, name), 'w', encoding='utf-8') as f:
+        f.write(f"registerModuleChunk({index}, {payload});\n")
+    return f"{url_prefix}/{name}"
+
+
+def module_summary(module_json, chunk_url):
+    """
+    分块输出时保留在页面中的模块摘要：只保留标量字段（名称、节点数等）
+
+    Args:
+        module_json: 模块数据字典
+        chunk_url: 分块的相对 URL
+
+    Returns:
+        摘要字典
+    """
+    summary = {
+        key: value for key, value in module_json.items()
+        if not isinstance(value, (list, dict))
+    }
+    summary['chunk'] = chunk_url
+    return summary
+
+
+# 页面中的分块加载函数：每个分块只加载一次，返回解码后的 {nodes, modules: [module]}
+CHUNK_LOADER_JS = """// 按需加载模块分块（<script> 标签，支持 file://）
+        const chunkRequests = {};
+        const chunkResolvers = {};
+        
+        window.registerModuleChunk = function(index, payload) {
+            if (chunkResolvers[index]) {
+                chunkResolvers[index](payload);
+                delete chunkResolvers[index];
+            }
+        };
+        
+        function loadChunk(index, url) {
+            if (!chunkRequests[index]) {
+                chunkRequests[index] = new Promise((resolve, reject) => {
+                    chunkResolvers[index] = resolve;
+                    const script = document.createElement('script');
+                    script.src = url;
+                    script.onerror = () => {
+                        delete chunkRequests[index];
+                        delete chunkResolvers[index];
+                        reject(new Error('无法加载 ' + url));
+                    };
+                    document.head.appendChild(script);
+                }).then(decodePayload);
+            }
+            return chunkRequests[index];
+        }"""
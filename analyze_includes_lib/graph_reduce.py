@@ -0,0 +1,179 @@
+"""
+传递归约：去掉可以由其他依赖路径推出的边
+
+A 包含 B 和 C、B 也包含 C 时，A -> C 不影响可达性，去掉后依赖图仍表达相同的
+包含关系，但边数通常少几倍。先用 Tarjan 算法把强连通分量（循环 include）
+缩成一个节点，再在缩点后的有向无环图上按逆拓扑序用整数位集计算可达性。
+同一强连通分量内的边不做归约。闭包权重（closure_weights）使用相同的缩点和位集。
+"""
+
+# int.bit_count 需要 Python 3.10
+_popcount = getattr(int, 'bit_count', None) or (lambda value: bin(value).count('1'))
+
+
+def condense(count, links):
+    """
+    用迭代的 Tarjan 算法计算强连通分量
+
+    Args:
+        count: 节点数
+        links: 以节点下标表示的边列表 [(src, dst), ...]
+
+    Returns:
+        (component, components) 元组：component 为每个节点所在分量的编号，
+        components 为分量数。编号按逆拓扑序分配，后继分量的编号总是更小
+    """
+    successors = [[] for _ in range(count)]
+    for src, dst in links:
+        successors[src].append(dst)
+
+    index = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    component = [-1] * count
+    stack = []
+    counter = 0
+    components = 0
+
+    for root in range(count):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(successors[root]))]
+
+        while work:
+            node, children = work[-1]
+            descended = False
+            for child in children:
+                if index[child] < 0:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, iter(successors[child])))
+                    descended = True
+                    break
+                if on_stack[child]:
+                    low[node] = min(low[node], index[child])
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = components
+                    if member == node:
+                        break
+                components += 1
+
+    return component, components
+
+
+def transitive_reduction(count, links):
+    """
+    计算传递归约中可以去掉的边
+
+    分量按编号从小到大（后继在前）处理：把分量的直接后继按编号从大到小排列，
+    可由排在前面的后继到达的后继对应的边是冗余的，其余后继的可达位集并入当前分量。
+    某个分量的所有前驱都处理完后释放它的位集，内存只取决于“前沿”的大小。
+
+    Args:
+        count: 节点数
+        links: 以节点下标表示的边列表 [(src, dst), ...]
+
+    Returns:
+        冗余的边在 links 中的下标列表（按下标升序）
+    """
+    component, components = condense(count, links)
+    successors, pending = _condensed_successors(component, components, links)
+
+    reach = {}  # 分量 -> 可达分量的位集（包含自身）
+    redundant = set()  # 冗余的分量边 (src, dst)
+    for current in range(components):
+        reachable = 1 << current
+        for target in sorted(successors[current], reverse=True):
+            if reachable >> target & 1:
+                redundant.add((current, target))
+            else:
+                reachable |= reach[target]
+            pending[target] -= 1
+            if not pending[target]:
+                del reach[target]
+        if pending[current]:
+            reach[current] = reachable
+
+    return [
+        index for index, (src, dst) in enumerate(links)
+        if (component[src], component[dst]) in redundant
+    ]
+
+
+def _condensed_successors(component, components, links):
+    """返回缩点后每个分量的直接后继集合和尚未处理的前驱数"""
+    successors = [set() for _ in range(components)]
+    for src, dst in links:
+        a, b = component[src], component[dst]
+        if a != b:
+            successors[a].add(b)
+    pending = [0] * components
+    for targets in successors:
+        for target in targets:
+            pending[target] += 1
+    return successors, pending
+
+
+def closure_weights(count, links, weights):
+    """
+    计算每个节点可达的所有节点（包含自身）的权重之和，共同的后代只计一次
+
+    分量按逆拓扑序处理，可达分量用整数位集表示。某个分量的所有前驱都处理完后
+    释放它的位集，因此除了图本身（O(V + E)）之外，只有“前沿”上的分量持有位集，
+    每个位集最多 V 位；不会为每个节点保留完整的闭包。位集的权重和按权重的
+    每个二进制位分别求 popcount，不逐个遍历可达节点。
+
+    Args:
+        count: 节点数
+        links: 以节点下标表示的边列表 [(src, dst), ...]
+        weights: 每个节点的权重（非负整数）
+
+    Returns:
+        每个节点的闭包权重列表
+    """
+    component, components = condense(count, links)
+    successors, pending = _condensed_successors(component, components, links)
+    component_weights = [0] * components
+    for node, group in enumerate(component):
+        component_weights[group] += weights[node]
+
+    # masks[k]: 权重第 k 个二进制位为 1 的分量的位集
+    masks = [0] * max(component_weights, default=0).bit_length()
+    for group, weight in enumerate(component_weights):
+        for k in range(weight.bit_length()):
+            if weight >> k & 1:
+                masks[k] |= 1 << group
+
+    totals = [0] * components
+    reach = {}  # 分量 -> 可达分量的位集（包含自身）
+    for current in range(components):
+        reachable = 1 << current
+        for target in successors[current]:
+            reachable |= reach[target]
+            pending[target] -= 1
+            if not pending[target]:
+                del reach[target]
+        if pending[current]:
+            reach[current] = reachable
+        totals[current] = sum(
+            _popcount(reachable & mask) << k for k, mask in enumerate(masks)
+        )
+
+    return [totals[group] for group in component]
@@ -1,15 +1,24 @@
 """
 HTML 模板：D3.js 交互式可视化的 HTML 模板
 """
+from .graph_payload import CHUNK_LOADER_JS, PAYLOAD_DECODER_JS, PAYLOAD_PLACEHOLDER
+from .force_layout import FORCE_LAYOUT_JS
+from .canvas_renderer import CANVAS_RENDERER_JS
+from .graph_layout import PRECOMPUTED_LAYOUT_JS
+from .cluster_view import CLUSTER_VIEW_JS
 
 
-def get_html_template(modules_json, total_modules):
+def get_html_template(modules_json, total_modules, presettle_ticks=0, canvas_threshold=3000):
     """
     返回完整的 HTML 模板
     
     Args:
-        modules_json: JSON 格式的模块数据
+        modules_json: 图数据的 JavaScript 表达式（见 graph_payload.encode_payload），
+                      解码后为 {"nodes": 按列保存的全局节点表, "modules": [模块数据, ...]}；
+                      分块输出时 nodes 为 null，modules 中是带 chunk 字段的模块摘要
         total_modules: 模块总数
+        presettle_ticks: 力导向布局首次绘制前在 Worker 中迭代的次数
+        canvas_threshold: 模块节点数超过该值时使用 Canvas 代替 SVG 渲染
         
     Returns:
         完整的 HTML 字符串
@@ -28,12 +37,29 @@ def get_html_template(modules_json, total_modules):
     {get_html_body()}
     
     <script>
-        {get_javascript_code(modules_json)}
+        {get_javascript_code(modules_json, presettle_ticks, canvas_threshold)}
     </script>
 </body>
 </html>"""
 
 
+def get_html_template_parts(total_modules, presettle_ticks=0, canvas_threshold=3000):
+    """
+    返回以图数据为界拆分的 HTML 模板，用于流式写入
+    
+    Args:
+        total_modules: 模块总数
+        presettle_ticks: 力导向布局首次绘制前在 Worker 中迭代的次数
+        canvas_threshold: 模块节点数超过该值时使用 Canvas 代替 SVG 渲染
+        
+    Returns:
+        (head, tail) 元组，图数据写在两者之间
+    """
+    html = get_html_template(PAYLOAD_PLACEHOLDER, total_modules, presettle_ticks, canvas_threshold)
+    head, tail = html.split(PAYLOAD_PLACEHOLDER)
+    return head, tail
+
+
 def get_css_styles():
     """返回 CSS 样式"""
     return """* {
@@ -53,6 +79,11 @@ def get_css_styles():
             background: #fafafa;
         }
         
+        #graph-canvas {
+            display: none;
+            background: #fafafa;
+        }
+        
         .node {
             cursor: pointer;
         }
@@ -82,6 +113,22 @@ def get_css_styles():
             text-shadow: 0 1px 2px rgba(255,255,255,0.8);
         }
         
+        .node.cluster-node circle {
+            stroke: #607D8B;
+            stroke-width: 3px;
+            stroke-dasharray: 4,2;
+        }
+        
+        .node.cluster-node text {
+            font-weight: bold;
+        }
+        
+        .node.failed circle {
+            stroke: #E53935;
+            stroke-width: 2px;
+            stroke-dasharray: 3,2;
+        }
+        
         .link {
             stroke: #999;
             stroke-opacity: 0.3;
@@ -99,6 +146,10 @@ def get_css_styles():
             stroke-width: 2px;
         }
         
+        .link.redundant {
+            stroke-dasharray: 4,3;
+        }
+        
         .link.dependency {
             stroke: #f44336 !important;
             stroke-width: 2.5px !important;
@@ -396,13 +447,19 @@ def get_html_body():
         
         <input type="text" id="search" placeholder="搜索文件名..." />
         
+        <label id="redundant-toggle" style="display: none; margin-top: 10px; font-size: 12px; color: #666;">
+            <input type="checkbox" id="show-redundant" /> 显示冗余依赖（<span id="redundant-count">0</span> 条，虚线）
+        </label>
+        
         <div class="layout-buttons">
             <button class="layout-btn active" id="btn-tree">📊 树状布局</button>
             <button class="layout-btn" id="btn-force">🔄 力导向</button>
+            <button class="layout-btn" id="btn-clusters" style="display: none;">📁 展开全部</button>
         </div>
         
         <div class="info" style="margin-top: 10px; font-size: 11px; color: #999;">
-            💡 树状布局：从左到右按依赖层级排列，相同目录的文件分组显示
+            💡 树状布局：从左到右按依赖层级排列，相同目录的文件分组显示<br>
+            💡 文件较多时按目录分类折叠显示，点击分类节点展开
         </div>
         
         <div class="legend">
@@ -448,21 +505,96 @@ def get_html_body():
         <div id="node-info" class="empty"></div>
     </div>
     
-    <svg id="graph"></svg>"""
+    <svg id="graph"></svg>
+    <canvas id="graph-canvas"></canvas>"""
 
 
-def get_javascript_code(modules_json):
+def get_javascript_code(modules_json, presettle_ticks=0, canvas_threshold=3000):
     """返回 JavaScript 代码"""
     # 由于JavaScript代码太长，我会在html_visualizer.py中直接读取文件
     # 这里返回一个占位符，实际代码会在另一个文件中
     return f"""// 所有模块的数据
-        const allModules = {modules_json};
+        const graphData = {modules_json};
+        // 全局节点表（按列保存），各模块以下标引用其中的节点
+        let nodeTable = null;
+        let allModules = [];
         let currentModuleIndex = 0;
         
+        // 已展开的模块节点和边（切换回来时保留节点位置）
+        const moduleGraphs = [];
+        
+        function tableId(table, ref) {{
+            const id = table.ids[ref];
+            return id === null ? table.paths[ref] : id;
+        }}
+        
+        function tableNode(table, ref) {{
+            const path = table.paths[ref];
+            const size = table.sizes[ref];
+            return {{
+                id: tableId(table, ref),
+                name: path.split(/[\\\\/]/).pop(),  // Windows 路径使用反斜杠
+                path: path,
+                size: size,
+                weight: table.weights ? table.weights[ref] : size,
+                cluster: table.cluster_names[table.clusters[ref]]
+            }};
+        }}
+        
+        function buildModuleGraph(table, module) {{
+            const nodes = module.nodes.map((ref, i) => Object.assign(tableNode(table, ref), {{
+                is_source: ref === module.source,
+                level: module.levels[i],
+                dep_count: module.dep_counts[i],
+                dependent_count: module.dependent_counts[i]
+            }}));
+            // 边的两端直接引用节点对象（不在节点列表中的端点无法绘制，跳过）
+            const byRef = new Map(module.nodes.map((ref, i) => [ref, nodes[i]]));
+            // 传递归约去掉的边（生成时使用 --reduce 才有）
+            const redundant = new Set(module.redundant_links || []);
+            const links = [];
+            for (let i = 0; i < module.links.length; i += 2) {{
+                const source = byRef.get(module.links[i]);
+                const target = byRef.get(module.links[i + 1]);
+                if (!source || !target) continue;
+                links.push({{
+                    source,
+                    target,
+                    size: table.sizes[module.links[i + 1]],
+                    redundant: redundant.has(i / 2)
+                }});
+            }}
+            // 预计算的布局（生成时使用 --browser-layout 则没有）
+            const layout = module.tree_xy
+                ? {{tree: module.tree_xy, groups: module.tree_groups, force: module.force_xy}}
+                : null;
+            const graph = {{nodes, links, layout, redundantCount: redundant.size}};
+            // 节点较多的模块带有分类汇总，初始按分类折叠显示
+            graph.clusters = module.cluster_ids ? buildClusterGraph(graph, module, table.cluster_names) : null;
+            return graph;
+        }}
+        
+        // 返回模块的节点和边；分块输出时先加载该模块的分块
+        function moduleGraph(index) {{
+            if (moduleGraphs[index]) return Promise.resolve(moduleGraphs[index]);
+            const module = allModules[index];
+            const data = module.chunk
+                ? loadChunk(index, module.chunk).then(chunk => [chunk.nodes, chunk.modules[0]])
+                : Promise.resolve([nodeTable, module]);
+            return data.then(([table, moduleData]) => {{
+                if (!moduleGraphs[index]) moduleGraphs[index] = buildModuleGraph(table, moduleData);
+                return moduleGraphs[index];
+            }});
+        }}
+        
         // 当前模块的数据（会动态更新）
         let nodesData = [];
         let linksData = [];
         
+        {PAYLOAD_DECODER_JS}
+        
+        {CHUNK_LOADER_JS}
+        
         const width = window.innerWidth;
         const height = window.innerHeight;
         
@@ -498,6 +630,27 @@ def get_javascript_code(modules_json):
             return size.toFixed(1) + units[i];
         }}
         
+        function formatWeight(value, unit) {{
+            if (value === null) return unit === 's' ? '编译失败' : '-';  // 没有数据的节点
+            if (unit === 's') {{
+                return value < 1 ? (value * 1000).toFixed(0) + 'ms' : value.toFixed(2) + 's';
+            }}
+            if (unit === 'lines') return value + ' lines';
+            return formatSize(value);
+        }}
+        
+        // 解析耗时为 null 表示头文件无法单独编译
+        function parseFailed(d) {{
+            return d.weight === null && allModules[currentModuleIndex].weight_unit === 's';
+        }}
+        
+        function weightLabel() {{
+            const unit = allModules[currentModuleIndex].weight_unit;
+            if (unit === 's') return '解析耗时';
+            if (unit === 'lines') return '预处理行数';
+            return '大小';
+        }}
+        
         // 获取集群的排序优先级
         function getClusterPriority(clusterName) {{
             if (clusterName.startsWith('Project/')) return 0;
@@ -507,11 +660,12 @@ def get_javascript_code(modules_json):
             return 4;
         }}
         
-        // 计算层次化布局位置
-        function calculateTreeLayout() {{
-            g.selectAll('.cluster-rect').remove();
-            g.selectAll('.cluster-label').remove();
-            
+        function levelLabelText(level) {{
+            return level === 0 ? '源文件' : `依赖层级 ${{level}}`;
+        }}
+        
+        // 在页面中计算层次化布局位置，返回集群框和层级标签
+        function computeTreeLayout() {{
             const levelClusterGroups = {{}};
             
             nodesData.forEach(d => {{
@@ -582,11 +736,26 @@ def get_javascript_code(modules_json):
                 levelLabels.push({{
                     x: x,
                     y: 30,
-                    text: level === 0 ? '源文件' : `依赖层级 ${{level}}`,
+                    text: levelLabelText(level),
                     level: level
                 }});
             }});
             
+            return {{clusterRects, levelLabels}};
+        }}
+        
+        // 计算层次化布局位置（有预计算的布局时直接使用）
+        function calculateTreeLayout() {{
+            g.selectAll('.cluster-rect').remove();
+            g.selectAll('.cluster-label').remove();
+            
+            const {{clusterRects, levelLabels}} = precomputedLayout
+                ? applyPrecomputedTreeLayout(nodesData, precomputedLayout, width, levelLabelText)
+                : computeTreeLayout();
+            
+            treeDecorations = {{clusterRects, levelLabels}};
+            if (useCanvas) return;
+            
             const clusterGroup = g.insert('g', ':first-child')
                 .attr('class', 'cluster-rects');
             
@@ -617,14 +786,86 @@ def get_javascript_code(modules_json):
                 .text(d => d.text);
         }}
         
-        const simulation = d3.forceSimulation(nodesData)
-            .force("link", d3.forceLink(linksData).id(d => d.id).distance(d => {{
-                return d.size > 100 * 1024 ? 150 : 100;
-            }}))
-            .force("charge", d3.forceManyBody().strength(-400))
-            .force("center", d3.forceCenter(width / 2, height / 2))
-            .force("collision", d3.forceCollide().radius(d => getNodeRadius(d.size) + 5))
-            .stop();
+        {FORCE_LAYOUT_JS}
+        
+        {PRECOMPUTED_LAYOUT_JS}
+        
+        {CLUSTER_VIEW_JS}
+        
+        // 力导向布局前先在 Worker 中迭代的次数（迭代完成后才首次绘制）
+        const PRESETTLE_TICKS = {presettle_ticks};
+        
+        const forceOptions = {{
+            distance: d => d.size > 100 * 1024 ? 150 : 100,
+            charge: -400,
+            radius: d => getNodeRadius(d.size),
+            width: width,
+            height: height,
+            preSettle: PRESETTLE_TICKS,
+            alpha: 1
+        }};
+        
+        // 每帧最多更新一次节点和边的位置
+        let renderScheduled = false;
+        function scheduleRender() {{
+            if (renderScheduled) return;
+            renderScheduled = true;
+            requestAnimationFrame(() => {{
+                renderScheduled = false;
+                setGraphVisibility(null);
+                if (useCanvas || (node && link)) updatePositions();
+            }});
+        }}
+        
+        const forceLayout = createForceLayout(scheduleRender);
+        
+        {CANVAS_RENDERER_JS}
+        
+        // 节点数超过该值时使用 Canvas 代替 SVG 渲染
+        const CANVAS_NODE_THRESHOLD = {canvas_threshold};
+        let useCanvas = false;
+        let treeDecorations = null;
+        let precomputedLayout = null;  // 当前模块的预计算布局
+        let currentGraph = null;       // 当前模块的完整图（moduleGraph 的结果）
+        let showRedundant = false;     // 是否显示传递归约去掉的边
+        
+        const canvasView = createCanvasRenderer(document.getElementById('graph-canvas'), {{
+            width: width,
+            height: height,
+            nodeRadius: d => getNodeRadius(d.size),
+            nodeFill: d => getNodeColor(d.size),
+            nodeStroke: d => d.is_source ? {{color: "#2196F3", width: 4}}
+                : d.collapsed ? {{color: "#607D8B", width: 3}}
+                : parseFailed(d) ? {{color: "#E53935", width: 2}} : {{color: "#fff", width: 2}},
+            // 与 .link 的 CSS 样式对应，后面的样式绘制在上层
+            linkStyles: {{
+                dimmed: {{stroke: "#999", width: 1.5, opacity: 0.05}},
+                normal: {{stroke: "#999", width: 1.5, opacity: 0.3}},
+                redundant: {{stroke: "#999", width: 1.5, opacity: 0.3, dash: [4, 3]}},
+                heavy: {{stroke: "#ff9800", width: 2, opacity: 0.3}},
+                dependent: {{stroke: "#4caf50", width: 2.5, opacity: 0.8}},
+                dependency: {{stroke: "#f44336", width: 2.5, opacity: 0.8}}
+            }},
+            linkStyle: l => l.dependency ? 'dependency' : l.dependent ? 'dependent'
+                : l.dimmed ? 'dimmed' : l.redundant ? 'redundant' : l.heavy ? 'heavy' : 'normal',
+            labelLimit: 2000,
+            onClick: (event, d) => {{
+                if (d) {{
+                    toggleNodeSelection(d);
+                }} else {{
+                    resetHighlight();
+                    selectedNode = null;
+                }}
+            }},
+            onDragStart: dragstarted,
+            onDrag: dragged,
+            onDragEnd: dragended
+        }});
+        
+        function setGraphVisibility(value) {{
+            g.style("visibility", value);
+            d3.select("#graph-canvas").style("visibility", value);
+        }}
         
         svg.append("defs").append("marker")
             .attr("id", "arrowhead")
@@ -649,19 +890,33 @@ def get_javascript_code(modules_json):
             }}
         }});
         
-        function resetHighlight() {{
+        // 将节点和边数据上的高亮状态应用到图上
+        function applyHighlight() {{
+            if (useCanvas) {{
+                canvasView.render();
+                return;
+            }}
             if (!node || !link) return;
             
-            node.classed("dimmed", false).classed("highlighted", false);
-            link.classed("dimmed", false)
-                .classed("dependency", false)
-                .classed("dependent", false);
-            
-            link.each(function(l) {{
-                if (l.size > 100 * 1024) {{
-                    d3.select(this).classed("heavy", true);
-                }}
+            node.classed("dimmed", d => d.dimmed).classed("highlighted", d => d.highlighted);
+            link.classed("dimmed", l => l.dimmed)
+                .classed("dependency", l => l.dependency)
+                .classed("dependent", l => l.dependent)
+                .classed("heavy", l => l.heavy);
+        }}
+        
+        function resetHighlight() {{
+            nodesData.forEach(d => {{
+                d.dimmed = false;
+                d.highlighted = false;
+            }});
+            linksData.forEach(l => {{
+                l.dimmed = false;
+                l.dependency = false;
+                l.dependent = false;
+                l.heavy = l.size > 100 * 1024;
             }});
+            applyHighlight();
             
             const nodeInfo = document.getElementById("node-info");
             nodeInfo.className = "empty";
@@ -676,19 +931,23 @@ def get_javascript_code(modules_json):
                 return;
             }}
             
-            if (!node || !link) return;
-            
-            node.classed("dimmed", d => !d.name.toLowerCase().includes(searchTerm))
-                .classed("highlighted", d => d.name.toLowerCase().includes(searchTerm));
-            
-            link.classed("dimmed", l => {{
-                const sourceMatch = l.source.name.toLowerCase().includes(searchTerm);
-                const targetMatch = l.target.name.toLowerCase().includes(searchTerm);
-                return !sourceMatch && !targetMatch;
+            nodesData.forEach(d => {{
+                const match = matchesSearch(d, searchTerm);
+                d.dimmed = !match;
+                d.highlighted = match;
+            }});
+            linksData.forEach(l => {{
+                l.dimmed = l.source.dimmed && l.target.dimmed;
             }});
+            applyHighlight();
         }});
         
         function updatePositions() {{
+            if (useCanvas) {{
+                canvasView.update();
+                return;
+            }}
+            
             link.attr("d", d => {{
                 const sx = d.source.x || 0;
                 const sy = d.source.y || 0;
@@ -700,24 +959,28 @@ def get_javascript_code(modules_json):
             node.attr("transform", d => `translate(${{d.x || 0}},${{d.y || 0}})`);
         }}
         
-        simulation.on("tick", updatePositions);
-        
         let currentLayout = 'tree';
         
         function switchToTreeLayout() {{
             currentLayout = 'tree';
-            simulation.stop();
+            forceLayout.stop();
+            setGraphVisibility(null);
             calculateTreeLayout();
             
-            g.selectAll('.cluster-rects').style('display', 'block');
-            
-            node.transition()
-                .duration(750)
-                .attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-            
-            link.transition()
-                .duration(750)
-                .attr("d", d => `M${{d.source.x}},${{d.source.y}}L${{d.target.x}},${{d.target.y}}`);
+            if (useCanvas) {{
+                canvasView.setDecorations(treeDecorations);
+                canvasView.update();
+            }} else {{
+                g.selectAll('.cluster-rects').style('display', 'block');
+                
+                node.transition()
+                    .duration(750)
+                    .attr("transform", d => `translate(${{d.x}},${{d.y}})`);
+                
+                link.transition()
+                    .duration(750)
+                    .attr("d", d => `M${{d.source.x}},${{d.source.y}}L${{d.target.x}},${{d.target.y}}`);
+            }}
             
             document.getElementById('btn-tree').classList.add('active');
             document.getElementById('btn-force').classList.remove('active');
@@ -727,13 +990,21 @@ def get_javascript_code(modules_json):
             currentLayout = 'force';
             
             g.selectAll('.cluster-rects').style('display', 'none');
+            canvasView.setDecorations(null);
             
             nodesData.forEach(d => {{
                 d.fx = null;
                 d.fy = null;
             }});
             
-            simulation.alpha(1).restart();
+            if (precomputedLayout) {{
+                // 直接使用预计算的坐标，模拟只在拖动节点时运行
+                applyPrecomputedForceLayout(nodesData, precomputedLayout, width, height);
+                forceLayout.start(nodesData, linksData, Object.assign({{}}, forceOptions, {{alpha: 0, preSettle: 0}}));
+            }} else {{
+                if (PRESETTLE_TICKS > 0) setGraphVisibility("hidden");
+                forceLayout.start(nodesData, linksData, forceOptions);
+            }}
             
             document.getElementById('btn-tree').classList.remove('active');
             document.getElementById('btn-force').classList.add('active');
@@ -744,23 +1015,25 @@ def get_javascript_code(modules_json):
         
         function dragstarted(event, d) {{
             if (currentLayout === 'force') {{
-                if (!event.active) simulation.alphaTarget(0.3).restart();
+                if (!event.active) forceLayout.alphaTarget(0.3);
             }}
             d.fx = d.x;
             d.fy = d.y;
+            forceLayout.fix(d);
         }}
         
         function dragged(event, d) {{
             d.fx = event.x;
             d.fy = event.y;
-            if (currentLayout === 'tree') {{
-                updatePositions();
-            }}
+            d.x = d.fx;
+            d.y = d.fy;
+            forceLayout.fix(d);
+            scheduleRender();
         }}
         
         function dragended(event, d) {{
             if (currentLayout === 'force') {{
-                if (!event.active) simulation.alphaTarget(0);
+                if (!event.active) forceLayout.alphaTarget(0);
             }}
         }}
         
@@ -770,9 +1043,6 @@ def get_javascript_code(modules_json):
             currentModuleIndex = index;
             const module = allModules[index];
             
-            nodesData = module.nodes;
-            linksData = module.links;
-            
             document.getElementById('current-module').textContent = module.source_file;
             document.getElementById('node-count').textContent = module.node_count;
             document.getElementById('edge-count').textContent = module.edge_count;
@@ -786,15 +1056,111 @@ def get_javascript_code(modules_json):
                 document.getElementById('module-nav').style.display = 'none';
             }}
             
+            moduleGraph(index).then(graph => {{
+                if (index !== currentModuleIndex) return;  // 加载期间已切换到其他模块
+                currentGraph = graph;
+                showModuleView();
+                
+                // 预取相邻模块
+                for (const neighbor of [index + 1, index - 1]) {{
+                    if (neighbor >= 0 && neighbor < allModules.length) {{
+                        moduleGraph(neighbor).catch(() => {{}});
+                    }}
+                }}
+            }}).catch(error => {{
+                document.getElementById('node-info').textContent = '加载模块数据失败：' + error.message;
+            }});
+        }}
+        
+        // 显示当前模块：有分类汇总且还有折叠的分类时显示折叠视图，否则显示完整的图
+        function showModuleView() {{
+            const clusters = currentGraph.clusters;
+            const collapsed = clusters !== null && clusters.expanded.size < clusters.nodes.length;
+            if (collapsed) {{
+                // 合并的边只在其中的边都冗余时才算冗余
+                const view = clusterViewGraph(currentGraph, (m, l) => {{
+                    m.redundant = (m.count === 1 || m.redundant) && l.redundant;
+                }});
+                nodesData = view.nodes;
+                linksData = view.links;
+                precomputedLayout = null;  // 预计算的布局只适用于完整的图
+            }} else {{
+                nodesData = currentGraph.nodes;
+                linksData = currentGraph.links;
+                precomputedLayout = currentGraph.layout;
+            }}
+            if (currentGraph.redundantCount && !showRedundant) {{
+                linksData = linksData.filter(l => !l.redundant);
+            }}
+            
+            document.getElementById('redundant-toggle').style.display = currentGraph.redundantCount ? 'block' : 'none';
+            document.getElementById('redundant-count').textContent = currentGraph.redundantCount;
+            const button = document.getElementById('btn-clusters');
+            button.style.display = clusters ? '' : 'none';
+            button.textContent = collapsed ? '📁 展开全部' : '📁 折叠分类';
             redrawGraph();
         }}
         
+        // 展开一个分类：其中的节点从超级节点的位置出发
+        function expandCluster(c) {{
+            c.members.forEach(d => {{
+                d.x = c.x + (Math.random() - 0.5) * 40;
+                d.y = c.y + (Math.random() - 0.5) * 40;
+            }});
+            currentGraph.clusters.expanded.add(c.cluster);
+            showModuleView();
+        }}
+        
+        // 折叠一个分类：超级节点放在其中节点的中心
+        function collapseCluster(c) {{
+            c.x = d3.mean(c.members, d => d.x);
+            c.y = d3.mean(c.members, d => d.y);
+            currentGraph.clusters.expanded.delete(c.cluster);
+            showModuleView();
+        }}
+        
+        document.getElementById('show-redundant').addEventListener('change', (e) => {{
+            showRedundant = e.target.checked;
+            showModuleView();
+        }});
+        
+        document.getElementById('btn-clusters').addEventListener('click', () => {{
+            const clusters = currentGraph.clusters;
+            if (clusters.expanded.size < clusters.nodes.length) {{
+                clusters.nodes.forEach(c => clusters.expanded.add(c.cluster));
+            }} else {{
+                clusters.expanded.clear();
+            }}
+            showModuleView();
+        }});
+        
         function redrawGraph() {{
+            forceLayout.stop();
             g.selectAll("*").remove();
             
-            simulation.nodes(nodesData);
-            simulation.force("link").links(linksData);
+            // 节点较多时使用 Canvas 渲染
+            useCanvas = nodesData.length > CANVAS_NODE_THRESHOLD;
+            svg.style("display", useCanvas ? "none" : null);
+            canvasView.show(useCanvas);
+            if (useCanvas) {{
+                link = null;
+                node = null;
+                canvasView.setGraph(nodesData, linksData);
+            }} else {{
+                drawSvgGraph();
+            }}
+            
+            resetHighlight();
+            selectedNode = null;
             
+            if (currentLayout === 'tree') {{
+                switchToTreeLayout();
+            }} else {{
+                switchToForceLayout();
+            }}
+        }}
+        
+        function drawSvgGraph() {{
             const newLink = g.append("g")
                 .selectAll("path")
                 .data(linksData)
@@ -802,6 +1168,7 @@ def get_javascript_code(modules_json):
                 .attr("class", d => {{
                     let classes = "link";
                     if (d.size > 100 * 1024) classes += " heavy";
+                    if (d.redundant) classes += " redundant";
                     return classes;
                 }})
                 .attr("marker-end", "url(#arrowhead)");
@@ -812,7 +1179,7 @@ def get_javascript_code(modules_json):
                 .selectAll("g")
                 .data(nodesData)
                 .join("g")
-                .attr("class", "node")
+                .attr("class", d => d.collapsed ? "node cluster-node" : (parseFailed(d) ? "node failed" : "node"))
                 .call(d3.drag()
                     .on("start", dragstarted)
                     .on("drag", dragged)
@@ -834,70 +1201,72 @@ def get_javascript_code(modules_json):
             
             node.on("click", function(event, d) {{
                 event.stopPropagation();
-                
-                if (selectedNode === d.id) {{
-                    resetHighlight();
-                    selectedNode = null;
-                    return;
-                }}
-                
-                selectedNode = d.id;
-                
-                node.classed("dimmed", true).classed("highlighted", false);
-                link.classed("dimmed", true)
-                    .classed("dependency", false)
-                    .classed("dependent", false)
-                    .classed("heavy", false);
-                
-                d3.select(this).classed("dimmed", false).classed("highlighted", true);
-                
-                const relatedNodes = new Set([d.id]);
-                let dependencyCount = 0;
-                let dependentCount = 0;
-                
-                link.each(function(l) {{
-                    if (l.source.id === d.id) {{
-                        d3.select(this)
-                            .classed("dimmed", false)
-                            .classed("heavy", false)
-                            .classed("dependency", true);
-                        relatedNodes.add(l.target.id);
-                        dependencyCount++;
-                    }} else if (l.target.id === d.id) {{
-                        d3.select(this)
-                            .classed("dimmed", false)
-                            .classed("heavy", false)
-                            .classed("dependent", true);
-                        relatedNodes.add(l.source.id);
-                        dependentCount++;
-                    }}
-                }});
-                
-                node.filter(n => relatedNodes.has(n.id))
-                    .classed("dimmed", false)
-                    .classed("highlighted", true);
-                
-                const nodeInfo = document.getElementById("node-info");
-                nodeInfo.className = "";
-                nodeInfo.innerHTML = `
-                    <strong>${{d.name}}</strong>
-                    <div><strong>路径：</strong>${{d.path}}</div>
-                    <div><strong>大小：</strong>${{formatSize(d.size)}}</div>
-                    <div><strong>模块：</strong>${{d.cluster}}</div>
-                    <div style="margin-top: 10px;">
-                        <strong>依赖：</strong><span style="color: #f44336;">${{dependencyCount}}</span> 个文件<br>
-                        <strong>被依赖：</strong><span style="color: #4caf50;">${{dependentCount}}</span> 个文件
-                    </div>
-                `;
+                toggleNodeSelection(d);
+            }});
+        }}
+        
+        // 点击节点：高亮它的依赖和被依赖，再次点击取消高亮
+        function toggleNodeSelection(d) {{
+            if (d.collapsed) {{
+                expandCluster(d);
+                return;
+            }}
+            
+            if (selectedNode === d.id) {{
+                resetHighlight();
+                selectedNode = null;
+                return;
+            }}
+            
+            selectedNode = d.id;
+            
+            nodesData.forEach(n => {{
+                n.dimmed = true;
+                n.highlighted = false;
             }});
+            d.dimmed = false;
+            d.highlighted = true;
             
-            resetHighlight();
-            selectedNode = null;
+            let dependencyCount = 0;
+            let dependentCount = 0;
             
-            if (currentLayout === 'tree') {{
-                switchToTreeLayout();
-            }} else {{
-                switchToForceLayout();
+            linksData.forEach(l => {{
+                l.dimmed = true;
+                l.dependency = false;
+                l.dependent = false;
+                l.heavy = false;
+                if (l.source === d) {{
+                    l.dimmed = false;
+                    l.dependency = true;
+                    l.target.dimmed = false;
+                    l.target.highlighted = true;
+                    dependencyCount += l.count || 1;
+                }} else if (l.target === d) {{
+                    l.dimmed = false;
+                    l.dependent = true;
+                    l.source.dimmed = false;
+                    l.source.highlighted = true;
+                    dependentCount += l.count || 1;
+                }}
+            }});
+            applyHighlight();
+            
+            const nodeInfo = document.getElementById("node-info");
+            nodeInfo.className = "";
+            nodeInfo.innerHTML = `
+                <strong>${{d.name}}</strong>
+                <div><strong>路径：</strong>${{d.path}}</div>
+                <div><strong>${{weightLabel()}}：</strong>${{formatWeight(d.weight, allModules[currentModuleIndex].weight_unit)}}</div>
+                <div><strong>模块：</strong>${{d.cluster}}</div>
+                <div style="margin-top: 10px;">
+                    <strong>依赖：</strong><span style="color: #f44336;">${{dependencyCount}}</span> 个文件<br>
+                    <strong>被依赖：</strong><span style="color: #4caf50;">${{dependentCount}}</span> 个文件
+                </div>
+                ${{d.clusterNode ? `<button class="nav-btn" id="btn-collapse-cluster" style="margin-top: 10px;">折叠 ${{d.cluster}}</button>` : ''}}
+            `;
+            if (d.clusterNode) {{
+                document.getElementById('btn-collapse-cluster')
+                    .addEventListener('click', () => collapseCluster(d.clusterNode));
             }}
         }}
         
@@ -938,5 +1307,11 @@ def get_javascript_code(modules_json):
             }}
         }});
         
-        loadModule(0);"""
+        decodePayload(graphData).then(data => {{
+            nodeTable = data.nodes;
+            allModules = data.modules;
+            loadModule(0);
+        }}).catch(error => {{
+            document.getElementById('node-info').textContent = '加载图数据失败：' + error.message;
+        }});"""
 
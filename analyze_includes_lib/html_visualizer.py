@@ -2,25 +2,74 @@
 HTML 可视化器：生成基于 D3.js 的交互式 HTML 依赖图
 """
 import os
-import json
-from collections import defaultdict
+from collections import defaultdict, deque
 from .utils import (
-    get_file_size, simplify_path, get_directory_cluster
+    get_file_size, simplify_path, get_directory_cluster,
+    scale_weights_to_sizes
 )
-from .html_template import get_html_template
+from .html_template import get_html_template_parts
+from .graph_payload import (
+    StringTable, encode_payload, chunk_location, write_chunk, module_summary, write_html
+)
+from .graph_layout import LayoutCache, module_layout
+from .cluster_view import summarize_clusters
+from .graph_reduce import transitive_reduction
 
 
 class HtmlVisualizer:
     """HTML 交互式可视化器"""
     
-    def __init__(self, modules_data):
+    def __init__(self, modules_data, node_weights=None, weight_unit='B', compress=False,
+                 split=False, presettle_ticks=0, canvas_threshold=3000,
+                 precompute_layout=True, layout_cache=None, collapse_threshold=500,
+                 reduce=False):
         """
         初始化可视化器
         
         Args:
             modules_data: 模块数据列表，每个元素是字典 {'source_file': str, 'nodes': set, 'edges': list}
+            node_weights: 可选的节点权重字典 {path: weight}（如解析耗时），
+                          提供时替代文件大小决定节点颜色和半径
+            weight_unit: 节点权重的单位，'B'、's' 或 'lines'
+            compress: 是否压缩嵌入的图数据（页面用 DecompressionStream 解码）
+            split: 是否分块输出：每个模块的数据写入 <输出文件名>_data/ 下的单独文件，
+                   页面切换到该模块时再加载
+            presettle_ticks: 力导向布局首次绘制前在 Web Worker 中迭代的次数
+            canvas_threshold: 模块节点数超过该值时页面使用 Canvas 代替 SVG 渲染
+            precompute_layout: 是否在生成时预先计算层次布局和应力布局的坐标，
+                               为 False 时由页面在浏览器中计算
+            layout_cache: 预计算布局的缓存文件路径，为 None 时不缓存到磁盘
+            collapse_threshold: 模块节点数超过该值时页面初始按目录分类折叠显示
+            reduce: 是否做传递归约：可由其他依赖路径推出的边默认不绘制，
+                    页面中勾选“显示冗余依赖”时以虚线叠加显示
         """
         self.modules_data = modules_data
+        self.node_weights = node_weights
+        self.weight_unit = weight_unit if node_weights is not None else 'B'
+        self.compress = compress
+        self.split = split
+        self.presettle_ticks = presettle_ticks
+        self.canvas_threshold = canvas_threshold
+        self.precompute_layout = precompute_layout
+        self.layout_cache = layout_cache
+        self.collapse_threshold = collapse_threshold
+        self.reduce = reduce
+        self.redundant_count = 0  # 传递归约去掉的边数（generate 之后有效）
+        self._scaled_sizes = (
+            scale_weights_to_sizes(node_weights) if node_weights is not None else None
+        )
+    
+    def _node_size(self, path):
+        """返回节点用于可视化的等效字节数"""
+        if self._scaled_sizes is None:
+            return get_file_size(path)
+        return self._scaled_sizes.get(path, 0)
+    
+    def _node_weight(self, path):
+        """返回节点的原始权重"""
+        if self.node_weights is None:
+            return get_file_size(path)
+        return self.node_weights.get(path, 0)
     
     def generate(self, output_file):
         """
@@ -29,25 +78,101 @@ class HtmlVisualizer:
         Args:
             output_file: 输出文件路径
         """
-        # 为每个模块准备数据
-        all_modules_json = []
+        # 节点属性对每个不同的路径只计算一次：{path: (id, size, weight, cluster)}
+        self._node_attrs = {}
+        self._layout_cache = LayoutCache(self.layout_cache) if self.precompute_layout else None
+        self.redundant_count = 0
         
-        for module_info in self.modules_data:
-            module_json = self._prepare_module_data(module_info)
-            all_modules_json.append(module_json)
+        if self.split:
+            chunk_dir, url_prefix = chunk_location(output_file)
+            os.makedirs(chunk_dir, exist_ok=True)
         
-        # 生成 HTML
-        modules_json_str = json.dumps(all_modules_json, ensure_ascii=False)
-        html_content = get_html_template(modules_json_str, len(all_modules_json))
+        def write_payload(writer):
+            # 逐个模块生成并写入，写入后即释放；节点表在所有模块之后写入
+            writer.write_raw('{"modules":[')
+            self._reset_node_table()
+            for index, module_info in enumerate(self.modules_data):
+                if index:
+                    writer.write_raw(',')
+                if self.split:
+                    # 每个模块写入单独的分块（自带节点表），页面中只保留模块摘要
+                    self._reset_node_table()
+                    module_json = self._prepare_module_data(module_info)
+                    chunk = encode_payload(
+                        {'nodes': self._node_table_data(), 'modules': [module_json]}, self.compress
+                    )
+                    url = write_chunk(chunk_dir, url_prefix, index, chunk)
+                    writer.write_json(module_summary(module_json, url))
+                else:
+                    # 所有模块共享一张节点表
+                    writer.write_json(self._prepare_module_data(module_info))
+            writer.write_raw('],"nodes":')
+            writer.write_json(None if self.split else self._node_table_data())
+            writer.write_raw('}')
         
-        # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        head, tail = get_html_template_parts(
+            len(self.modules_data), self.presettle_ticks, self.canvas_threshold
+        )
+        write_html(output_file, head, tail, write_payload, self.compress)
+        if self._layout_cache is not None:
+            self._layout_cache.save()
+    
+    def _reset_node_table(self):
+        """清空按列保存的节点表"""
+        self._node_index = {}
+        self._clusters = StringTable()
+        self._node_table = {
+            'ids': [],       # 与路径相同时为 null
+            'paths': [],
+            'sizes': [],
+            'weights': [],
+            'clusters': [],  # cluster_names 的下标
+        }
+    
+    def _node_table_data(self):
+        """返回用于输出的节点表"""
+        table = dict(self._node_table, cluster_names=self._clusters.values)
+        if self.node_weights is None:
+            del table['weights']  # 权重即文件大小
+        return table
+    
+    def _node_ref(self, path):
+        """
+        返回路径在节点表中的下标，首次出现时加入节点表
+        
+        Args:
+            path: 文件路径
+            
+        Returns:
+            节点下标
+        """
+        index = self._node_index.get(path)
+        if index is None:
+            attrs = self._node_attrs.get(path)
+            if attrs is None:
+                node_id = simplify_path(path)
+                attrs = self._node_attrs[path] = (
+                    None if node_id == path else node_id,
+                    self._node_size(path),
+                    self._node_weight(path),
+                    get_directory_cluster(path),
+                )
+            table = self._node_table
+            index = self._node_index[path] = len(table['paths'])
+            table['ids'].append(attrs[0])
+            table['paths'].append(path)
+            table['sizes'].append(attrs[1])
+            table['weights'].append(attrs[2])
+            table['clusters'].append(self._clusters.add(attrs[3]))
+        return index
     
     def _prepare_module_data(self, module_info):
         """
         为单个模块准备 JSON 数据
         
+        节点和边都以节点表的下标表示，只有层级、依赖数等与模块相关的
+        属性按模块保存（平行数组）。
+        
         Args:
             module_info: 模块信息字典
             
@@ -58,71 +183,97 @@ class HtmlVisualizer:
         nodes = module_info['nodes']
         edges = module_info['edges']
         
-        # 准备节点数据并计算依赖层级
-        nodes_data = []
-        node_id_map = {}
-        
-        # 构建依赖图
+        # 构建依赖图（以节点下标表示）
         dependencies = defaultdict(list)  # node -> [依赖的节点]
-        dependents = defaultdict(list)    # node -> [依赖它的节点]
-        
+        dependent_counts = defaultdict(int)
+        links = []
         for src, dst in edges:
-            src_id = simplify_path(src)
-            dst_id = simplify_path(dst)
-            dependencies[src_id].append(dst_id)
-            dependents[dst_id].append(src_id)
+            src_ref = self._node_ref(src)
+            dst_ref = self._node_ref(dst)
+            dependencies[src_ref].append(dst_ref)
+            dependent_counts[dst_ref] += 1
+            links.append(src_ref)
+            links.append(dst_ref)
         
         # 使用 BFS 计算每个节点的层级（从源文件开始）
-        source_id = simplify_path(os.path.abspath(source_file))
-        queue = [(source_id, 0)]
-        visited_level = {source_id: 0}
-        
+        source_ref = self._node_ref(os.path.abspath(source_file))
+        queue = deque([source_ref])
+        visited_level = {source_ref: 0}
         while queue:
-            current, level = queue.pop(0)
+            current = queue.popleft()
+            level = visited_level[current] + 1
             for dep in dependencies.get(current, []):
-                if dep not in visited_level or visited_level[dep] > level + 1:
-                    visited_level[dep] = level + 1
-                    queue.append((dep, level + 1))
+                if dep not in visited_level:
+                    visited_level[dep] = level
+                    queue.append(dep)
         
-        # 为所有节点分配层级
-        for node in nodes:
-            node_id = simplify_path(node)
-            node_id_map[node] = node_id
-            # 如果节点没有被访问到，说明它不在依赖链中，放在最后
-            level = visited_level.get(node_id, 999)
-            
-            cluster = get_directory_cluster(node)
-            
-            nodes_data.append({
-                'id': node_id,
-                'name': os.path.basename(node),
-                'path': node,
-                'size': get_file_size(node),
-                'cluster': cluster,
-                'is_source': node == os.path.abspath(source_file),
-                'level': level,
-                'dep_count': len(dependencies.get(node_id, [])),
-                'dependent_count': len(dependents.get(node_id, []))
-            })
-        
-        # 按层级和目录排序节点，让相同目录的节点相邻
-        nodes_data.sort(key=lambda x: (x['level'], x['cluster'], x['name']))
+        # 按层级和目录排序节点，让相同目录的节点相邻；
+        # 没有被访问到的节点不在依赖链中，放在最后
+        paths = self._node_table['paths']
+        clusters = self._node_table['clusters']
+        cluster_names = self._clusters.values
+        refs = sorted(
+            (self._node_ref(node) for node in nodes),
+            key=lambda ref: (
+                visited_level.get(ref, 999),
+                cluster_names[clusters[ref]],
+                os.path.basename(paths[ref]),
+            )
+        )
         
-        # 准备边数据
-        edges_data = []
-        for src, dst in edges:
-            edges_data.append({
-                'source': node_id_map.get(src, simplify_path(src)),
-                'target': node_id_map.get(dst, simplify_path(dst)),
-                'size': get_file_size(dst)
-            })
+        levels = [visited_level.get(ref, 999) for ref in refs]
         
-        return {
+        module_json = {
             'source_file': os.path.basename(source_file),
             'source_path': source_file,
-            'nodes': nodes_data,
-            'links': edges_data,
+            'source': source_ref,
+            'nodes': refs,
+            'levels': levels,
+            'dep_counts': [len(dependencies.get(ref, ())) for ref in refs],
+            'dependent_counts': [dependent_counts.get(ref, 0) for ref in refs],
+            'links': links,
             'node_count': len(nodes),
-            'edge_count': len(edges)
+            'edge_count': len(edges),
+            'weight_unit': self.weight_unit
         }
-
+        
+        # 预计算布局、分类汇总和传递归约中的边以模块内的节点下标表示，
+        # 端点不在节点列表中的边跳过
+        local = {ref: index for index, ref in enumerate(refs)}
+        local_links = []
+        link_ids = []  # local_links 中每条边在 links 中的序号
+        for i in range(0, len(links), 2):
+            if links[i] in local and links[i + 1] in local:
+                local_links.append((local[links[i]], local[links[i + 1]]))
+                link_ids.append(i // 2)
+        if self.precompute_layout:
+            module_json.update(module_layout(
+                [paths[ref] for ref in refs],
+                levels,
+                [cluster_names[clusters[ref]] for ref in refs],
+                local_links,
+                self._layout_cache
+            ))
+        redundant = []
+        if self.reduce:
+            redundant = transitive_reduction(len(refs), local_links)
+            module_json['redundant_links'] = [link_ids[i] for i in redundant]
+            self.redundant_count += len(redundant)
+        if len(refs) > self.collapse_threshold:
+            sizes = self._node_table['sizes']
+            summary, link_groups = summarize_clusters(
+                [clusters[ref] for ref in refs],
+                [sizes[ref] for ref in refs],
+                levels,
+                local_links
+            )
+            module_json.update(summary)
+            if redundant:
+                # 分类间的边只在合并的边都冗余时才算冗余
+                removed = set(redundant)
+                kept = {group for i, group in enumerate(link_groups) if i not in removed}
+                module_json['cluster_redundant_links'] = [
+                    index for index in range(len(summary['cluster_links']) // 4)
+                    if index not in kept
+                ]
+        return module_json
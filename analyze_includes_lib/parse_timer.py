@@ -0,0 +1,178 @@
+"""
+头文件解析耗时测量：单独编译每个头文件（-fsyntax-only），记录真实的解析开销
+"""
+import os
+import json
+import time
+import hashlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# 计时方式或缓存键变化时递增，使旧的缓存结果失效
+CACHE_VERSION = 3
+
+
+def _time_header(job):
+    """
+    单独编译一个头文件并计时（在线程中运行，每个线程只等待一个编译器进程）
+
+    支持 os.wait4 的平台上以编译器进程（包括它等待过的 cc1plus 等子进程）的 CPU 时间计时，
+    不受同时运行的其他编译器的影响；其他平台（Windows）使用墙钟时间。
+
+    Args:
+        job: (header, command) 元组
+
+    Returns:
+        (header, 耗时秒数, 是否编译成功) 元组
+    """
+    header, command = job
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            command + [header],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        return header, time.perf_counter() - start, False
+    if not hasattr(os, 'wait4'):
+        ok = (proc.wait() == 0)
+        return header, time.perf_counter() - start, ok
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+    return header, usage.ru_utime + usage.ru_stime, proc.returncode == 0
+
+
+def _include_closure(analyzer, header):
+    """
+    返回头文件传递 include 的所有文件（不含自身，不受 analyzer.max_depth 限制）
+
+    与 DependencyAnalyzer.analyze 一致，除非 deep_system 否则不展开系统头文件。
+    """
+    closure = set()
+    stack = [header]
+    while stack:
+        current = stack.pop()
+        if current.startswith("/usr/") and not analyzer.deep_system and current != header:
+            continue
+        current_dir = os.path.dirname(current)
+        for inc_file, is_system in analyzer.get_includes(current):
+            full_path = analyzer.find_file(inc_file, is_system, current_dir)
+            if full_path and full_path != header and full_path not in closure:
+                closure.add(full_path)
+                stack.append(full_path)
+    return closure
+
+
+class ParseTimer:
+    """头文件解析耗时测量器"""
+
+    def __init__(self, compiler="g++", flags=None, jobs=None,
+                 cache_file=".parse_time_cache.json"):
+        """
+        初始化测量器
+
+        Args:
+            compiler: 编译器命令
+            flags: 额外的编译参数列表（如 -I、-D、-std）
+            jobs: 同时运行的编译器进程数，默认为 CPU 核数
+            cache_file: 缓存文件路径，为 None 时不使用缓存
+        """
+        self.compiler = compiler
+        self.flags = list(flags or [])
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_file = cache_file
+        self.cache = self._load_cache()
+        self._digests = {}  # 文件路径 -> 内容哈希（无法读取时为 None），每个文件只读一次
+
+    def _command(self):
+        """返回不含头文件路径的编译命令"""
+        return [self.compiler, "-x", "c++-header", "-fsyntax-only"] + self.flags
+
+    def _load_cache(self):
+        """加载缓存文件"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        """保存缓存文件"""
+        if not self.cache_file:
+            return
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f)
+
+    def _file_digest(self, path):
+        """返回文件内容的哈希，无法读取时返回 None"""
+        if path not in self._digests:
+            try:
+                with open(path, 'rb') as f:
+                    self._digests[path] = hashlib.sha1(f.read()).hexdigest()
+            except OSError:
+                self._digests[path] = None
+        return self._digests[path]
+
+    def _cache_key(self, header, analyzer=None):
+        """
+        计算缓存键：头文件及其 include 闭包中每个文件的内容哈希 + 编译命令
+
+        -fsyntax-only 的耗时覆盖头文件 include 的所有文件，闭包中任一文件变化都会使缓存失效。
+
+        Args:
+            header: 头文件路径
+            analyzer: 可选的 DependencyAnalyzer，用于解析 include 闭包；为 None 时只哈希头文件本身
+
+        Returns:
+            缓存键字符串，文件无法读取时返回 None
+        """
+        own = self._file_digest(header)
+        if own is None:
+            return None
+        digest = hashlib.sha1(own.encode('ascii'))
+        if analyzer is not None:
+            for path in sorted(_include_closure(analyzer, header)):
+                digest.update(f"\0{path}\0{self._file_digest(path)}".encode('utf-8'))
+        digest.update("\0".join([str(CACHE_VERSION)] + self._command()).encode('utf-8'))
+        return digest.hexdigest()
+
+    def measure(self, headers, analyzer=None):
+        """
+        测量一组头文件的解析耗时
+
+        Args:
+            headers: 头文件路径的可迭代对象
+            analyzer: 可选的 DependencyAnalyzer（使用与分析相同的 include 路径），
+                      提供时缓存键包含每个头文件的 include 闭包，依赖的头文件变化后重新测量
+
+        Returns:
+            字典 {header: 耗时秒数}，编译失败的头文件的值为 None（无法读取的头文件不包含在结果中）
+        """
+        timings = {}
+        pending = []
+        keys = {}
+
+        for header in sorted(set(headers)):
+            key = self._cache_key(header, analyzer)
+            if key is None:
+                continue
+            keys[header] = key
+            if key in self.cache:
+                timings[header] = self.cache[key]
+            else:
+                pending.append(header)
+
+        if pending:
+            command = self._command()
+            jobs = [(header, command) for header in pending]
+            # 每个任务只是等待编译器进程，线程足够，不需要启动进程池
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                for header, elapsed, ok in executor.map(_time_header, jobs):
+                    # 编译失败也写入缓存，避免每次都重新尝试
+                    timings[header] = self.cache[keys[header]] = elapsed if ok else None
+            self._save_cache()
+
+        return timings
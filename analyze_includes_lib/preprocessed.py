@@ -0,0 +1,173 @@
+"""
+预处理文件分析：统计 .i 文件中每个头文件贡献的代码行数和字节数
+"""
+import os
+import heapq
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from .config import LINE_MARKER_PATTERN
+
+
+def scan_i_file(file_path, show_progress=False):
+    """
+    流式扫描一次 .i 文件，把每个非空行归属到最近一个行标记指向的文件
+
+    Args:
+        file_path: 预处理文件路径
+        show_progress: 是否打印扫描进度
+
+    Returns:
+        (file_lines, file_bytes, total_lines) 元组
+        - file_lines: 字典 {文件名: 代码行数}
+        - file_bytes: 字典 {文件名: 代码字节数}
+        - total_lines: 扫描的总行数（包含行标记和空行）
+    """
+    file_lines = defaultdict(int)
+    file_bytes = defaultdict(int)
+    current_file = "unknown"
+    total_lines = 0
+
+    with open(file_path, 'rb') as f:
+        for line in f:
+            total_lines += 1
+            if show_progress and total_lines % 100000 == 0:
+                print(f"Processed {total_lines} lines...", end='\r')
+
+            if line.startswith(b'#'):
+                match = LINE_MARKER_PATTERN.match(line)
+                if match:
+                    current_file = match.group(1).decode('utf-8', errors='replace')
+                    continue
+            # 跳过只有空白的行
+            if line.strip():
+                file_lines[current_file] += 1
+                file_bytes[current_file] += len(line)
+
+    return dict(file_lines), dict(file_bytes), total_lines
+
+
+def top_headers(file_lines, k):
+    """
+    用堆选出贡献行数最多的 k 个文件，不对整张表排序
+
+    Returns:
+        [(文件名, 行数), ...] 列表，按行数降序
+    """
+    return heapq.nlargest(k, file_lines.items(), key=lambda x: x[1])
+
+
+def header_rows(file_lines, file_bytes):
+    """
+    将扫描结果转换为统一的行记录，供 JSON / CSV 输出使用
+
+    Returns:
+        [{'file', 'lines', 'bytes', 'percent'}, ...] 列表（保持扫描顺序）
+    """
+    total = sum(file_lines.values()) or 1
+    return [
+        {
+            'file': filename,
+            'lines': lines,
+            'bytes': file_bytes.get(filename, 0),
+            'percent': round(lines * 100.0 / total, 2),
+        }
+        for filename, lines in file_lines.items()
+    ]
+
+
+def load_line_weights(i_files, marker_root=None):
+    """
+    从一个或多个 .i 文件读取每个头文件的预处理行数，作为可视化的节点权重
+
+    行标记中的相对路径是相对于运行编译器时的工作目录写入的，按 marker_root 解析，
+    得到与 DependencyAnalyzer 节点一致的绝对路径。同一头文件出现在多个
+    .i 文件中时取最大值。
+
+    Args:
+        i_files: .i 文件路径列表
+        marker_root: 生成 .i 文件时编译器的工作目录，默认为当前目录
+
+    Returns:
+        字典 {绝对路径: 行数}
+    """
+    marker_root = os.path.abspath(marker_root or os.getcwd())
+    weights = {}
+    workers = max(1, min(len(i_files), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_lines, _, _ in executor.map(scan_i_file, i_files):
+            for filename, lines in file_lines.items():
+                if filename.startswith('<'):  # <built-in>、<command-line> 等伪文件
+                    continue
+                path = os.path.normpath(os.path.join(marker_root, filename))
+                if lines > weights.get(path, 0):
+                    weights[path] = lines
+    return weights
+
+
+def _percent(delta, base):
+    """返回 delta 相对 base 的百分比，保留两位小数"""
+    if base == 0:
+        return 0.0 if delta == 0 else 100.0
+    return round(delta * 100.0 / base, 2)
+
+
+def diff_i_files(before_path, after_path, sort_by='lines'):
+    """
+    比较同一编译单元在两次构建中的预处理文件（如依赖升级前后）
+
+    两个文件在独立进程中并发扫描，各自只流式读取一遍。
+
+    Args:
+        before_path: 升级前的 .i 文件
+        after_path: 升级后的 .i 文件
+        sort_by: 按 'lines' 或 'bytes' 的绝对变化量排序
+
+    Returns:
+        字典，包含两边的总量以及 'headers' 列表（每个头文件的变化量）
+    """
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        before_future = executor.submit(scan_i_file, before_path)
+        after_future = executor.submit(scan_i_file, after_path)
+        before_lines, before_bytes, _ = before_future.result()
+        after_lines, after_bytes, _ = after_future.result()
+
+    rows = []
+    for filename in set(before_lines) | set(after_lines):
+        lines_before = before_lines.get(filename, 0)
+        lines_after = after_lines.get(filename, 0)
+        bytes_before = before_bytes.get(filename, 0)
+        bytes_after = after_bytes.get(filename, 0)
+        if lines_before == lines_after and bytes_before == bytes_after:
+            continue
+        rows.append({
+            'file': filename,
+            'lines_before': lines_before,
+            'lines_after': lines_after,
+            'lines_delta': lines_after - lines_before,
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+            'bytes_delta': bytes_after - bytes_before,
+        })
+
+    key = 'bytes_delta' if sort_by == 'bytes' else 'lines_delta'
+    rows.sort(key=lambda r: (-abs(r[key]), r['file']))
+
+    total_before = sum(before_lines.values())
+    total_after = sum(after_lines.values())
+    bytes_total_before = sum(before_bytes.values())
+    bytes_total_after = sum(after_bytes.values())
+
+    return {
+        'before': before_path,
+        'after': after_path,
+        'lines_before': total_before,
+        'lines_after': total_after,
+        'lines_delta': total_after - total_before,
+        'lines_delta_percent': _percent(total_after - total_before, total_before),
+        'bytes_before': bytes_total_before,
+        'bytes_after': bytes_total_after,
+        'bytes_delta': bytes_total_after - bytes_total_before,
+        'bytes_delta_percent': _percent(bytes_total_after - bytes_total_before,
+                                        bytes_total_before),
+        'headers': rows,
+    }
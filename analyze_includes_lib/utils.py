@@ -96,3 +96,52 @@ def get_cluster_priority(cluster_name):
     else:
         return 4  # 未知类型放在最后
 
+
+
+def scale_weights_to_sizes(weights):
+    """
+    将任意单位的节点权重（如解析耗时、行数）换算为等效字节数
+
+    可视化中的颜色和半径阈值都是按文件字节数设计的，这里把权重的 95 分位
+    映射到 200KB（最高颜色档），使外部权重可以直接复用现有的配色规则。
+
+    Args:
+        weights: 字典 {path: weight}，无法测量的节点权重为 None
+
+    Returns:
+        字典 {path: 等效字节数}（权重为 None 的节点为 0）
+    """
+    values = sorted(v for v in weights.values() if v is not None and v > 0)
+    if not values:
+        return {path: 0 for path in weights}
+
+    reference = values[min(len(values) - 1, int(len(values) * 0.95))]
+    scale = (200 * 1024) / reference
+    return {
+        path: int(weight * scale) if weight is not None else 0
+        for path, weight in weights.items()
+    }
+
+
+def format_weight(value, unit):
+    """
+    格式化节点权重为人类可读格式
+
+    Args:
+        value: 权重值，None 表示没有数据（解析耗时中为编译失败）
+        unit: 权重单位，'B'（字节）、's'（秒）或 'lines'（行数）
+
+    Returns:
+        格式化后的字符串
+    """
+    if value is None:
+        return "编译失败" if unit == 's' else "-"
+    if unit == 'B':
+        return format_size(value)
+    if unit == 's':
+        if value < 1:
+            return f"{value * 1000:.0f}ms"
+        return f"{value:.2f}s"
+    if unit == 'lines':
+        return f"{int(value)} lines"
+    return f"{value} {unit}"
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Blade 解析基准测试：在不同规模的合成工作区上测量 parse_build_file、
+analyze_dependencies 和 BladeHtmlVisualizer.generate 的耗时
+
+每种规模生成一个临时工作区（见 gen_blade_workspace.py），每项测量重复多次取最小值。
+每次测量前清空进程内的 BUILD 解析缓存和目录列表缓存，测得的是冷启动耗时；
+analyze_warm 为 BUILD 文件已全部解析后的依赖遍历耗时。比较不同规模之间的
+增长倍数即可发现非线性的退化。
+"""
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyze_includes_lib import blade_parser
+from analyze_includes_lib.blade_parser import BladeParser
+from analyze_includes_lib.blade_visualizer import BladeHtmlVisualizer
+from gen_blade_workspace import add_arguments, build_dir_of, generate_workspace
+
+
+def reset_caches():
+    """清空进程内的解析缓存和目录列表缓存"""
+    blade_parser._PARSE_CACHE.clear()
+    blade_parser._DIRECTORY_INDEXES.clear()
+
+
+def best_of(repeat, func):
+    """执行 func repeat 次，返回 (最短耗时, 最后一次的返回值)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_size(root, size, args):
+    """
+    在一个工作区上测量各阶段耗时
+
+    Returns:
+        该规模的结果字典
+    """
+    summary = generate_workspace(
+        root, size, args.targets_per_file, args.fanout,
+        args.glob_ratio, args.externals, args.modules, args.seed,
+    )
+    build_files = [
+        os.path.join(root, build_dir_of(i, args.modules), 'BUILD')
+        for i in range(size)
+    ]
+    root_target = summary['root_target']
+
+    def parse_all():
+        reset_caches()
+        parser = BladeParser(root)
+        return sum(len(parser.parse_build_file(build_file)) for build_file in build_files)
+
+    def analyze_cold():
+        reset_caches()
+        return BladeParser(root).analyze_dependencies(root_target, args.depth)
+
+    warm_parser = BladeParser(root)
+    warm_parser.analyze_dependencies(root_target, args.depth)
+
+    def analyze_warm():
+        return warm_parser.analyze_dependencies(root_target, args.depth)
+
+    parse_time, parsed_targets = best_of(args.repeat, parse_all)
+    cold_time, _ = best_of(args.repeat, analyze_cold)
+    warm_time, (nodes, edges) = best_of(args.repeat, analyze_warm)
+
+    html_file = os.path.join(root, 'graph.html')
+
+    def generate():
+        BladeHtmlVisualizer(nodes=nodes, edges=edges, root_target=root_target).generate(html_file)
+
+    generate_time, _ = best_of(args.repeat, generate)
+
+    return {
+        'build_files': size,
+        'targets': parsed_targets,
+        'declared_edges': summary['edges'],
+        'closure_nodes': len(nodes),
+        'closure_edges': len(edges),
+        'html_bytes': os.path.getsize(html_file),
+        'parse_seconds': parse_time,
+        'analyze_cold_seconds': cold_time,
+        'analyze_warm_seconds': warm_time,
+        'generate_seconds': generate_time,
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="在合成工作区上测量 Blade 解析、依赖分析和 HTML 生成的耗时")
+    parser.add_argument("--sizes", default="100,1000,5000",
+                        help="以逗号分隔的 BUILD 文件数量（默认：100,1000,5000）")
+    parser.add_argument("--depth", type=int, default=10, help="依赖分析的最大递归深度（默认：10）")
+    parser.add_argument("--repeat", type=int, default=3, help="每项测量的重复次数（默认：3）")
+    parser.add_argument("--keep", metavar="DIR", help="在该目录下生成并保留工作区（默认使用临时目录）")
+    parser.add_argument("--json", metavar="FILE", help="将结果写入 JSON 文件")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    base_dir = args.keep or tempfile.mkdtemp(prefix='blade_bench_')
+    results = []
+    try:
+        for size in sizes:
+            print(f"正在测量 {size} 个 BUILD 文件...", flush=True)
+            results.append(bench_size(os.path.join(base_dir, f"ws{size}"), size, args))
+    finally:
+        if not args.keep:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    print()
+    print(f"{'BUILD':>8}{'target':>9}{'闭包':>8}{'解析':>10}{'分析(冷)':>11}{'分析(热)':>11}{'生成':>10}{'HTML':>10}")
+    for result in results:
+        print(f"{result['build_files']:>8}{result['targets']:>9}{result['closure_nodes']:>8}"
+              f"{result['parse_seconds']:>9.3f}s"
+              f"{result['analyze_cold_seconds']:>10.3f}s"
+              f"{result['analyze_warm_seconds']:>10.3f}s"
+              f"{result['generate_seconds']:>9.3f}s"
+              f"{result['html_bytes'] / 1024:>8.0f}KB")
+
+    if args.json:
+        options = {
+            key: getattr(args, key)
+            for key in ('depth', 'repeat', 'targets_per_file', 'fanout',
+                        'glob_ratio', 'externals', 'modules', 'seed')
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'options': options, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
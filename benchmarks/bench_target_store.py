@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+target 存储基准测试：比较旧的 dict 表示与 TargetRecord 的内存占用和查询耗时
+
+旧表示中每个 target 是一个 dict，字符串不共享，get_target_info 每次查询都重新
+解析 deps 并写回 dict；TargetRecord 使用 __slots__、intern 后的规范字符串，
+依赖在解析时一次性解析完成。
+"""
+import sys
+import os
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyze_includes_lib.blade_target import build_target_records, resolve_dep
+
+
+def make_build_file(file_index, targets_per_file, fanout, file_count):
+    """生成一个 BUILD 文件的解析结果（每次调用都创建新的字符串对象，与实际解析一致）"""
+    rel_dir = f"project/module{file_index % 100}/dir{file_index}"
+    build_file = f"/workspace/{rel_dir}/BUILD"
+    parsed = {}
+    for t in range(targets_per_file):
+        deps = []
+        for k in range(fanout):
+            other = (file_index * 7 + k * 13 + t) % file_count
+            deps.append(f"//project/module{other % 100}/dir{other}:target{k % targets_per_file}")
+        deps.append(f":target{(t + 1) % targets_per_file}")
+        deps.append("#glog")
+        parsed[f"target{t}"] = {
+            'type': 'cc_library',
+            'name': f"target{t}",
+            'deps': deps,
+            'srcs': [f"src{t}_{i}.cpp" for i in range(3)],
+            'hdrs': [f"src{t}_{i}.h" for i in range(2)],
+        }
+    return build_file, rel_dir, parsed
+
+
+def build_legacy(files):
+    """旧表示：{spec: dict}，build_file/directory 写入每个 dict"""
+    table = {}
+    for build_file, rel_dir, parsed in files:
+        directory = os.path.dirname(build_file)
+        for name, info in parsed.items():
+            info = dict(info)
+            info['build_file'] = build_file
+            info['directory'] = directory
+            table[f"{rel_dir}:{name}"] = info
+    return table
+
+
+def build_compact(files):
+    """新表示：{spec: TargetRecord}"""
+    table = {}
+    for build_file, rel_dir, parsed in files:
+        for record in build_target_records(build_file, rel_dir, parsed).values():
+            table[record.spec] = record
+    return table
+
+
+def lookup_legacy(table, specs):
+    """模拟旧的 get_target_info：每次查询都重新解析依赖并写回 dict"""
+    for spec in specs:
+        info = table[spec]
+        rel_dir = spec.rsplit(':', 1)[0]
+        info['resolved_deps'] = [resolve_dep(dep, rel_dir) for dep in info.get('deps', [])]
+        info['full_spec'] = spec
+        for dep in info['resolved_deps']:
+            pass
+
+
+def lookup_compact(table, specs):
+    """新的查询：直接返回记录"""
+    for spec in specs:
+        info = table[spec]
+        for dep in info.resolved_deps:
+            pass
+
+
+def run(builder, lookup, args, trace):
+    """
+    构建 target 表并查询
+
+    trace 为 True 时用 tracemalloc 测量表的常驻内存（包含首次查询后写回的字段），
+    否则测量构建和查询耗时。
+
+    Returns:
+        (target 数, 内存字节数或 None, 构建耗时, 查询耗时)
+    """
+    file_count = max(1, args.targets // args.per_file)
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    files = [make_build_file(i, args.per_file, args.fanout, file_count) for i in range(file_count)]
+    start = time.perf_counter()
+    table = builder(files)
+    build_time = time.perf_counter() - start
+    del files
+    gc.collect()
+
+    specs = list(table)
+    start = time.perf_counter()
+    for _ in range(args.lookups):
+        lookup(table, specs)
+    lookup_time = time.perf_counter() - start
+
+    memory = None
+    if trace:
+        del specs
+        gc.collect()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(table), memory, build_time, lookup_time
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="比较 target 存储方式的内存占用和查询耗时")
+    parser.add_argument("--targets", type=int, default=200000, help="target 总数（默认：200000）")
+    parser.add_argument("--per-file", type=int, default=10, help="每个 BUILD 文件中的 target 数（默认：10）")
+    parser.add_argument("--fanout", type=int, default=5, help="每个 target 的跨目录依赖数（默认：5）")
+    parser.add_argument("--lookups", type=int, default=3, help="每个 target 的查询次数（默认：3）")
+    parser.add_argument("--json", metavar="FILE", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    results = {}
+    for label, builder, lookup in (
+        ('dict', build_legacy, lookup_legacy),
+        ('TargetRecord', build_compact, lookup_compact),
+    ):
+        _, memory, _, _ = run(builder, lookup, args, trace=True)
+        count, _, build_time, lookup_time = run(builder, lookup, args, trace=False)
+        results[label] = {
+            'targets': count,
+            'memory_bytes': memory,
+            'build_seconds': build_time,
+            'lookup_seconds': lookup_time,
+        }
+
+    print(f"{'存储方式':<14}{'target 数':>10}{'内存':>12}{'构建耗时':>12}{'查询耗时':>12}")
+    for label, result in results.items():
+        print(f"{label:<14}{result['targets']:>10}"
+              f"{result['memory_bytes'] / 1024 / 1024:>10.1f}MB"
+              f"{result['build_seconds']:>11.2f}s"
+              f"{result['lookup_seconds']:>11.2f}s")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成合成的 Blade 工作区：BLADE_ROOT 加上指定数量的 BUILD 文件
+
+BUILD 文件按编号排列，每个 target 只依赖编号更小的 BUILD 文件中的 target
+（以及同一文件中之前的 target），因此依赖图没有环；编号最大的 target
+是依赖闭包最大的根。使用固定的随机种子，相同参数生成的工作区完全相同。
+"""
+import os
+import sys
+import random
+import argparse
+
+
+def build_dir_of(index, modules):
+    """第 index 个 BUILD 文件所在目录（相对 BLADE_ROOT）"""
+    return f"project/module{index % modules}/pkg{index // modules}/dir{index}"
+
+
+def generate_workspace(root, build_files=1000, targets_per_file=5, fanout=4,
+                       glob_ratio=0.2, externals=20, modules=50, seed=0):
+    """
+    在 root 下生成合成工作区
+
+    Args:
+        root: 工作区根目录（会创建 BLADE_ROOT 文件）
+        build_files: BUILD 文件数量
+        targets_per_file: 每个 BUILD 文件中的 target 数
+        fanout: 每个 target 的跨目录依赖数
+        glob_ratio: 使用 glob() 声明 srcs 的 BUILD 文件比例（这些目录中会创建源文件）
+        externals: 外部依赖（#xxx）的种类数，0 表示不使用外部依赖
+        modules: 顶层模块目录数
+        seed: 随机种子
+
+    Returns:
+        字典 {'build_files', 'targets', 'edges', 'root_target'}
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, 'BLADE_ROOT'), 'w', encoding='utf-8') as f:
+        f.write('')
+
+    edge_count = 0
+    for index in range(build_files):
+        rel_dir = build_dir_of(index, modules)
+        directory = os.path.join(root, rel_dir)
+        os.makedirs(directory, exist_ok=True)
+        use_glob = rng.random() < glob_ratio
+
+        rules = []
+        for t in range(targets_per_file):
+            name = f"target{t}"
+            deps = []
+            if t > 0:
+                deps.append(f":target{t - 1}")
+            if index > 0:
+                for _ in range(fanout):
+                    other = rng.randrange(index)
+                    deps.append(f"//{build_dir_of(other, modules)}:target{rng.randrange(targets_per_file)}")
+            if externals and rng.random() < 0.5:
+                deps.append(f"#ext{rng.randrange(externals)}")
+            deps = list(dict.fromkeys(deps))
+            edge_count += len(deps)
+
+            if use_glob:
+                srcs = f"glob(['{name}_*.cpp'], exclude=['*_test.cpp'])"
+                for i in range(3):
+                    open(os.path.join(directory, f"{name}_{i}.cpp"), 'w').close()
+            else:
+                srcs = repr([f"{name}_{i}.cpp" for i in range(3)])
+            dep_lines = ''.join(f"        '{dep}',\n" for dep in deps)
+            rules.append(
+                f"cc_library(\n"
+                f"    name = '{name}',\n"
+                f"    srcs = {srcs},\n"
+                f"    hdrs = ['{name}.h'],\n"
+                f"    deps = [\n{dep_lines}    ],\n"
+                f")\n"
+            )
+
+        with open(os.path.join(directory, 'BUILD'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(rules))
+
+    return {
+        'build_files': build_files,
+        'targets': build_files * targets_per_file,
+        'edges': edge_count,
+        'root_target': f"{build_dir_of(build_files - 1, modules)}:target{targets_per_file - 1}",
+    }
+
+
+def add_arguments(parser):
+    """添加工作区规模相关的命令行参数（与基准测试脚本共用）"""
+    parser.add_argument("--targets-per-file", type=int, default=5, help="每个 BUILD 文件中的 target 数（默认：5）")
+    parser.add_argument("--fanout", type=int, default=4, help="每个 target 的跨目录依赖数（默认：4）")
+    parser.add_argument("--glob-ratio", type=float, default=0.2, help="使用 glob() 的 BUILD 文件比例（默认：0.2）")
+    parser.add_argument("--externals", type=int, default=20, help="外部依赖种类数（默认：20）")
+    parser.add_argument("--modules", type=int, default=50, help="顶层模块目录数（默认：50）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认：0）")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="生成合成的 Blade 工作区")
+    parser.add_argument("root", help="工作区根目录")
+    parser.add_argument("--build-files", type=int, default=1000, help="BUILD 文件数量（默认：1000）")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.root, 'BLADE_ROOT')):
+        print(f"✗ 错误：{args.root} 中已存在工作区")
+        sys.exit(1)
+
+    summary = generate_workspace(
+        args.root, args.build_files, args.targets_per_file, args.fanout,
+        args.glob_ratio, args.externals, args.modules, args.seed,
+    )
+    print(f"✓ 生成了 {summary['build_files']} 个 BUILD 文件、{summary['targets']} 个 target、"
+          f"{summary['edges']} 条依赖")
+    print(f"  依赖闭包最大的 target：{summary['root_target']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""测试公共设置：让测试可以直接导入仓库根目录下的 analyze_includes_lib"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,122 @@
+"""BUILD 文件静态解析"""
+import contextlib
+import io
+import os
+import tempfile
+import textwrap
+import unittest
+
+from analyze_includes_lib.blade_ast import parse_build_content
+from analyze_includes_lib.blade_parser import BladeParser
+
+
+def parse(content, build_file='/nonexistent/BUILD'):
+    return parse_build_content(textwrap.dedent(content), build_file)
+
+
+class BuildFileEvaluatorTest(unittest.TestCase):
+
+    def test_concatenation(self):
+        targets = parse('''
+            COMMON = ["//a:b"]
+            cc_library(name="x", deps=COMMON + [":y"] + ["#glog"])
+        ''')
+        self.assertEqual(targets['x']['deps'], ['//a:b', ':y', '#glog'])
+        self.assertEqual(targets['x']['unresolved'], [])
+
+    def test_concatenation_with_unknown_keeps_known_entries(self):
+        targets = parse('''
+            COMMON = ["//a:b"]
+            cc_library(name="x", deps=COMMON + [f"//d:{v}", ":y"])
+            cc_library(name="z", deps=helper() + COMMON, srcs=["z.cc"])
+        ''')
+        self.assertEqual(targets['x']['deps'], ['//a:b', ':y'])
+        self.assertEqual(targets['x']['unresolved'], ['deps'])
+        self.assertEqual(targets['z']['deps'], ['//a:b'])
+        self.assertEqual(targets['z']['unresolved'], ['deps'])
+
+    def test_augmented_assignment(self):
+        targets = parse('''
+            DEPS = [":a"]
+            DEPS += [":b"]
+            PARTIAL = [":c"]
+            PARTIAL += unknown_helper()
+            cc_library(name="x", deps=DEPS)
+            cc_library(name="y", deps=PARTIAL)
+        ''')
+        self.assertEqual(targets['x']['deps'], [':a', ':b'])
+        self.assertEqual(targets['x']['unresolved'], [])
+        self.assertEqual(targets['y']['deps'], [':c'])
+        self.assertEqual(targets['y']['unresolved'], ['deps'])
+
+    def test_if_blocks_collect_both_branches(self):
+        targets = parse('''
+            if build_target.arch == "x86_64":
+                cc_library(name="fast", srcs=["fast.cc"])
+            else:
+                cc_library(name="slow", srcs=["slow.cc"])
+        ''')
+        self.assertEqual(set(targets), {'fast', 'slow'})
+        self.assertEqual(targets['fast']['srcs'], ['fast.cc'])
+
+    def test_unknown_rules_and_calls(self):
+        targets = parse('''
+            load("//tools:rules.bld", "my_rule")
+            config_items(cc_config={"warnings": ["-Wall"]})
+            my_rule(name="custom", deps=[":x"], extra=compute())
+            print("not a target")
+        ''')
+        self.assertEqual(list(targets), ['custom'])
+        self.assertEqual(targets['custom']['type'], 'my_rule')
+        self.assertEqual(targets['custom']['deps'], [':x'])
+
+    def test_unknown_variable_is_unresolved(self):
+        targets = parse('cc_library(name="x", deps=MISSING, hdrs="x.h")\n')
+        self.assertEqual(targets['x']['deps'], [])
+        self.assertEqual(targets['x']['hdrs'], ['x.h'])
+        self.assertEqual(targets['x']['unresolved'], ['deps'])
+
+
+class GlobTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.build_file = os.path.join(self.tmp.name, 'BUILD')
+        for rel_path in ('a.cc', 'b.cc', 'a_test.cc', 'sub/c.cc', 'sub/c.h'):
+            path = os.path.join(self.tmp.name, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+
+    def test_include_and_exclude(self):
+        targets = parse('''
+            cc_library(
+                name="x",
+                srcs=glob(["*.cc", "**/*.cc"], exclude=["*_test.cc"]),
+                hdrs=glob(include="sub/*.h"),
+            )
+        ''', self.build_file)
+        self.assertEqual(targets['x']['srcs'], ['a.cc', 'b.cc', 'sub/c.cc'])
+        self.assertEqual(targets['x']['hdrs'], ['sub/c.h'])
+        self.assertEqual(targets['x']['unresolved'], [])
+
+    def test_non_string_patterns_are_dropped(self):
+        targets = parse('cc_library(name="x", srcs=glob(["a.cc", 3], exclude=[None]))\n',
+                        self.build_file)
+        self.assertEqual(targets['x']['srcs'], ['a.cc'])
+        self.assertEqual(targets['x']['unresolved'], ['srcs'])
+
+    def test_parser_warns_and_keeps_going(self):
+        with open(self.build_file, 'w') as f:
+            f.write('cc_library(name="x", srcs=glob(["*.cc", 3]), deps=[":y"] + EXTRA)\n')
+        parser = BladeParser(self.tmp.name)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            targets = parser.parse_build_file(self.build_file)
+        self.assertEqual(targets['x'].srcs, ('a.cc', 'a_test.cc', 'b.cc'))
+        self.assertEqual(targets['x'].deps, (':y',))
+        self.assertIn('srcs/deps', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
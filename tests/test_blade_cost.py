@@ -0,0 +1,66 @@
+"""按 include 闭包字节数估算 target 编译量"""
+import os
+import tempfile
+import unittest
+
+from analyze_includes_lib.blade_cost import BladeCostEstimator
+
+FILES = {
+    # a.cpp -> a.h -> common.h，a.cpp -> common.h；c.h 与 d.h 互相 include
+    'lib/a.cpp': '#include "lib/a.h"\n#include "lib/common.h"\n',
+    'lib/a.h': '#include "lib/common.h"\n',
+    'lib/common.h': '// common\n',
+    'app/main.cpp': '#include "lib/a.h"\n#include "app/c.h"\n',
+    'app/c.h': '#include "app/d.h"\n',
+    'app/d.h': '#include "app/c.h"\n',
+}
+
+
+class BladeCostEstimatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.sizes = {}
+        for rel_path, content in FILES.items():
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+            self.sizes[rel_path] = len(content)
+        self.estimator = BladeCostEstimator(self.root, deep_system=False)
+
+    def size_of(self, *rel_paths):
+        return sum(self.sizes[path] for path in rel_paths)
+
+    def test_file_cost_counts_shared_headers_once(self):
+        cost = self.estimator.file_cost(os.path.join(self.root, 'lib/a.cpp'))
+        self.assertEqual(cost, self.size_of('lib/a.cpp', 'lib/a.h', 'lib/common.h'))
+
+    def test_file_cost_with_include_cycle(self):
+        cost = self.estimator.file_cost(os.path.join(self.root, 'app/main.cpp'))
+        self.assertEqual(cost, self.size_of(
+            'app/main.cpp', 'lib/a.h', 'lib/common.h', 'app/c.h', 'app/d.h'))
+
+    def test_rollup(self):
+        nodes = {
+            'lib:a': {'srcs': ['a.cpp'], 'hdrs': ['a.h']},
+            'lib:common': {'srcs': [], 'hdrs': ['common.h']},
+            'app:main': {'srcs': ['main.cpp', 'c.h']},
+            '#pthread': {'external': True},
+        }
+        edges = [('app:main', 'lib:a'), ('lib:a', 'lib:common'),
+                 ('app:main', 'lib:common'), ('app:main', '#pthread')]
+        costs = self.estimator.rollup(nodes, edges)
+
+        own_a = self.size_of('lib/a.cpp', 'lib/a.h', 'lib/common.h')
+        own_main = self.size_of('app/main.cpp', 'lib/a.h', 'lib/common.h', 'app/c.h', 'app/d.h')
+        self.assertEqual(costs['lib:a'], {'own': own_a, 'total': own_a})
+        self.assertEqual(costs['lib:common'], {'own': 0, 'total': 0})
+        self.assertEqual(costs['#pthread'], {'own': 0, 'total': 0})
+        self.assertEqual(costs['app:main'], {'own': own_main, 'total': own_main + own_a})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""BladeDepsChecker 的头文件归属和缺失/多余依赖判断"""
+import os
+import tempfile
+import unittest
+
+from analyze_includes_lib.blade_deps_check import BladeDepsChecker
+
+FILES = {
+    'lib/base.h': '',
+    'lib/base.cpp': '#include "lib/base.h"\n',
+    'lib/util.h': '#include "lib/base.h"\n',
+    'lib/util.cpp': '#include "lib/util.h"\n',
+    'proto/msg.proto': 'message Msg {}\n',
+    'build64_release/proto/msg.pb.h': '',
+    'common/shared.h': '',
+    'app/main.cpp': (
+        '#include "lib/util.h"\n'
+        '#include "proto/msg.pb.h"\n'
+        '#include "common/shared.h"\n'
+        '#include <vector>\n'
+    ),
+}
+
+
+def target(target_type, srcs=(), hdrs=(), deps=()):
+    return {'type': target_type, 'srcs': list(srcs), 'hdrs': list(hdrs), 'resolved_deps': list(deps)}
+
+
+TARGETS = {
+    'lib:base': target('cc_library', srcs=['base.cpp'], hdrs=['base.h']),
+    'lib:util': target('cc_library', srcs=['util.cpp'], hdrs=['util.h'], deps=['lib:base']),
+    'proto:msg_proto': target('proto_library', srcs=['msg.proto']),
+    # 同一个头文件被两个 target 列出
+    'common:a': target('cc_library', hdrs=['shared.h']),
+    'common:b': target('cc_library', hdrs=['shared.h']),
+    'app:server': target('cc_binary', srcs=['main.cpp'], deps=['lib:base', '#glog']),
+}
+
+
+class BladeDepsCheckerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        for rel_path, content in FILES.items():
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+        self.checker = BladeDepsChecker(self.root, TARGETS, jobs=1)
+
+    def test_header_owners(self):
+        owners = self.checker.header_owners
+        self.assertEqual(owners[os.path.join('lib', 'util.h')], ['lib:util'])
+        self.assertEqual(owners[os.path.join('proto', 'msg.pb.h')], ['proto:msg_proto'])
+        self.assertEqual(owners[os.path.join('common', 'shared.h')], ['common:a', 'common:b'])
+        # 源文件不是头文件，不参与归属
+        self.assertNotIn(os.path.join('lib', 'util.cpp'), owners)
+
+    def test_generated_headers_map_to_source_directory(self):
+        included = self.checker.scan(['app:server'])
+        self.assertEqual(included['app:server'], {
+            os.path.join('lib', 'util.h'),
+            os.path.join('proto', 'msg.pb.h'),
+            os.path.join('common', 'shared.h'),
+        })
+
+    def test_missing_ambiguous_and_unused(self):
+        report = self.checker.check(['app:server'])
+        self.assertEqual(report['app:server'], {
+            'missing': {
+                'lib:util': [os.path.join('lib', 'util.h')],
+                'proto:msg_proto': [os.path.join('proto', 'msg.pb.h')],
+            },
+            'ambiguous': {os.path.join('common', 'shared.h'): ['common:a', 'common:b']},
+            # 外部依赖不会被报告为多余
+            'unused': ['lib:base'],
+        })
+
+    def test_correct_targets_are_not_reported(self):
+        self.assertEqual(self.checker.check(['lib:base', 'lib:util']), {})
+
+    def test_declaring_one_owner_of_a_shared_header_is_enough(self):
+        targets = dict(TARGETS)
+        targets['app:server'] = target(
+            'cc_binary', srcs=['main.cpp'],
+            deps=['lib:util', 'proto:msg_proto', 'common:b'],
+        )
+        checker = BladeDepsChecker(self.root, targets, jobs=1)
+        self.assertEqual(checker.check(['app:server']), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""git tree 解析和按 revision 读取 BUILD 文件"""
+import os
+import subprocess
+import tempfile
+import unittest
+
+from analyze_includes_lib.blade_history import BladeRevisionParser, parse_tree
+
+
+def tree_entry(mode, name):
+    return mode + b' ' + name.encode('utf-8') + b'\0' + b'\x01' * 20
+
+
+class ParseTreeTest(unittest.TestCase):
+
+    def test_files_subdirs_and_submodules(self):
+        content = (
+            tree_entry(b'100644', 'b.cpp')
+            + tree_entry(b'40000', 'sub')
+            + tree_entry(b'100755', 'a.sh')
+            + tree_entry(b'160000', 'vendor')
+            + tree_entry(b'120000', 'link')
+        )
+        self.assertEqual(parse_tree(content), (('a.sh', 'b.cpp', 'link'), ('sub',)))
+
+    def test_empty_tree(self):
+        self.assertEqual(parse_tree(b''), ((), ()))
+
+
+class FailingReader:
+    """info 能找到对象但 read 返回 None 的 reader"""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def info(self, object_name):
+        return self.reader.info(object_name)
+
+    def read(self, sha):
+        return None
+
+    def close(self):
+        self.reader.close()
+
+
+class RevisionParserTest(unittest.TestCase):
+    """BLADE_ROOT 位于 git 仓库的子目录 ws/ 中"""
+
+    def git(self, *args):
+        return subprocess.run(
+            ['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+            cwd=self.repo, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.repo = os.path.join(self.tmp.name, 'repo')
+        ws = os.path.join(self.repo, 'ws')
+        os.makedirs(os.path.join(ws, 'lib'))
+        with open(os.path.join(ws, 'BLADE_ROOT'), 'w'):
+            pass
+        with open(os.path.join(ws, 'lib', 'BUILD'), 'w') as f:
+            f.write("cc_library(name = 'base', srcs = ['base.cpp'])\n"
+                    "cc_library(name = 'util', srcs = ['util.cpp'], deps = [':base'])\n")
+        try:
+            self.git('init', '-q')
+            self.git('add', '.')
+            self.git('commit', '-q', '-m', 'init')
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest('git 不可用')
+        self.head = self.git('rev-parse', 'HEAD')
+
+    def make_parser(self, blade_root, reader=None):
+        parser = BladeRevisionParser(blade_root, reader)
+        self.addCleanup(parser.close)
+        parser.set_revision(self.head)
+        return parser
+
+    def test_reads_build_file_at_revision(self):
+        parser = self.make_parser(os.path.join(self.repo, 'ws'))
+        self.assertEqual(parser.directories.git_prefix, 'ws')
+        info = parser.get_target_info('lib:util')
+        self.assertIsNotNone(info)
+        self.assertEqual(list(info.resolved_deps), ['lib:base'])
+
+    def test_blade_root_through_symlink(self):
+        link = os.path.join(self.tmp.name, 'link')
+        try:
+            os.symlink(os.path.join(self.repo, 'ws'), link)
+        except (OSError, NotImplementedError):
+            self.skipTest('无法创建符号链接')
+        parser = self.make_parser(link)
+        self.assertEqual(parser.directories.git_prefix, 'ws')
+        self.assertIsNotNone(parser.get_target_info('lib:base'))
+
+    def test_unreadable_objects(self):
+        parser = BladeRevisionParser(os.path.join(self.repo, 'ws'))
+        parser = self.make_parser(parser.blade_root, FailingReader(parser.reader))
+        self.assertIsNone(parser.directories.list_dir('lib'))
+        self.assertIsNone(parser.get_target_info('lib:base'))
+
+
+if __name__ == '__main__':
+    unittest.main()
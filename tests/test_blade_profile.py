@@ -0,0 +1,61 @@
+"""构建并行度分析：关键路径、层级、松弛时间和循环依赖"""
+import unittest
+
+from analyze_includes_lib.blade_profile import build_profile
+
+
+def nodes_of(*specs):
+    return {spec: {'srcs': []} for spec in specs}
+
+
+class BuildProfileTest(unittest.TestCase):
+
+    def test_critical_path_and_slack(self):
+        # app 依赖 lib 和 util，lib 依赖 base
+        nodes = nodes_of('app', 'lib', 'util', 'base')
+        edges = [('app', 'lib'), ('app', 'util'), ('lib', 'base')]
+        costs = {'app': 1, 'lib': 4, 'util': 2, 'base': 3}
+        profile = build_profile(nodes, edges, costs)
+
+        self.assertEqual(profile['critical_path'], ['base', 'lib', 'app'])
+        self.assertEqual(profile['critical_path_cost'], 8)
+        self.assertEqual(profile['total_cost'], 10)
+        self.assertEqual(profile['levels'], [2, 1, 1])
+        self.assertEqual(profile['targets']['util']['slack'], 5)
+        self.assertEqual(profile['targets']['lib']['slack'], 0)
+        self.assertFalse(profile['targets']['util']['critical'])
+        self.assertEqual(profile['cycles'], [])
+        self.assertEqual(profile['blocked'], [])
+
+    def test_estimated_costs(self):
+        nodes = {'a': {'srcs': ['1.cpp', '2.cpp']}, 'b': {'srcs': []}, 'c': {'external': True}}
+        profile = build_profile(nodes, [('a', 'b'), ('b', 'c')])
+        self.assertEqual(profile['critical_path_cost'], 3)
+
+    def test_cycle_members_and_blocked_targets(self):
+        # x <-> y 构成循环，top 依赖 x，mid 依赖 top；leaf 与循环无关
+        nodes = nodes_of('top', 'mid', 'x', 'y', 'leaf', 'z')
+        edges = [
+            ('top', 'x'), ('x', 'y'), ('y', 'x'), ('mid', 'top'),
+            ('y', 'leaf'), ('z', 'z'),
+        ]
+        profile = build_profile(nodes, edges)
+
+        self.assertEqual([sorted(members) for members in profile['cycles']], [['x', 'y']])
+        self.assertEqual(profile['blocked'], ['top', 'mid'])
+        # 自环被忽略，z 正常参与分析
+        self.assertEqual(sorted(profile['targets']), ['leaf', 'z'])
+
+    def test_two_separate_cycles(self):
+        nodes = nodes_of('a', 'b', 'c', 'd', 'e')
+        edges = [('a', 'b'), ('b', 'a'), ('c', 'd'), ('d', 'e'), ('e', 'c'), ('a', 'c')]
+        profile = build_profile(nodes, edges)
+        self.assertEqual(
+            [sorted(members) for members in profile['cycles']],
+            [['a', 'b'], ['c', 'd', 'e']],
+        )
+        self.assertEqual(profile['blocked'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
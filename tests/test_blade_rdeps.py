@@ -0,0 +1,98 @@
+"""BladeReverseIndex 的变更文件归属和反向依赖闭包"""
+import os
+import subprocess
+import tempfile
+import unittest
+
+from analyze_includes_lib.blade_rdeps import BladeReverseIndex
+
+
+def make_targets(blade_root):
+    """//lib:base <- //lib:util <- //app:server，//app:server_test 依赖 //app:server"""
+    return {
+        'lib:base': {
+            'type': 'cc_library', 'srcs': ['base.cpp'], 'hdrs': ['base.h'],
+            'resolved_deps': [], 'build_file': os.path.join(blade_root, 'lib', 'BUILD'),
+        },
+        'lib:util': {
+            'type': 'cc_library', 'srcs': ['util.cpp'], 'hdrs': [],
+            'resolved_deps': ['lib:base'], 'build_file': os.path.join(blade_root, 'lib', 'BUILD'),
+        },
+        'app:server': {
+            'type': 'cc_binary', 'srcs': ['main.cpp'], 'hdrs': [],
+            'resolved_deps': ['lib:util'], 'build_file': os.path.join(blade_root, 'app', 'BUILD'),
+        },
+        'app:server_test': {
+            'type': 'cc_test', 'srcs': ['main_test.cpp'], 'hdrs': [],
+            'resolved_deps': ['app:server'], 'build_file': os.path.join(blade_root, 'app', 'BUILD'),
+        },
+    }
+
+
+class GitRepoTest(unittest.TestCase):
+    """BLADE_ROOT 位于 git 仓库的子目录 ws/ 中"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.repo = self.tmp.name
+        self.blade_root = os.path.join(self.repo, 'ws')
+        os.makedirs(os.path.join(self.blade_root, 'lib'))
+        try:
+            subprocess.run(['git', 'init', '-q', self.repo], check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest('git 不可用')
+        self.index = BladeReverseIndex(self.blade_root, make_targets(self.blade_root))
+        self.old_cwd = os.getcwd()
+        self.addCleanup(os.chdir, self.old_cwd)
+
+    def test_git_diff_paths_are_relative_to_git_root(self):
+        os.chdir(os.path.join(self.blade_root, 'lib'))
+        owners, unowned = self.index.owners(['ws/lib/base.h', 'ws/app/BUILD'])
+        self.assertEqual(owners, {'lib:base', 'app:server', 'app:server_test'})
+        self.assertEqual(unowned, [])
+
+    def test_absolute_paths(self):
+        owners, unowned = self.index.owners([os.path.join(self.blade_root, 'lib', 'util.cpp')])
+        self.assertEqual(owners, {'lib:util'})
+        self.assertEqual(unowned, [])
+
+    def test_files_outside_blade_root_are_unowned(self):
+        owners, unowned = self.index.owners(['README.md', 'ws/lib/missing.cpp'])
+        self.assertEqual(owners, set())
+        self.assertEqual(unowned, ['README.md', 'ws/lib/missing.cpp'])
+
+    def test_blade_root_through_symlink(self):
+        link = os.path.join(self.tmp.name, 'link')
+        try:
+            os.symlink(self.blade_root, link)
+        except (OSError, NotImplementedError):
+            self.skipTest('无法创建符号链接')
+        index = BladeReverseIndex(link, make_targets(link))
+        self.assertEqual(index.owners(['ws/lib/base.cpp'])[0], {'lib:base'})
+        self.assertEqual(index.owners(['ws/lib/BUILD'])[0], {'lib:base', 'lib:util'})
+
+    def test_affected_tests(self):
+        tests, unowned = self.index.affected_tests(['ws/lib/base.cpp'])
+        self.assertEqual(tests, ['app:server_test'])
+        self.assertEqual(unowned, [])
+
+
+class PathRootTest(unittest.TestCase):
+    """不在 git 仓库中或显式指定 path_root 时的相对路径"""
+
+    def test_explicit_path_root(self):
+        index = BladeReverseIndex('/ws', make_targets('/ws'), path_root='/ws/lib')
+        self.assertEqual(index.normalize_path('base.h'), os.path.join('lib', 'base.h'))
+        self.assertEqual(index.normalize_path('../app/main.cpp'), os.path.join('app', 'main.cpp'))
+
+    def test_reverse_closure(self):
+        index = BladeReverseIndex('/ws', make_targets('/ws'), path_root='/ws')
+        self.assertEqual(
+            index.affected_targets(['lib/util.cpp'])[0],
+            ['app:server', 'app:server_test', 'lib:util'],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
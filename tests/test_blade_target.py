@@ -0,0 +1,52 @@
+"""Blade target 记录"""
+import pickle
+import sys
+import unittest
+
+from analyze_includes_lib.blade_target import build_target_records, external_target
+
+
+def fresh(text):
+    """返回与 text 相等但未经 intern 的新字符串"""
+    return ''.join(list(text))
+
+
+class TargetRecordTest(unittest.TestCase):
+
+    def setUp(self):
+        parsed = {
+            fresh('util'): {
+                'type': fresh('cc_library'),
+                'deps': [fresh(':base'), fresh('//common:log'), fresh('#glog')],
+                'srcs': [fresh('util.cpp')],
+                'hdrs': [fresh('util.h')],
+            },
+        }
+        self.record = build_target_records(fresh('ads/util/BUILD'), fresh('ads/util'), parsed)['util']
+
+    def assert_interned(self, record):
+        for value in (record.spec, record.type, record.name, record.build_file):
+            self.assertIs(value, sys.intern(fresh(value)))
+        for dep in record.resolved_deps:
+            self.assertIs(dep, sys.intern(fresh(dep)))
+
+    def test_records_are_interned(self):
+        self.assert_interned(self.record)
+        self.assertEqual(self.record.resolved_deps, ('ads/util:base', 'common:log', '#glog'))
+
+    def test_pickle_round_trip_reinterns_strings(self):
+        copy = pickle.loads(pickle.dumps(self.record))
+        self.assertEqual(pickle.dumps(copy), pickle.dumps(self.record))
+        self.assertEqual(copy.srcs, ('util.cpp',))
+        self.assertEqual(copy.directory, 'ads/util')
+        self.assert_interned(copy)
+
+    def test_mapping_access(self):
+        self.assertEqual(self.record['deps'], (':base', '//common:log', '#glog'))
+        self.assertEqual(self.record.get('external', False), False)
+        self.assertNotIn('external', self.record)
+        self.assertTrue(external_target('#glog')['external'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""分类折叠视图的分类汇总"""
+import unittest
+
+from analyze_includes_lib.cluster_view import summarize_clusters
+
+
+class SummarizeClustersTest(unittest.TestCase):
+
+    def test_summary_and_link_groups(self):
+        clusters = ['lib', 'lib', 'app', 'sys']
+        sizes = [10, 20, 5, 100]
+        levels = [1, 2, 0, 2]
+        links = [(2, 0), (2, 1), (0, 1), (1, 3), (2, 3)]
+        summary, link_groups = summarize_clusters(clusters, sizes, levels, links)
+
+        self.assertEqual(summary['cluster_ids'], ['lib', 'app', 'sys'])
+        self.assertEqual(summary['cluster_counts'], [2, 1, 1])
+        self.assertEqual(summary['cluster_sizes'], [30, 5, 100])
+        self.assertEqual(summary['cluster_levels'], [1, 0, 2])
+        # [源分类, 目标分类, 边数, 最大的目标大小]
+        self.assertEqual(summary['cluster_links'], [
+            1, 0, 2, 20,
+            0, 2, 1, 100,
+            1, 2, 1, 100,
+        ])
+        self.assertEqual(link_groups, [0, 0, None, 1, 2])
+
+    def test_empty_module(self):
+        summary, link_groups = summarize_clusters([], [], [], [])
+        self.assertEqual(summary['cluster_ids'], [])
+        self.assertEqual(summary['cluster_links'], [])
+        self.assertEqual(link_groups, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""DOT 输出：多模块合并、目录分类汇总和冗余边省略"""
+import os
+import tempfile
+import unittest
+
+from analyze_includes_lib.dot_visualizer import DotVisualizer
+
+
+class DotVisualizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # 目录分类相对当前目录计算
+        old_cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, old_cwd)
+        root = os.getcwd()
+        self.main, self.other, self.a, self.b = (
+            os.path.join(root, path)
+            for path in ('app/main.cpp', 'app/other.cpp', 'lib/a.h', 'lib/b.h')
+        )
+        self.modules = [
+            {
+                'source_file': self.main,
+                'nodes': {self.main, self.a, self.b},
+                'edges': [(self.main, self.a), (self.main, self.b), (self.a, self.b)],
+            },
+            {
+                'source_file': self.other,
+                'nodes': {self.other, self.a, self.b},
+                'edges': [(self.other, self.a), (self.a, self.b)],
+            },
+        ]
+        self.weights = {self.main: 1, self.other: 2, self.a: 10, self.b: 5}
+
+    def read_output(self, generate):
+        path = os.path.join(self.tmp.name, 'out.dot')
+        generate(path)
+        with open(path) as f:
+            return f.read()
+
+    def test_merged_nodes_and_edges(self):
+        dot = DotVisualizer.from_modules(self.modules)
+        self.assertEqual(set(dot.nodes), {self.main, self.other, self.a, self.b})
+        self.assertEqual(sorted(dot.edges), sorted([
+            (self.main, self.a), (self.main, self.b), (self.a, self.b), (self.other, self.a),
+        ]))
+        self.assertEqual(dot.source_files, {self.main, self.other})
+
+        output = self.read_output(dot.generate)
+        self.assertEqual(output.count(' -> '), 4)
+        self.assertEqual(output.count('penwidth=3.0'), 2)
+
+    def test_cluster_summary(self):
+        dot = DotVisualizer.from_modules(self.modules, node_weights=self.weights,
+                                         weight_unit='lines')
+        output = self.read_output(dot.generate_summary)
+        self.assertIn('"Project/app" [label="Project/app\\n(2 files, 3 lines)"', output)
+        self.assertIn('"Project/lib" [label="Project/lib\\n(2 files, 15 lines)"', output)
+        edges = [line for line in output.splitlines() if ' -> ' in line]
+        self.assertEqual(len(edges), 1)
+        self.assertIn('"Project/app" -> "Project/lib" [label="3 edges\\n15 lines"', edges[0])
+        self.assertIn('weight=3]', edges[0])
+
+    def test_reduce_drops_redundant_edges(self):
+        module = self.modules[0]
+        dot = DotVisualizer(module['nodes'], module['edges'], self.main, reduce=True)
+        self.assertEqual(dot.redundant_count, 1)
+        self.assertEqual(sorted(dot.edges), sorted([(self.main, self.a), (self.a, self.b)]))
+
+        merged = DotVisualizer.from_modules(self.modules, reduce=True)
+        self.assertNotIn((self.main, self.b), merged.edges)
+        self.assertIn((self.other, self.a), merged.edges)
+
+    def test_single_module_output_is_unchanged(self):
+        module = self.modules[0]
+        direct = DotVisualizer(module['nodes'], module['edges'], module['source_file'])
+        merged = DotVisualizer.from_modules([module])
+        output = self.read_output(direct.generate)
+        self.assertEqual(self.read_output(merged.generate), output)
+        self.assertEqual(output.count(' -> '), 3)
+        self.assertEqual(output.count('penwidth=3.0'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""预计算布局"""
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from analyze_includes_lib import graph_layout
+from analyze_includes_lib.graph_layout import stress_layout
+
+
+class StressLayoutTest(unittest.TestCase):
+
+    def test_positions_are_centered(self):
+        links = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 4)]
+        positions = stress_layout(5, links)
+        self.assertEqual(len(positions), 10)
+        self.assertLessEqual(abs(sum(positions[0::2])), 5)
+        self.assertLessEqual(abs(sum(positions[1::2])), 5)
+        self.assertEqual(len({(positions[2 * i], positions[2 * i + 1]) for i in range(5)}), 5)
+
+    def test_pure_python_fallback_warns_once_for_large_graphs(self):
+        links = [(i, i + 1) for i in range(9)]
+        out = io.StringIO()
+        with mock.patch.object(graph_layout, 'np', None), \
+                mock.patch.object(graph_layout, 'PURE_PYTHON_WARN_NODES', 5), \
+                mock.patch.object(graph_layout, '_warned_pure_python', False), \
+                contextlib.redirect_stdout(out):
+            stress_layout(4, links[:3])
+            self.assertEqual(out.getvalue(), '')
+            stress_layout(10, links)
+            stress_layout(10, links)
+        self.assertEqual(out.getvalue().count('NumPy'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
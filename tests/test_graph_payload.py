@@ -0,0 +1,65 @@
+"""HTML 中嵌入的图数据编码"""
+import base64
+import io
+import json
+import unittest
+import zlib
+
+from analyze_includes_lib.graph_payload import PayloadWriter, StringTable, encode_payload
+
+DATA = {
+    'modules': [{'nodes': [0, 1], 'links': [0, 1], 'name': 'a</script><b>'}],
+    'paths': ['src/主.cpp', 'x.h'],
+}
+
+
+def decode(payload, compress):
+    if compress:
+        return json.loads(zlib.decompress(base64.b64decode(json.loads(payload))).decode('utf-8'))
+    return json.loads(payload)
+
+
+class StringTableTest(unittest.TestCase):
+
+    def test_indices_follow_first_occurrence(self):
+        table = StringTable()
+        self.assertEqual([table.add(value) for value in ['b', 'a', 'b', 'c', 'a']],
+                         [0, 1, 0, 2, 1])
+        self.assertEqual(table.values, ['b', 'a', 'c'])
+
+
+class EncodePayloadTest(unittest.TestCase):
+
+    def test_plain_round_trip_escapes_script_end(self):
+        payload = encode_payload(DATA)
+        self.assertNotIn('</', payload)
+        self.assertEqual(decode(payload, False), DATA)
+
+    def test_compressed_round_trip(self):
+        payload = encode_payload(DATA, compress=True)
+        self.assertTrue(payload.startswith('"') and payload.endswith('"'))
+        self.assertEqual(decode(payload, True), DATA)
+
+
+class PayloadWriterTest(unittest.TestCase):
+
+    def write(self, compress):
+        f = io.StringIO()
+        writer = PayloadWriter(f, compress=compress)
+        writer.write_raw('{"modules":[')
+        writer.write_json(DATA['modules'][0])
+        writer.write_raw('],"paths":')
+        writer.write_json(DATA['paths'])
+        writer.write_raw('}')
+        writer.close()
+        return f.getvalue()
+
+    def test_streamed_output_matches_encode_payload(self):
+        self.assertEqual(self.write(False), encode_payload(DATA))
+
+    def test_streamed_compressed_output_decodes(self):
+        self.assertEqual(decode(self.write(True), True), DATA)
+
+
+if __name__ == '__main__':
+    unittest.main()
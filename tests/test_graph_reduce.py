@@ -0,0 +1,132 @@
+"""强连通分量缩点、传递归约和闭包权重"""
+import random
+import unittest
+
+from analyze_includes_lib.graph_reduce import closure_weights, condense, transitive_reduction
+
+
+def reachable(count, links, start):
+    successors = [[] for _ in range(count)]
+    for src, dst in links:
+        successors[src].append(dst)
+    seen = {start}
+    stack = [start]
+    while stack:
+        for child in successors[stack.pop()]:
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen
+
+
+def random_graphs(seed, rounds=200):
+    rng = random.Random(seed)
+    for _ in range(rounds):
+        count = rng.randint(1, 25)
+        links = [(rng.randrange(count), rng.randrange(count))
+                 for _ in range(rng.randint(0, 3 * count))]
+        yield rng, count, links
+
+
+class CondenseTest(unittest.TestCase):
+
+    def test_cycles_share_a_component(self):
+        # 0 -> 1 -> 2 -> 0 为一个分量，3 依赖该分量，4 独立
+        component, components = condense(5, [(0, 1), (1, 2), (2, 0), (3, 0)])
+        self.assertEqual(components, 3)
+        self.assertEqual(len({component[0], component[1], component[2]}), 1)
+        self.assertNotEqual(component[3], component[0])
+
+    def test_successors_have_smaller_ids(self):
+        for _, count, links in random_graphs(1):
+            component, _ = condense(count, links)
+            for src, dst in links:
+                self.assertGreaterEqual(component[src], component[dst])
+
+    def test_components_match_mutual_reachability(self):
+        for _, count, links in random_graphs(2, rounds=100):
+            component, _ = condense(count, links)
+            reach = [reachable(count, links, node) for node in range(count)]
+            for a in range(count):
+                for b in range(count):
+                    mutual = b in reach[a] and a in reach[b]
+                    self.assertEqual(component[a] == component[b], mutual)
+
+    def test_deep_chain_does_not_recurse(self):
+        count = 100000
+        component, components = condense(count, [(i, i + 1) for i in range(count - 1)])
+        self.assertEqual(components, count)
+        self.assertEqual(component[-1], 0)
+
+
+class TransitiveReductionTest(unittest.TestCase):
+
+    def test_shortcut_edge_is_redundant(self):
+        # A -> B -> C 时 A -> C 是冗余的
+        self.assertEqual(transitive_reduction(3, [(0, 1), (0, 2), (1, 2)]), [1])
+
+    def test_diamond_has_no_redundant_edges(self):
+        self.assertEqual(transitive_reduction(4, [(0, 1), (0, 2), (1, 3), (2, 3)]), [])
+
+    def test_long_path_shortcut(self):
+        links = [(i, i + 1) for i in range(5)] + [(0, 5), (1, 4)]
+        self.assertEqual(transitive_reduction(6, links), [5, 6])
+
+    def test_edges_inside_cycles_are_kept(self):
+        # 0 <-> 1 为循环，2 -> 0 -> 3，2 -> 3 冗余
+        links = [(0, 1), (1, 0), (2, 0), (0, 3), (2, 3)]
+        self.assertEqual(transitive_reduction(4, links), [4])
+
+    def test_matches_brute_force(self):
+        for _, count, links in random_graphs(4):
+            links = list(dict.fromkeys(links))
+            component, _ = condense(count, links)
+            expected = []
+            for i, (src, dst) in enumerate(links):
+                if component[src] == component[dst]:
+                    continue
+                # 去掉所有与该边连接相同分量对的边后仍可到达，则该边冗余
+                others = [
+                    link for link in links
+                    if (component[link[0]], component[link[1]]) != (component[src], component[dst])
+                ]
+                if dst in reachable(count, others, src):
+                    expected.append(i)
+            self.assertEqual(transitive_reduction(count, links), expected)
+
+    def test_reduction_preserves_reachability(self):
+        for _, count, links in random_graphs(5):
+            redundant = set(transitive_reduction(count, links))
+            kept = [link for i, link in enumerate(links) if i not in redundant]
+            for start in range(count):
+                self.assertEqual(reachable(count, kept, start), reachable(count, links, start))
+
+
+class ClosureWeightsTest(unittest.TestCase):
+
+    def test_shared_descendants_count_once(self):
+        # 0 -> 1, 0 -> 2, 1 -> 3, 2 -> 3
+        weights = [1, 10, 100, 1000]
+        totals = closure_weights(4, [(0, 1), (0, 2), (1, 3), (2, 3)], weights)
+        self.assertEqual(totals, [1111, 1010, 1100, 1000])
+
+    def test_cycle(self):
+        totals = closure_weights(3, [(0, 1), (1, 0), (1, 2)], [1, 2, 4])
+        self.assertEqual(totals, [7, 7, 4])
+
+    def test_zero_weights_and_empty_graph(self):
+        self.assertEqual(closure_weights(0, [], []), [])
+        self.assertEqual(closure_weights(2, [(0, 1)], [0, 0]), [0, 0])
+
+    def test_matches_brute_force(self):
+        for rng, count, links in random_graphs(3):
+            weights = [rng.randint(0, 1 << 20) for _ in range(count)]
+            expected = [
+                sum(weights[node] for node in reachable(count, links, start))
+                for start in range(count)
+            ]
+            self.assertEqual(closure_weights(count, links, weights), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""头文件解析耗时测量"""
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from analyze_includes_lib.analyzer import DependencyAnalyzer
+from analyze_includes_lib.parse_timer import ParseTimer
+from analyze_includes_lib.utils import format_weight, scale_weights_to_sizes
+
+
+class ParseTimerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.good = self.write('good.h', 'inline int answer() { return 42; }\n')
+        self.bad = self.write('bad.h', 'this is not c++\n')
+        self.cache_file = os.path.join(self.tmp.name, 'cache.json')
+
+    def write(self, name, content, mode=None):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mode is not None:
+            os.chmod(path, os.stat(path).st_mode | mode)
+        return path
+
+    @unittest.skipUnless(shutil.which('g++'), 'g++ not available')
+    def test_failed_headers_map_to_none(self):
+        timer = ParseTimer(compiler='g++', jobs=2, cache_file=self.cache_file)
+        timings = timer.measure([self.good, self.bad])
+        self.assertIsInstance(timings[self.good], float)
+        self.assertIsNone(timings[self.bad])
+
+        # 缓存中的失败结果同样返回 None
+        cached = ParseTimer(compiler='g++', cache_file=self.cache_file)
+        with mock.patch('analyze_includes_lib.parse_timer._time_header') as time_header:
+            self.assertEqual(cached.measure([self.good, self.bad]), timings)
+        time_header.assert_not_called()
+
+    def test_cache_key_covers_include_closure(self):
+        base = self.write('base.h', 'inline int base() { return 1; }\n')
+        top = self.write('top.h', '#include "base.h"\n')
+        analyzer = DependencyAnalyzer([self.tmp.name])
+        key = ParseTimer(cache_file=None)._cache_key(top, analyzer)
+
+        self.write('base.h', 'inline int base() { return 2; }\n')
+        timer = ParseTimer(cache_file=None)
+        self.assertNotEqual(timer._cache_key(top, analyzer), key)
+        # 不传 analyzer 时只哈希头文件本身
+        self.assertEqual(timer._cache_key(top), ParseTimer(cache_file=None)._cache_key(top))
+
+    def test_missing_compiler_marks_headers_failed(self):
+        timer = ParseTimer(compiler=os.path.join(self.tmp.name, 'no-such-cc'), cache_file=None)
+        self.assertEqual(timer.measure([self.good]), {self.good: None})
+
+    def test_unreadable_headers_are_skipped(self):
+        timer = ParseTimer(compiler='true', cache_file=None)
+        self.assertEqual(timer.measure([os.path.join(self.tmp.name, 'missing.h')]), {})
+
+    @unittest.skipUnless(hasattr(os, 'wait4'), 'CPU time needs os.wait4')
+    def test_measures_cpu_time_not_wall_time(self):
+        compiler = self.write('slow-cc', '#!/bin/sh\nsleep 0.5\n', stat.S_IXUSR)
+        timer = ParseTimer(compiler=compiler, jobs=4, cache_file=None)
+        headers = [self.write(f'h{i}.h', f'// {i}\n') for i in range(4)]
+        timings = timer.measure(headers)
+        self.assertEqual(set(timings), set(headers))
+        for elapsed in timings.values():
+            self.assertLess(elapsed, 0.3)
+
+
+class WeightFormattingTest(unittest.TestCase):
+
+    def test_scale_ignores_failed_headers(self):
+        scaled = scale_weights_to_sizes({'a.h': 1.0, 'b.h': None, 'c.h': 0.5})
+        self.assertEqual(scaled['a.h'], 200 * 1024)
+        self.assertEqual(scaled['b.h'], 0)
+        self.assertEqual(scaled['c.h'], 100 * 1024)
+
+    def test_format_failed_weight(self):
+        self.assertEqual(format_weight(None, 's'), '编译失败')
+        self.assertEqual(format_weight(None, 'lines'), '-')
+        self.assertEqual(format_weight(0.25, 's'), '250ms')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""预处理文件（.i）的扫描、比较和 JSON 输出"""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from analyze_i_file import analyze_i_file
+from analyze_includes_lib.preprocessed import diff_i_files, load_line_weights, scan_i_file
+
+BEFORE = (
+    '# 1 "main.cpp"\n'
+    'int main();\n'
+    '# 1 "/usr/include/a.h" 1 3\n'
+    'int a;\n'
+    '\n'
+    'int b;\n'
+    '# 1 "b.h" 1\n'
+    'int c;\n'
+)
+
+
+class PreprocessedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_scan_attributes_lines_to_line_markers(self):
+        lines, sizes, total = scan_i_file(self.write('a.i', BEFORE))
+        self.assertEqual(lines, {'main.cpp': 1, '/usr/include/a.h': 2, 'b.h': 1})
+        self.assertEqual(sizes['/usr/include/a.h'], len('int a;\n') + len('int b;\n'))
+        self.assertEqual(total, 8)
+
+    def test_diff(self):
+        before = self.write('before.i', BEFORE)
+        after = self.write('after.i', BEFORE + 'int d;\nint e;\n# 1 "c.h"\nint f;\n')
+        result = diff_i_files(before, after)
+        self.assertEqual(result['lines_before'], 4)
+        self.assertEqual(result['lines_after'], 7)
+        self.assertEqual(result['lines_delta_percent'], 75.0)
+        self.assertEqual(
+            [(row['file'], row['lines_delta']) for row in result['headers']],
+            [('b.h', 2), ('c.h', 1)],
+        )
+
+    def test_json_to_stdout(self):
+        path = self.write('a.i', BEFORE)
+        stdout = io.StringIO()
+        old_cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, old_cwd)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            analyze_i_file(path, json_file='-')
+        result = json.loads(stdout.getvalue())
+        self.assertEqual(result['code_lines'], 4)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, '-')))
+
+    def test_csv_to_stdout(self):
+        path = self.write('a.i', BEFORE)
+        stdout = io.StringIO()
+        old_cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, old_cwd)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            analyze_i_file(path, csv_file='-')
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0], 'file,lines,bytes,percent')
+        self.assertEqual(len(lines), 4)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, '-')))
+
+    def test_line_weights_resolve_markers_against_marker_root(self):
+        build_dir = os.path.join(self.tmp.name, 'build')
+        os.makedirs(build_dir)
+        path = self.write(os.path.join('build', 'a.i'), BEFORE)
+        weights = load_line_weights([path], marker_root=self.tmp.name)
+        self.assertEqual(len(weights), 3)
+        self.assertEqual(weights[os.path.join(self.tmp.name, 'main.cpp')], 1)
+        self.assertEqual(weights[os.path.join(self.tmp.name, 'b.h')], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()